@@ -3,9 +3,11 @@
 from copy import deepcopy
 from typing import List, TypeVar, Sequence, Union, Dict, Any
 from tqdm import tqdm
+import numpy as np
 
 
 from adalflow.core.component import Component
+from adalflow.core.db import DocumentStore
 
 from adalflow.core.types import (
     Document,
@@ -67,14 +69,16 @@ def retriever_output_to_context_str(
 For now these are the data transformation components
 """
 
-ToEmbeddingsInputType = Sequence[Document]
-ToEmbeddingsOutputType = Sequence[Document]
+ToEmbeddingsInputType = Union[Sequence[Document], DocumentStore]
+ToEmbeddingsOutputType = Union[Sequence[Document], DocumentStore]
 
 
 class ToEmbeddings(Component):
     r"""It transforms a Sequence of Chunks or Documents to a List of Embeddings.
 
     It operates on a copy of the input data, and does not modify the input data.
+    A DocumentStore input returns a DocumentStore, with the embeddings written straight into its
+    float32 vector matrix.
     """
 
     def __init__(self, embedder: Embedder, batch_size: int = 50) -> None:
@@ -84,6 +88,8 @@ class ToEmbeddings(Component):
         self.batch_embedder = BatchEmbedder(embedder=embedder, batch_size=batch_size)
 
     def __call__(self, input: ToEmbeddingsInputType) -> ToEmbeddingsOutputType:
+        if isinstance(input, DocumentStore):
+            return self._embed_store(input)
         output = deepcopy(input)
         # convert documents to a list of strings
         embedder_input: BatchEmbedderInputType = [chunk.text for chunk in output]
@@ -96,6 +102,33 @@ class ToEmbeddings(Component):
                 output[batch_idx * self.batch_size + idx].vector = embedding.embedding
         return output
 
+    def _embed_store(self, input: DocumentStore) -> DocumentStore:
+        output = input.copy(include_vectors=False)
+        outputs: BatchEmbedderOutputType = self.batch_embedder(input=output.texts)
+        vectors = None
+        written = np.zeros(len(output), dtype=bool)
+        for batch_idx, batch_output in enumerate(outputs):
+            if batch_output.error:
+                raise ValueError(
+                    f"Failed to embed batch {batch_idx}: {batch_output.error}"
+                )
+            for idx, embedding in enumerate(batch_output.data or []):
+                if vectors is None:
+                    vectors = np.empty(
+                        (len(output), len(embedding.embedding)), dtype=np.float32
+                    )
+                row = batch_idx * self.batch_size + idx
+                vectors[row] = embedding.embedding
+                written[row] = True
+        if len(output) and not written.all():
+            # the rows of np.empty that were never written are not embeddings
+            raise ValueError(
+                f"Missing embeddings for {int((~written).sum())} of {len(output)} documents"
+            )
+        if vectors is not None:
+            output.set_vectors(vectors)
+        return output
+
     def _extra_repr(self) -> str:
         s = f"batch_size={self.batch_size}"
         return s
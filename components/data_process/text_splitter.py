@@ -14,13 +14,18 @@ However, the following approaches are commonly shared:
 * **Retrieval:** Leverage vectors for context retrieval.
 """
 
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
-from typing import List, Literal
+from functools import partial
+from itertools import accumulate
+from typing import Iterable, Iterator, List, Literal, Optional, Tuple
 from tqdm import tqdm
 import logging
 
 from adalflow.core.component import Component
 from adalflow.core.types import Document
+from adalflow.core.db import DocumentStore
 from adalflow.core.tokenizer import Tokenizer
 
 # TODO:
@@ -46,6 +51,28 @@ DEFAULT_CHUNK_OVERLAP = 200
 tokenizer = Tokenizer()
 
 
+# (text, start offset, end offset, estimated number of tokens or None) of a chunk
+ChunkSpan = Tuple[str, int, int, Optional[int]]
+
+
+def _split_texts(splitter: "TextSplitter", texts: List[str]) -> List[List[ChunkSpan]]:
+    r"""Split the texts in a worker process, with the token count of each chunk."""
+    results = []
+    for text in texts:
+        chunks = splitter._split_with_offsets(text)
+        results.append(
+            [
+                (
+                    (chunk, start, end, tokenizer.count_tokens(chunk))
+                    if num_tokens is None
+                    else (chunk, start, end, num_tokens)
+                )
+                for chunk, start, end, num_tokens in chunks
+            ]
+        )
+    return results
+
+
 class TextSplitter(Component):
     """
     Text Splitter for Chunking Documents
@@ -114,6 +141,9 @@ class TextSplitter(Component):
     Type 1/Type 2 create a list of split texts. ``TextSplitter`` then reattaches the specified separator to each piece of the split text, except for the last segment.
     This approach maintains the original spacing and punctuation, which is critical in contexts like natural language processing where text formatting can impact interpretations and outcomes.
     E.g. "hello world!" split by "word" will be kept as "hello " and "world!"
+    Each chunk is sliced from the original text by the character offsets of its units, the text is
+    split or tokenized once and the overlapping units are not joined or decoded again.
+    With ``record_offsets=True``, the "start_offset" and "end_offset" of each chunk are added to its meta_data.
 
     * **Customization**
     You can also customize the ``SEPARATORS``. For example, by defining ``SEPARATORS`` = {"question": "?"} and setting ``split_by`` = "question", the document will be split at each ``?``, ideal for processing text structured
@@ -156,12 +186,15 @@ class TextSplitter(Component):
         # Document(id=e7b617b2-3927-4248-afce-ec0fc247ac8b, text='to illustrate.', meta_data=None, vector=[], parent_doc_id=doc1, order=2, score=None)
     """
 
+    record_offsets: bool = False
+
     def __init__(
         self,
         split_by: Literal["word", "sentence", "page", "passage", "token"] = "word",
         chunk_size: int = DEFAULT_CHUNK_SIZE,
         chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
         batch_size: int = 1000,
+        record_offsets: bool = False,
     ):
         """
         Initializes the TextSplitter with the specified parameters for text splitting.
@@ -174,6 +207,8 @@ class TextSplitter(Component):
             chunk_overlap (int): The number of characters of overlap between chunks. Must be non-negative
                                 and less than chunk_size.
             batch_size (int): The size of documents to process in each batch.
+            record_offsets (bool): Add the "start_offset" and "end_offset" of each chunk in the text of its
+                                parent document to the chunk meta_data, for citations. Defaults to False.
         Raises:
             ValueError: If the provided split_by is not supported, chunk_size is not greater than 0,
                         or chunk_overlap is not valid as per the given conditions.
@@ -204,6 +239,7 @@ class TextSplitter(Component):
         self.chunk_overlap = chunk_overlap
 
         self.batch_size = batch_size
+        self.record_offsets = record_offsets
 
         log.info(
             f"Initialized TextSplitter with split_by={self.split_by}, chunk_size={self.chunk_size}, chunk_overlap={self.chunk_overlap}, batch_size={self.batch_size}"
@@ -224,15 +260,170 @@ class TextSplitter(Component):
         log.info(
             f"Splitting text with split_by: {self.split_by}, chunk_size: {self.chunk_size}, chunk_overlap: {self.chunk_overlap}"
         )
-        separator = SEPARATORS[self.split_by]
-        splits = self._split_text_into_units(text, separator)
-        log.info(f"Text split into {len(splits)} parts.")
-        chunks = self._merge_units_to_chunks(
-            splits, self.chunk_size, self.chunk_overlap, separator
-        )
-        log.info(f"Text merged into {len(chunks)} chunks.")
+        chunks = self._split_with_offsets(text)
+        log.info(f"Text split into {len(chunks)} chunks.")
+        return [chunk for chunk, _, _, _ in chunks]
+
+    def _split_with_offsets(self, text: str) -> List[ChunkSpan]:
+        r"""Split the text into chunks in one pass, each chunk is sliced from the text by the offsets of its units.
+
+        The window of ``chunk_size`` units moves by ``chunk_size - chunk_overlap`` units. The chunks
+        keep the separator after their last unit, except the last chunk which runs to the end of the text.
+        For "token", the text is encoded once and only the offsets of the window boundaries are computed.
+        """
+        is_token = self.split_by == "token"
+        if is_token:
+            units = tokenizer.encode(text)
+        else:
+            units = text.split(SEPARATORS[self.split_by])
+        num_units = len(units)
+        step = self.chunk_size - self.chunk_overlap
+        windows = []
+        idx = 0
+        for idx in range(0, num_units, step):
+            # the window reaching the last unit is the last chunk
+            if idx + self.chunk_size >= num_units:
+                break
+            windows.append((idx, idx + self.chunk_size))
+        if idx < num_units:
+            windows.append((idx, num_units))
+
+        positions = sorted({position for window in windows for position in window})
+        if is_token:
+            offsets = tokenizer.char_offsets(text, units, positions)
+        else:
+            # a unit spans from its start to the start of the next one, its separator included
+            separator_len = len(SEPARATORS[self.split_by])
+            unit_lengths = [0]
+            unit_lengths.extend(accumulate(map(len, units)))
+            offsets = [
+                unit_lengths[position] + position * separator_len
+                for position in positions
+            ]
+        offset_of = dict(zip(positions, offsets))
+
+        chunks = []
+        for start_unit, end_unit in windows:
+            start = offset_of[start_unit]
+            end = offset_of[end_unit] if end_unit < num_units else len(text)
+            if end_unit == num_units and start >= len(text):
+                continue  # an empty last chunk
+            # the number of units is the number of tokens only for "token"
+            num_tokens = end_unit - start_unit if is_token else None
+            chunks.append((text[start:end], start, end, num_tokens))
         return chunks
 
+    def _check_document(self, doc: Document):
+        if not isinstance(doc, Document):
+            log.error(
+                f"Each item in documents should be an instance of Document, but got {type(doc).__name__}."
+            )
+            raise TypeError(
+                f"Each item in documents should be an instance of Document, but got {type(doc).__name__}."
+            )
+
+        if doc.text is None:
+            log.error(f"Text should not be None. Doc id: {doc.id}")
+            raise ValueError(f"Text should not be None. Doc id: {doc.id}")
+
+    def _to_chunk_documents(
+        self, doc: Document, chunks: List[ChunkSpan]
+    ) -> List[Document]:
+        r"""Create the chunk documents of ``doc``, they share one copy of its meta_data.
+
+        With ``record_offsets``, each chunk gets its own copy with its offsets instead.
+        """
+        meta_data = deepcopy(doc.meta_data)
+        chunk_docs = []
+        for i, (txt, start, end, num_tokens) in enumerate(chunks):
+            chunk_meta_data = meta_data
+            if self.record_offsets:
+                chunk_meta_data = dict(meta_data or {})
+                chunk_meta_data["start_offset"] = start
+                chunk_meta_data["end_offset"] = end
+            chunk_docs.append(
+                Document(
+                    text=txt,
+                    meta_data=chunk_meta_data,
+                    parent_doc_id=f"{doc.id}",
+                    order=i,
+                    vector=[],
+                    estimated_num_tokens=num_tokens,
+                )
+            )
+        return chunk_docs
+
+    def iter_split(
+        self,
+        documents: Iterable[Document],
+        num_workers: Optional[int] = None,
+        docs_per_task: int = 64,
+        max_pending_tasks: Optional[int] = None,
+    ) -> Iterator[Document]:
+        r"""Split the documents lazily and yield the chunks in order, for corpora that do not fit in memory.
+
+        The documents are pulled from ``documents`` one at a time, or one task at a time with
+        ``num_workers``, so only the documents being split and their chunks are held in memory.
+        The texts are not logged one by one as in :meth:`call`.
+
+        Args:
+            documents (Iterable[Document]): Any iterable of documents, such as a generator reading a file.
+            num_workers (Optional[int]): Split the texts across a process pool of this size, for the
+                CPU-heavy token splitting. Defaults to None, splitting in this process.
+            docs_per_task (int): The number of documents per task sent to a worker. Defaults to 64.
+            max_pending_tasks (Optional[int]): The maximum number of tasks submitted but not yet yielded,
+                which bounds the memory. Defaults to None, twice ``num_workers``.
+
+        Example:
+
+        .. code-block:: python
+
+            def read_documents(path):
+                with open(path) as f:
+                    for line in f:
+                        yield Document(**json.loads(line))
+
+            splitter = TextSplitter(split_by="token", chunk_size=512, chunk_overlap=64)
+            for chunk in splitter.iter_split(read_documents("dump.jsonl"), num_workers=8):
+                write_chunk(chunk)
+        """
+        if num_workers is None or num_workers <= 1:
+            for doc in documents:
+                self._check_document(doc)
+                yield from self._to_chunk_documents(
+                    doc, self._split_with_offsets(doc.text)
+                )
+            return
+
+        max_pending_tasks = max_pending_tasks or 2 * num_workers
+        pending: deque = deque()  # (documents, future) in the input order
+        split_texts = partial(_split_texts, self)
+
+        def batches() -> Iterator[List[Document]]:
+            batch = []
+            for doc in documents:
+                self._check_document(doc)
+                batch.append(doc)
+                if len(batch) == docs_per_task:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            for batch in batches():
+                if len(pending) >= max_pending_tasks:
+                    yield from self._collect_task(*pending.popleft())
+                pending.append(
+                    (batch, executor.submit(split_texts, [doc.text for doc in batch]))
+                )
+            while pending:
+                yield from self._collect_task(*pending.popleft())
+
+    def _collect_task(self, batch: List[Document], future) -> Iterator[Document]:
+        for doc, chunks in zip(batch, future.result()):
+            yield from self._to_chunk_documents(doc, chunks)
+
     def call(self, documents: DocumentSplitterInputType) -> DocumentSplitterOutputType:
         """
         Process the splitting task on a list of documents in batch.
@@ -241,16 +432,20 @@ class TextSplitter(Component):
         split_by, chunk size, and chunk overlap.
 
         Args:
-            documents (List[Document]): A list of Document objects to process.
+            documents (List[Document]): A list of Document objects to process, or a DocumentStore.
 
         Returns:
             List[Document]: A list of new Document objects, each containing a chunk of text from the original documents.
+            A DocumentStore of the chunks when the input is a DocumentStore.
 
         Raises:
             TypeError: If 'documents' is not a list or contains non-Document objects.
             ValueError: If any document's text is None.
         """
 
+        if isinstance(documents, DocumentStore):
+            return DocumentStore(self.call(list(documents)))
+
         if not isinstance(documents, list) or any(
             not isinstance(doc, Document) for doc in documents
         ):
@@ -266,89 +461,14 @@ class TextSplitter(Component):
             batch_docs = documents[start_idx : start_idx + self.batch_size]
 
             for doc in batch_docs:
-                if not isinstance(doc, Document):
-                    log.error(
-                        f"Each item in documents should be an instance of Document, but got {type(doc).__name__}."
-                    )
-                    raise TypeError(
-                        f"Each item in documents should be an instance of Document, but got {type(doc).__name__}."
-                    )
-
-                if doc.text is None:
-                    log.error(f"Text should not be None. Doc id: {doc.id}")
-                    raise ValueError(f"Text should not be None. Doc id: {doc.id}")
-
-                text_splits = self.split_text(doc.text)
-                meta_data = deepcopy(doc.meta_data)
-
-                split_docs.extend(
-                    [
-                        Document(
-                            text=txt,
-                            meta_data=meta_data,
-                            parent_doc_id=f"{doc.id}",
-                            order=i,
-                            vector=[],
-                        )
-                        for i, txt in enumerate(text_splits)
-                    ]
-                )
+                self._check_document(doc)
+                chunks = self._split_with_offsets(doc.text)
+                split_docs.extend(self._to_chunk_documents(doc, chunks))
         log.info(
             f"Processed {len(documents)} documents into {len(split_docs)} split documents."
         )
         return split_docs
 
-    def _split_text_into_units(self, text: str, separator: str) -> List[str]:
-        """Split text based on the specified separator."""
-        if self.split_by == "token":
-            splits = tokenizer.encode(text)
-        else:
-            splits = text.split(separator)
-        log.info(f"Text split by '{separator}' into {len(splits)} parts.")
-        return splits
-
-    def _merge_units_to_chunks(
-        self, splits: List[str], chunk_size: int, chunk_overlap: int, separator: str
-    ) -> List[str]:
-        """
-        Merge split text chunks based on the specified chunk size and overlap.
-        """
-        chunks = []
-        # we use a window to get the text for each trunk, the window size is chunk_size, step is chunk_size - chunk_overlap
-        step = chunk_size - chunk_overlap
-        idx = 0
-
-        for idx in range(0, len(splits), step):
-            # 1. if the window exceeds the list of splitted string, break and process the last chunk
-            # 2. if the window ends exactly the same with the splits, then break and treat the splits[idx:len(splits)] as the last chunk
-            if idx + chunk_size >= len(splits):
-                break
-            current_splits = splits[idx : idx + chunk_size]
-            # add the separator between each unit and merge the string
-            # this won't be the last chunk, so we need to add the separator at the end
-            if self.split_by == "token":
-                chunk = current_splits  # if token, then keep the original form
-            else:
-                chunk = separator.join(current_splits) + separator
-            chunks.append(chunk)
-
-        if idx < len(splits):
-            if self.split_by == "token":
-                last_chunk = splits[idx:]  # if token, then keep the original form
-            else:
-                last_chunk = separator.join(
-                    splits[idx:]
-                )  # if not token, then join into string
-            if len(last_chunk) > 0:
-                chunks.append(last_chunk)
-
-        if self.split_by == "token":
-            # decode each chunk here
-            chunks = [tokenizer.decode(chunk) for chunk in chunks]
-
-        log.info(f"Merged into {len(chunks)} chunks.")
-        return chunks
-
     def _extra_repr(self) -> str:
         s = f"split_by={self.split_by}, chunk_size={self.chunk_size}, chunk_overlap={self.chunk_overlap}"
         return s
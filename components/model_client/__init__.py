@@ -5,6 +5,11 @@ from adalflow.utils.lazy_import import (
     LazyImport,
     OptionalPackages,
 )
+from adalflow.components.model_client.http_pool import (
+    HttpPoolConfig,
+    SharedClientRegistry,
+    get_shared_client_registry,
+)
 
 # NOTE: Do not subclass lazy imported classes, it will cause issues with the lazy import mechanism.
 # Instead, directly import the class from its specif module and use it.
@@ -76,6 +81,9 @@ __all__ = [
     "GroqAPIClient",
     "OpenAIClient",
     "GoogleGenAIClient",
+    "HttpPoolConfig",
+    "SharedClientRegistry",
+    "get_shared_client_registry",
 ]
 
 for name in __all__:
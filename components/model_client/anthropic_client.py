@@ -6,7 +6,8 @@ import backoff
 import logging
 
 
-from adalflow.core.model_client import ModelClient
+from adalflow.core.model_client import ModelClient, report_backoff_to_scheduler
+from adalflow.components.model_client.http_pool import HttpPoolConfig, get_sdk_client
 from adalflow.core.types import ModelType, CompletionUsage, GeneratorOutput
 
 # optional import
@@ -53,14 +54,31 @@ class AnthropicAPIClient(ModelClient):
     - https://docs.anthropic.com/en/docs/about-claude/models
     """
 
+    _base_url: Optional[str] = None
+    _http_pool: Optional[HttpPoolConfig] = None
+    _share_http_client: bool = True
+
     def __init__(
         self,
         api_key: Optional[str] = None,
         chat_completion_parser: Callable[[Message], Any] = None,
+        base_url: Optional[str] = None,
+        http_pool: Optional[HttpPoolConfig] = None,
+        share_http_client: bool = True,
     ):
-        r"""It is recommended to set the ANTHROPIC_API_KEY environment variable instead of passing it as an argument."""
+        r"""It is recommended to set the ANTHROPIC_API_KEY environment variable instead of passing it as an argument.
+
+        Args:
+            base_url (Optional[str], optional): The base url of the API. Defaults to None, the ANTHROPIC_BASE_URL environment variable or the SDK default.
+            http_pool (Optional[HttpPoolConfig], optional): The connection pool settings: pool size, keep-alive and HTTP/2. Defaults to None, ``HttpPoolConfig()``.
+            share_http_client (bool, optional): Share the SDK clients, and so the connection pool, with the other clients of the same provider,
+                base url and credentials in the process. Defaults to True.
+        """
         super().__init__()
         self._api_key = api_key
+        self._base_url = base_url
+        self._http_pool = http_pool
+        self._share_http_client = share_http_client
         self.sync_client = self.init_sync_client()
         self.async_client = None  # only initialize if the async call is called
         self.tested_llm_models = ["claude-3-opus-20240229"]
@@ -73,13 +91,27 @@ class AnthropicAPIClient(ModelClient):
         api_key = self._api_key or os.getenv("ANTHROPIC_API_KEY")
         if not api_key:
             raise ValueError("Environment variable ANTHROPIC_API_KEY must be set")
-        return anthropic.Anthropic(api_key=api_key)
+        return self._get_sdk_client(anthropic.Anthropic, api_key, is_async=False)
 
     def init_async_client(self):
         api_key = self._api_key or os.getenv("ANTHROPIC_API_KEY")
         if not api_key:
             raise ValueError("Environment variable ANTHROPIC_API_KEY must be set")
-        return anthropic.AsyncAnthropic(api_key=api_key)
+        return self._get_sdk_client(anthropic.AsyncAnthropic, api_key, is_async=True)
+
+    def _get_sdk_client(self, client_cls: type, api_key: str, is_async: bool):
+        base_url = self._base_url or os.getenv("ANTHROPIC_BASE_URL")
+        return get_sdk_client(
+            "anthropic",
+            base_url,
+            api_key,
+            lambda http_client: client_cls(
+                api_key=api_key, base_url=base_url, http_client=http_client
+            ),
+            is_async=is_async,
+            pool_config=self._http_pool,
+            share=self._share_http_client,
+        )
 
     def parse_chat_completion(self, completion: Message) -> GeneratorOutput:
         log.debug(f"completion: {completion}")
@@ -138,6 +170,7 @@ class AnthropicAPIClient(ModelClient):
             BadRequestError,
         ),
         max_time=5,
+        on_backoff=report_backoff_to_scheduler,
     )
     def call(self, api_kwargs: Dict = {}, model_type: ModelType = ModelType.UNDEFINED):
         """
@@ -160,6 +193,7 @@ class AnthropicAPIClient(ModelClient):
             BadRequestError,
         ),
         max_time=5,
+        on_backoff=report_backoff_to_scheduler,
     )
     async def acall(
         self, api_kwargs: Dict = {}, model_type: ModelType = ModelType.UNDEFINED
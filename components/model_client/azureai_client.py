@@ -12,6 +12,8 @@ from typing import (
     Generator,
     Union,
     Literal,
+    Iterator,
+    AsyncIterator,
 )
 import re
 
@@ -38,7 +40,7 @@ for name, module in zip(azure_module_names, azure_modules):
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 
 # from azure.core.credentials import AccessToken
-from openai import AzureOpenAI, AsyncAzureOpenAI, Stream
+from openai import AzureOpenAI, AsyncAzureOpenAI, Stream, AsyncStream
 from openai import (
     APITimeoutError,
     InternalServerError,
@@ -52,7 +54,8 @@ from openai.types import (
 )
 from openai.types.chat import ChatCompletionChunk, ChatCompletion
 
-from adalflow.core.model_client import ModelClient
+from adalflow.core.model_client import ModelClient, report_backoff_to_scheduler
+from adalflow.components.model_client.http_pool import HttpPoolConfig, get_sdk_client
 from adalflow.core.types import (
     ModelType,
     EmbedderOutput,
@@ -192,6 +195,9 @@ class AzureAIClient(ModelClient):
     - [OpenAI API Documentation](https://platform.openai.com/docs/guides/text-generation)
     """
 
+    _http_pool: Optional[HttpPoolConfig] = None
+    _share_http_client: bool = True
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -200,6 +206,8 @@ class AzureAIClient(ModelClient):
         credential: Optional[DefaultAzureCredential] = None,
         chat_completion_parser: Callable[[Completion], Any] = None,
         input_type: Literal["text", "messages"] = "text",
+        http_pool: Optional[HttpPoolConfig] = None,
+        share_http_client: bool = True,
     ):
         r"""It is recommended to set the API_KEY into the  environment variable instead of passing it as an argument.
 
@@ -213,6 +221,9 @@ class AzureAIClient(ModelClient):
             credential: Azure AD credential for token-based authentication.
             chat_completion_parser: Function to parse chat completions.
             input_type: Input format, either "text" or "messages".
+            http_pool: The connection pool settings: pool size, keep-alive and HTTP/2. Defaults to ``HttpPoolConfig()``.
+            share_http_client: Share the SDK clients, and so the connection pool, with the other clients of the same
+                endpoint, api version and credentials in the process. Defaults to True.
 
         """
         super().__init__()
@@ -223,6 +234,8 @@ class AzureAIClient(ModelClient):
         self._apiversion = api_version
         self._azure_endpoint = azure_endpoint
         self._credential = credential
+        self._http_pool = http_pool
+        self._share_http_client = share_http_client
         self.sync_client = self.init_sync_client()
         self.async_client = None  # only initialize if the async call is called
         self.chat_completion_parser = (
@@ -231,6 +244,12 @@ class AzureAIClient(ModelClient):
         self._input_type = input_type
 
     def init_sync_client(self):
+        return self._get_sdk_client(AzureOpenAI, is_async=False)
+
+    def init_async_client(self):
+        return self._get_sdk_client(AsyncAzureOpenAI, is_async=True)
+
+    def _get_sdk_client(self, client_cls: type, is_async: bool):
         api_key = self._api_key or os.getenv("AZURE_OPENAI_API_KEY")
         azure_endpoint = self._azure_endpoint or os.getenv("AZURE_OPENAI_ENDPOINT")
         api_version = self._apiversion or os.getenv("AZURE_OPENAI_VERSION")
@@ -241,52 +260,46 @@ class AzureAIClient(ModelClient):
             raise ValueError("Environment variable AZURE_OPENAI_VERSION must be set")
 
         if api_key:
-            return AzureOpenAI(
-                api_key=api_key, azure_endpoint=azure_endpoint, api_version=api_version
-            )
-        elif self._credential:
-            # credential = DefaultAzureCredential()
-            token_provider = get_bearer_token_provider(
-                DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-            )
-            return AzureOpenAI(
-                azure_ad_token_provider=token_provider,
-                azure_endpoint=azure_endpoint,
-                api_version=api_version,
-            )
-        else:
-            raise ValueError(
-                "Environment variable AZURE_OPENAI_API_KEY must be set or credential must be provided"
-            )
+            credentials = api_key
 
-    def init_async_client(self):
-        api_key = self._api_key or os.getenv("AZURE_OPENAI_API_KEY")
-        azure_endpoint = self._azure_endpoint or os.getenv("AZURE_OPENAI_ENDPOINT")
-        api_version = self._apiversion or os.getenv("AZURE_OPENAI_VERSION")
-        # credential = self._credential or DefaultAzureCredential()
-        if not azure_endpoint:
-            raise ValueError("Environment variable AZURE_OPENAI_ENDPOINT must be set")
-        if not api_version:
-            raise ValueError("Environment variable AZURE_OPENAI_VERSION must be set")
+            def factory(http_client):
+                return client_cls(
+                    api_key=api_key,
+                    azure_endpoint=azure_endpoint,
+                    api_version=api_version,
+                    http_client=http_client,
+                )
 
-        if api_key:
-            return AsyncAzureOpenAI(
-                api_key=api_key, azure_endpoint=azure_endpoint, api_version=api_version
-            )
         elif self._credential:
-            # credential = DefaultAzureCredential()
-            token_provider = get_bearer_token_provider(
-                DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-            )
-            return AsyncAzureOpenAI(
-                azure_ad_token_provider=token_provider,
-                azure_endpoint=azure_endpoint,
-                api_version=api_version,
-            )
+            # every client uses a new DefaultAzureCredential, so they share the same key
+            credentials = "azure_ad_token"
+
+            def factory(http_client):
+                token_provider = get_bearer_token_provider(
+                    DefaultAzureCredential(),
+                    "https://cognitiveservices.azure.com/.default",
+                )
+                return client_cls(
+                    azure_ad_token_provider=token_provider,
+                    azure_endpoint=azure_endpoint,
+                    api_version=api_version,
+                    http_client=http_client,
+                )
+
         else:
             raise ValueError(
                 "Environment variable AZURE_OPENAI_API_KEY must be set or credential must be provided"
             )
+        return get_sdk_client(
+            "azure",
+            azure_endpoint,
+            credentials,
+            factory,
+            is_async=is_async,
+            pool_config=self._http_pool,
+            share=self._share_http_client,
+            extra_key=api_version,
+        )
 
     # def _parse_chat_completion(self, completion: ChatCompletion) -> "GeneratorOutput":
     #     # TODO: raw output it is better to save the whole completion as a source of truth instead of just the message
@@ -305,9 +318,15 @@ class AzureAIClient(ModelClient):
         completion: Union[ChatCompletion, Generator[ChatCompletionChunk, None, None]],
     ) -> "GeneratorOutput":
         """Parse the completion, and put it into the raw_response."""
-        log.debug(f"completion: {completion}, parser: {self.chat_completion_parser}")
+        # the parser is chosen per call, a streaming call does not change it for the later calls
+        parser = (
+            handle_streaming_response
+            if isinstance(completion, Stream)
+            else self.chat_completion_parser
+        )
+        log.debug(f"completion: {completion}, parser: {parser}")
         try:
-            data = self.chat_completion_parser(completion)
+            data = parser(completion)
             usage = self.track_completion_usage(completion)
             return GeneratorOutput(
                 data=None, error=None, raw_response=data, usage=usage
@@ -316,6 +335,27 @@ class AzureAIClient(ModelClient):
             log.error(f"Error parsing the completion: {e}")
             return GeneratorOutput(data=None, error=str(e), raw_response=completion)
 
+    def parse_chat_completion_stream(
+        self, completion: Stream[ChatCompletionChunk]
+    ) -> Iterator[str]:
+        r"""Yield the content deltas of a streaming chat completion."""
+        for chunk in completion:
+            # the last chunk of a stream with usage has no choices
+            if chunk.choices:
+                delta = parse_stream_response(chunk)
+                if delta:
+                    yield delta
+
+    async def aparse_chat_completion_stream(
+        self, completion: AsyncStream[ChatCompletionChunk]
+    ) -> AsyncIterator[str]:
+        r"""Yield the content deltas of a streaming chat completion from ``acall``."""
+        async for chunk in completion:
+            if chunk.choices:
+                delta = parse_stream_response(chunk)
+                if delta:
+                    yield delta
+
     def track_completion_usage(
         self,
         completion: Union[ChatCompletion, Generator[ChatCompletionChunk, None, None]],
@@ -406,6 +446,7 @@ class AzureAIClient(ModelClient):
             BadRequestError,
         ),
         max_time=5,
+        on_backoff=report_backoff_to_scheduler,
     )
     def call(self, api_kwargs: Dict = {}, model_type: ModelType = ModelType.UNDEFINED):
         """
@@ -415,10 +456,6 @@ class AzureAIClient(ModelClient):
         if model_type == ModelType.EMBEDDER:
             return self.sync_client.embeddings.create(**api_kwargs)
         elif model_type == ModelType.LLM:
-            if "stream" in api_kwargs and api_kwargs.get("stream", False):
-                log.debug("streaming call")
-                self.chat_completion_parser = handle_streaming_response
-                return self.sync_client.chat.completions.create(**api_kwargs)
             return self.sync_client.chat.completions.create(**api_kwargs)
         else:
             raise ValueError(f"model_type {model_type} is not supported")
@@ -433,6 +470,7 @@ class AzureAIClient(ModelClient):
             BadRequestError,
         ),
         max_time=5,
+        on_backoff=report_backoff_to_scheduler,
     )
     async def acall(
         self, api_kwargs: Dict = {}, model_type: ModelType = ModelType.UNDEFINED
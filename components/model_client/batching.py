@@ -0,0 +1,214 @@
+r"""Dynamic micro-batching for local models.
+
+Concurrent callers each send a few inputs, so running one forward pass per call leaves the model
+running many small batches one after another. :class:`MicroBatcher` queues the inputs of all callers
+and runs them together in batches. A batch is cut when it reaches ``max_batch_size`` inputs or when its
+first input has waited ``max_wait_ms``. The results are then scattered back to each caller.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+log = logging.getLogger(__name__)
+
+__all__ = ["MicroBatcher"]
+
+
+class MicroBatcher:
+    __doc__ = r"""Queue single inputs from any number of threads and run them in batches on a worker thread.
+
+    When more inputs are waiting than fit in one batch, the waiting inputs are sorted by ``sort_key``,
+    such as the text length, and cut into batches of similar lengths. This reduces the padding of each batch.
+
+    Args:
+        process_batch (Callable[[List[Any]], Sequence[Any]]): Runs one batch and returns one result per input, in order.
+        max_batch_size (int): The maximum number of inputs in a batch. Defaults to 32.
+        max_wait_ms (float): How long the first input of a batch waits for more inputs, in milliseconds. Defaults to 5.0.
+        sort_key (Optional[Callable[[Any], Any]]): Sorts the waiting inputs before they are cut into batches. Defaults to None, arrival order.
+        max_pending (int): How many waiting inputs are sorted together, as a multiple of ``max_batch_size``. Defaults to 4.
+        name (str): The name of the worker thread. Defaults to "MicroBatcher".
+
+    Example:
+
+    .. code-block:: python
+
+        batcher = MicroBatcher(embed_texts, max_batch_size=64, max_wait_ms=5, sort_key=len)
+        # from many threads
+        embeddings = batcher.map(["first text", "second text"])
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        sort_key: Optional[Callable[[Any], Any]] = None,
+        max_pending: int = 4,
+        name: str = "MicroBatcher",
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max_wait_ms
+        self.sort_key = sort_key
+        self.max_pending = max(1, max_pending)
+        self._queue: "queue.Queue[Optional[Tuple[Any, Future]]]" = queue.Queue()
+        self._closed = False
+        self.reset_stats()
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item: Any) -> Future:
+        r"""Queue one input, the returned future is resolved with its result."""
+        if self._closed:
+            raise RuntimeError("The MicroBatcher is closed")
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def map(self, items: Sequence[Any]) -> List[Any]:
+        r"""Queue the inputs and wait for their results, in the input order."""
+        futures = [self.submit(item) for item in items]
+        return [future.result() for future in futures]
+
+    async def amap(self, items: Sequence[Any]) -> List[Any]:
+        r"""Async version of :meth:`map`."""
+        futures = [asyncio.wrap_future(self.submit(item)) for item in items]
+        return list(await asyncio.gather(*futures))
+
+    def _collect(
+        self, first: Tuple[Any, Future]
+    ) -> Tuple[List[Tuple[Any, Future]], bool]:
+        r"""Gather the inputs of the next batches, starting from the first waiting one."""
+        pending = [first]
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+        closed = False
+        # wait up to max_wait_ms for a full batch
+        while len(pending) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if entry is None:
+                closed = True
+                break
+            pending.append(entry)
+        # then take what is already waiting, to sort a larger window by length
+        limit = self.max_batch_size * self.max_pending
+        while not closed and len(pending) < limit:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                closed = True
+                break
+            pending.append(entry)
+        return pending, closed
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            pending, closed = self._collect(first)
+            # drop the inputs whose callers are gone
+            pending = [
+                entry for entry in pending if entry[1].set_running_or_notify_cancel()
+            ]
+            if self.sort_key is not None and len(pending) > self.max_batch_size:
+                pending.sort(key=lambda entry: self.sort_key(entry[0]))
+            for start in range(0, len(pending), self.max_batch_size):
+                self._process(pending[start : start + self.max_batch_size])
+            if closed:
+                break
+
+    def _process(self, batch: List[Tuple[Any, Future]]):
+        start = time.perf_counter()
+        try:
+            results = self.process_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"process_batch returned {len(results)} results for {len(batch)} inputs"
+                )
+        except Exception as e:
+            log.error(f"Error processing a batch of {len(batch)}: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+        self.stats["batches"] += 1
+        self.stats["items"] += len(batch)
+        self.stats["seconds"] += time.perf_counter() - start
+
+    def reset_stats(self):
+        self.stats: Dict[str, float] = {"batches": 0, "items": 0, "seconds": 0.0}
+
+    def get_stats(self) -> Dict[str, float]:
+        r"""Return the processed batches and inputs, the average batch size and the queue depth."""
+        stats = dict(self.stats)
+        stats["avg_batch_size"] = (
+            stats["items"] / stats["batches"] if stats["batches"] else 0.0
+        )
+        stats["queue_depth"] = self._queue.qsize()
+        return stats
+
+    def close(self, timeout: Optional[float] = None):
+        r"""Process the queued inputs, then stop the worker thread."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+        self._worker.join(timeout)
+
+    def __getstate__(self):
+        # the queue and the worker are process-local, only the configuration is pickled
+        return {
+            "process_batch": self.process_batch,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "sort_key": self.sort_key,
+            "max_pending": self.max_pending,
+            "name": self._worker.name,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+# Throughput benchmark on CPU, concurrent single-text requests with and without micro-batching:
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    from adalflow.components.model_client.transformers_client import (
+        TransformerEmbedder,
+    )
+
+    texts = [
+        " ".join(["micro batching"] * (1 + i % 32)) for i in range(512)
+    ]  # mixed lengths
+    for batching in [False, True]:
+        embedder = TransformerEmbedder()
+        if batching:
+            embedder.enable_micro_batching(max_batch_size=32, max_wait_ms=5)
+        embedder.infer_gte_base_embedding(texts[:8])  # warm up
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            list(
+                executor.map(
+                    lambda text: embedder.infer_gte_base_embedding(text), texts
+                )
+            )
+        seconds = time.perf_counter() - start
+        print(
+            f"micro_batching={batching}: {len(texts) / seconds:.1f} texts/s"
+            + (f", {embedder.batcher.get_stats()}" if batching else "")
+        )
+        embedder.disable_micro_batching()
@@ -2,7 +2,7 @@
 
 import json
 import os
-from typing import Dict, Optional, Any, Callable, Generator as GeneratorType
+from typing import Dict, Optional, Any, Callable, Iterator, Generator as GeneratorType
 import backoff
 import logging
 
@@ -177,6 +177,13 @@ class BedrockAPIClient(ModelClient):
             log.debug(f"Error in handle_stream_response: {e}")  # Debug print
             raise
 
+    def parse_chat_completion_stream(self, completion: dict) -> Iterator[str]:
+        r"""Yield the text deltas of a ``converse_stream`` response."""
+        for chunk in completion["stream"]:
+            delta = chunk.get("contentBlockDelta", {}).get("delta", {}).get("text")
+            if delta:
+                yield delta
+
     def parse_chat_completion(self, completion: dict) -> "GeneratorOutput":
         r"""Parse the completion, and assign it into the raw_response attribute.
 
@@ -4,7 +4,8 @@ import os
 from typing import Dict, Sequence, Optional, Any, TypeVar
 import backoff
 import logging
-from adalflow.core.model_client import ModelClient
+from adalflow.core.model_client import ModelClient, report_backoff_to_scheduler
+from adalflow.components.model_client.http_pool import HttpPoolConfig, get_sdk_client
 from adalflow.core.types import ModelType, CompletionUsage, GeneratorOutput
 
 
@@ -41,14 +42,31 @@ class GroqAPIClient(ModelClient):
     - gemma-7b-it
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    _base_url: Optional[str] = None
+    _http_pool: Optional[HttpPoolConfig] = None
+    _share_http_client: bool = True
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        http_pool: Optional[HttpPoolConfig] = None,
+        share_http_client: bool = True,
+    ):
         r"""It is recommended to set the GROQ_API_KEY environment variable instead of passing it as an argument.
 
         Args:
             api_key (Optional[str], optional): Groq API key. Defaults to None.
+            base_url (Optional[str], optional): The base url of the API. Defaults to None, the GROQ_BASE_URL environment variable or the SDK default.
+            http_pool (Optional[HttpPoolConfig], optional): The connection pool settings: pool size, keep-alive and HTTP/2. Defaults to None, ``HttpPoolConfig()``.
+            share_http_client (bool, optional): Share the SDK clients, and so the connection pool, with the other clients of the same provider,
+                base url and credentials in the process. Defaults to True.
         """
         super().__init__()
         self._api_key = api_key
+        self._base_url = base_url
+        self._http_pool = http_pool
+        self._share_http_client = share_http_client
 
         self.sync_client = self.init_sync_client()
         self.async_client = None  # only initialize if the async call is called
@@ -57,13 +75,27 @@ class GroqAPIClient(ModelClient):
         api_key = self._api_key or os.getenv("GROQ_API_KEY")
         if not api_key:
             raise ValueError("Environment variable GROQ_API_KEY must be set")
-        return Groq(api_key=api_key)
+        return self._get_sdk_client(Groq, api_key, is_async=False)
 
     def init_async_client(self):
         api_key = self._api_key or os.getenv("GROQ_API_KEY")
         if not api_key:
             raise ValueError("Environment variable GROQ_API_KEY must be set")
-        return AsyncGroq(api_key=api_key)
+        return self._get_sdk_client(AsyncGroq, api_key, is_async=True)
+
+    def _get_sdk_client(self, client_cls: type, api_key: str, is_async: bool):
+        base_url = self._base_url or os.getenv("GROQ_BASE_URL")
+        return get_sdk_client(
+            "groq",
+            base_url,
+            api_key,
+            lambda http_client: client_cls(
+                api_key=api_key, base_url=base_url, http_client=http_client
+            ),
+            is_async=is_async,
+            pool_config=self._http_pool,
+            share=self._share_http_client,
+        )
 
     def parse_chat_completion(
         self, completion: "GroqChatCompletion"
@@ -113,6 +145,7 @@ class GroqAPIClient(ModelClient):
             UnprocessableEntityError,
         ),
         max_time=5,
+        on_backoff=report_backoff_to_scheduler,
     )
     def call(self, api_kwargs: Dict = {}, model_type: ModelType = ModelType.UNDEFINED):
         assert (
@@ -133,6 +166,7 @@ class GroqAPIClient(ModelClient):
             UnprocessableEntityError,
         ),
         max_time=5,
+        on_backoff=report_backoff_to_scheduler,
     )
     async def acall(
         self, api_kwargs: Dict = {}, model_type: ModelType = ModelType.UNDEFINED
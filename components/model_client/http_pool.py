@@ -0,0 +1,319 @@
+r"""A process-wide registry of SDK clients, so that model clients with the same provider, endpoint and credentials share one HTTP connection pool.
+
+Without it, every model client instance opens its own sync and async SDK client, each with its own
+connection pool. A pipeline with 20 generators then holds 20 pools to the same host. With the registry
+they reuse one set of kept-alive connections.
+"""
+
+import asyncio
+import hashlib
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+import logging
+
+from adalflow.utils.lazy_import import safe_import, OptionalPackages
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+__all__ = [
+    "HttpPoolConfig",
+    "SharedClientRegistry",
+    "get_shared_client_registry",
+    "get_sdk_client",
+]
+
+
+@dataclass(frozen=True)
+class HttpPoolConfig:
+    __doc__ = r"""The connection pool settings of a shared httpx client.
+
+    Args:
+        max_connections (Optional[int]): The maximum number of concurrent connections. Defaults to 1000, the same as the OpenAI SDK.
+        max_keepalive_connections (Optional[int]): The maximum number of idle connections kept alive. Defaults to 100.
+        keepalive_expiry (Optional[float]): Seconds an idle connection is kept alive. Defaults to 5.0, the httpx default.
+        http2 (bool): Use HTTP/2 when the server supports it, which multiplexes the requests on fewer connections.
+            It needs the ``h2`` package, ``pip install httpx[http2]``. Defaults to False.
+        timeout (Optional[float]): The default timeout in seconds of the httpx client. Defaults to None, the SDK default.
+    """
+
+    max_connections: Optional[int] = 1000
+    max_keepalive_connections: Optional[int] = 100
+    keepalive_expiry: Optional[float] = 5.0
+    http2: bool = False
+    timeout: Optional[float] = None
+
+    def create_http_client(self, is_async: bool = False) -> Any:
+        r"""Create an ``httpx.Client``, or an ``httpx.AsyncClient`` when ``is_async``, with these settings."""
+        httpx = safe_import(
+            OptionalPackages.HTTPX.value[0], OptionalPackages.HTTPX.value[1]
+        )
+        kwargs: Dict[str, Any] = {
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            "http2": self.http2,
+            # the SDKs follow redirects with their own default clients
+            "follow_redirects": True,
+        }
+        if self.timeout is not None:
+            kwargs["timeout"] = self.timeout
+        client_cls = httpx.AsyncClient if is_async else httpx.Client
+        return client_cls(**kwargs)
+
+
+def _hash_credentials(credentials: Any) -> str:
+    # only a digest of the secret is kept in the registry key
+    return hashlib.sha256(repr(credentials).encode()).hexdigest()
+
+
+class SharedClientRegistry:
+    __doc__ = r"""Share the SDK clients of the model clients with the same key.
+
+    A key is (provider, base_url, credentials, sync or async, pool config, extra key). The first
+    :meth:`get_or_create` of a key creates an httpx client from the pool config and passes it to
+    ``factory`` to build the SDK client. The later calls with the same key return that SDK client, and so
+    share its connection pool. The registry is thread-safe, use :func:`get_shared_client_registry`
+    for the process-wide one.
+
+    An async httpx client is bound to the event loop it first runs in, so the async clients are
+    shared per running event loop and dropped with it. An async client requested outside of a running
+    loop is not shared.
+
+    Example:
+
+    .. code-block:: python
+
+        from openai import OpenAI
+
+        registry = get_shared_client_registry()
+        client = registry.get_or_create(
+            provider="openai",
+            base_url=None,
+            credentials=api_key,
+            factory=lambda http_client: OpenAI(api_key=api_key, http_client=http_client),
+        )
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple, Any] = {}
+        self._http_clients: Dict[Tuple, Any] = {}
+        # event loop -> {key: client}
+        self._loop_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def get_or_create(
+        self,
+        provider: str,
+        base_url: Optional[str],
+        credentials: Any,
+        factory: Callable[[Any], T],
+        is_async: bool = False,
+        pool_config: Optional[HttpPoolConfig] = None,
+        extra_key: Hashable = None,
+    ) -> T:
+        r"""Return the shared SDK client of the key, built with ``factory(http_client)`` on the first call.
+
+        Args:
+            provider (str): The provider name, such as "openai".
+            base_url (Optional[str]): The resolved endpoint of the API.
+            credentials (Any): The resolved credentials, such as the API key. Only its digest is kept.
+            factory (Callable[[Any], T]): Builds the SDK client on the given httpx client.
+            is_async (bool): Whether the SDK client is async. Defaults to False.
+            pool_config (Optional[HttpPoolConfig]): The pool settings. Defaults to None, ``HttpPoolConfig()``.
+            extra_key (Hashable): Any other setting the SDK client depends on, such as the api version.
+        """
+        pool_config = pool_config or HttpPoolConfig()
+        key = (
+            provider,
+            base_url,
+            _hash_credentials(credentials),
+            is_async,
+            pool_config,
+            extra_key,
+        )
+        if is_async:
+            return self._get_or_create_async(key, pool_config, factory)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                http_client = pool_config.create_http_client(is_async=is_async)
+                client = factory(http_client)
+                self._clients[key] = client
+                self._http_clients[key] = http_client
+                log.debug(f"Created a shared {provider} client for {base_url}")
+            return client
+
+    def _get_or_create_async(
+        self, key: Tuple, pool_config: HttpPoolConfig, factory: Callable[[Any], T]
+    ) -> T:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # no loop to bind the client to, it is not shared
+            return factory(pool_config.create_http_client(is_async=True))
+        with self._lock:
+            loop_clients = self._loop_clients.setdefault(loop, {})
+            client = loop_clients.get(key)
+            if client is None:
+                client = factory(pool_config.create_http_client(is_async=True))
+                loop_clients[key] = client
+                log.debug(f"Created a shared async {key[0]} client for {key[1]}")
+            return client
+
+    def close(self):
+        r"""Close the pools of the sync clients and forget all the clients.
+
+        The async httpx clients are only dropped, they have to be closed in their event loop.
+        """
+        with self._lock:
+            for http_client in self._http_clients.values():
+                if hasattr(http_client, "close"):
+                    http_client.close()
+            self._clients.clear()
+            self._http_clients.clear()
+            self._loop_clients.clear()
+
+    def __len__(self) -> int:
+        return len(self._clients) + sum(
+            len(clients) for clients in self._loop_clients.values()
+        )
+
+
+_shared_client_registry = SharedClientRegistry()
+
+
+def get_shared_client_registry() -> SharedClientRegistry:
+    r"""Return the process-wide :class:`SharedClientRegistry`."""
+    return _shared_client_registry
+
+
+def get_sdk_client(
+    provider: str,
+    base_url: Optional[str],
+    credentials: Any,
+    factory: Callable[[Any], T],
+    is_async: bool = False,
+    pool_config: Optional[HttpPoolConfig] = None,
+    share: bool = True,
+    extra_key: Hashable = None,
+) -> T:
+    r"""Get the SDK client of a model client, shared in the process-wide registry when ``share`` is on.
+
+    Otherwise a new SDK client is built, on its own httpx client when ``pool_config`` is set and on the
+    SDK default one when it is None, ``factory(None)``. See :meth:`SharedClientRegistry.get_or_create` for the arguments.
+    """
+    if share:
+        return _shared_client_registry.get_or_create(
+            provider,
+            base_url,
+            credentials,
+            factory,
+            is_async=is_async,
+            pool_config=pool_config,
+            extra_key=extra_key,
+        )
+    if pool_config is None:
+        return factory(None)
+    return factory(pool_config.create_http_client(is_async=is_async))
+
+
+# Benchmark of the connection reuse of the model clients against a local mock server:
+if __name__ == "__main__":
+    import json
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from adalflow.core.types import ModelType
+    from adalflow.components.model_client.openai_client import OpenAIClient
+
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        connections = set()
+
+        def do_POST(self):
+            MockHandler.connections.add(self.client_address)
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            body = json.dumps(
+                {
+                    "id": "chatcmpl-mock",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": "mock",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": "ok"},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": 1,
+                        "completion_tokens": 1,
+                        "total_tokens": 2,
+                    },
+                }
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    api_kwargs = {"model": "mock", "messages": [{"role": "user", "content": "hi"}]}
+    num_generators, num_requests = 20, 10
+
+    def run(share: bool) -> Tuple[float, int]:
+        MockHandler.connections.clear()
+        _shared_client_registry.close()
+        clients = [
+            OpenAIClient(api_key="key", base_url=base_url, share_http_client=share)
+            for _ in range(num_generators)
+        ]
+        start = time.perf_counter()
+        for _ in range(num_requests):
+            for client in clients:
+                client.call(api_kwargs=api_kwargs, model_type=ModelType.LLM)
+        return time.perf_counter() - start, len(MockHandler.connections)
+
+    async def arun(clients) -> None:
+        for _ in range(num_requests):
+            await asyncio.gather(
+                *(
+                    client.acall(api_kwargs=api_kwargs, model_type=ModelType.LLM)
+                    for client in clients
+                )
+            )
+
+    for name, share in [("one pool per client", False), ("shared pool", True)]:
+        seconds, connections = run(share)
+        print(
+            f"{name}: {num_generators * num_requests} requests, {connections} connections, {seconds:.3f}s"
+        )
+
+    # the shared async clients are bound to their event loop, a second loop gets its own
+    for run_idx in range(2):
+        clients = [
+            OpenAIClient(api_key="key", base_url=base_url)
+            for _ in range(num_generators)
+        ]
+        MockHandler.connections.clear()
+        start = time.perf_counter()
+        asyncio.run(arun(clients))
+        print(
+            f"async shared pool, event loop {run_idx}: {num_generators * num_requests} requests, "
+            f"{len(MockHandler.connections)} connections, {time.perf_counter() - start:.3f}s"
+        )
+    _shared_client_registry.close()
+    server.shutdown()
@@ -10,6 +10,8 @@ from typing import (
     Type,
     Generator as GeneratorType,
     Union,
+    Iterator,
+    AsyncIterator,
 )
 import backoff
 import logging
@@ -193,6 +195,22 @@ class OllamaClient(ModelClient):
         else:
             return parse_generate_response(completion)
 
+    def parse_chat_completion_stream(self, completion: GeneratorType) -> Iterator[str]:
+        r"""Yield the response deltas of a streaming generate call."""
+        for chunk in completion:
+            delta = chunk["response"] if "response" in chunk else None
+            if delta:
+                yield delta
+
+    async def aparse_chat_completion_stream(
+        self, completion: AsyncIterator[Dict[str, Any]]
+    ) -> AsyncIterator[str]:
+        r"""Yield the response deltas of a streaming generate call from ``acall``."""
+        async for chunk in completion:
+            delta = chunk["response"] if "response" in chunk else None
+            if delta:
+                yield delta
+
     def parse_embedding_response(
         self, response: Dict[str, List[float]]
     ) -> EmbedderOutput:
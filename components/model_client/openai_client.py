@@ -13,6 +13,8 @@ from typing import (
     Generator,
     Union,
     Literal,
+    Iterator,
+    AsyncIterator,
 )
 import re
 
@@ -25,7 +27,7 @@ from adalflow.utils.lazy_import import safe_import, OptionalPackages
 
 openai = safe_import(OptionalPackages.OPENAI.value[0], OptionalPackages.OPENAI.value[1])
 
-from openai import OpenAI, AsyncOpenAI, Stream
+from openai import OpenAI, AsyncOpenAI, Stream, AsyncStream
 from openai import (
     APITimeoutError,
     InternalServerError,
@@ -40,7 +42,8 @@ from openai.types import (
 )
 from openai.types.chat import ChatCompletionChunk, ChatCompletion
 
-from adalflow.core.model_client import ModelClient
+from adalflow.core.model_client import ModelClient, report_backoff_to_scheduler
+from adalflow.components.model_client.http_pool import HttpPoolConfig, get_sdk_client
 from adalflow.core.types import (
     ModelType,
     EmbedderOutput,
@@ -127,6 +130,10 @@ class OpenAIClient(ModelClient):
         api_key (Optional[str], optional): OpenAI API key. Defaults to None.
         chat_completion_parser (Callable[[Completion], Any], optional): A function to parse the chat completion to a str. Defaults to None.
             Default is `get_first_message_content`.
+        base_url (Optional[str], optional): The base url of the API. Defaults to None, the OPENAI_BASE_URL environment variable or the SDK default.
+        http_pool (Optional[HttpPoolConfig], optional): The connection pool settings: pool size, keep-alive and HTTP/2. Defaults to None, ``HttpPoolConfig()``.
+        share_http_client (bool, optional): Share the SDK clients, and so the connection pool, with the other clients of the same provider,
+            base url and credentials in the process. Defaults to True.
 
     References:
         - Embeddings models: https://platform.openai.com/docs/guides/embeddings
@@ -136,11 +143,18 @@ class OpenAIClient(ModelClient):
         - OpenAI docs: https://platform.openai.com/docs/introduction
     """
 
+    _base_url: Optional[str] = None
+    _http_pool: Optional[HttpPoolConfig] = None
+    _share_http_client: bool = True
+
     def __init__(
         self,
         api_key: Optional[str] = None,
         chat_completion_parser: Callable[[Completion], Any] = None,
         input_type: Literal["text", "messages"] = "text",
+        base_url: Optional[str] = None,
+        http_pool: Optional[HttpPoolConfig] = None,
+        share_http_client: bool = True,
     ):
         r"""It is recommended to set the OPENAI_API_KEY environment variable instead of passing it as an argument.
 
@@ -149,6 +163,9 @@ class OpenAIClient(ModelClient):
         """
         super().__init__()
         self._api_key = api_key
+        self._base_url = base_url
+        self._http_pool = http_pool
+        self._share_http_client = share_http_client
         self.sync_client = self.init_sync_client()
         self.async_client = None  # only initialize if the async call is called
         self.chat_completion_parser = (
@@ -160,13 +177,27 @@ class OpenAIClient(ModelClient):
         api_key = self._api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("Environment variable OPENAI_API_KEY must be set")
-        return OpenAI(api_key=api_key)
+        return self._get_sdk_client(OpenAI, api_key, is_async=False)
 
     def init_async_client(self):
         api_key = self._api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("Environment variable OPENAI_API_KEY must be set")
-        return AsyncOpenAI(api_key=api_key)
+        return self._get_sdk_client(AsyncOpenAI, api_key, is_async=True)
+
+    def _get_sdk_client(self, client_cls: type, api_key: str, is_async: bool):
+        base_url = self._base_url or os.getenv("OPENAI_BASE_URL")
+        return get_sdk_client(
+            "openai",
+            base_url,
+            api_key,
+            lambda http_client: client_cls(
+                api_key=api_key, base_url=base_url, http_client=http_client
+            ),
+            is_async=is_async,
+            pool_config=self._http_pool,
+            share=self._share_http_client,
+        )
 
     # def _parse_chat_completion(self, completion: ChatCompletion) -> "GeneratorOutput":
     #     # TODO: raw output it is better to save the whole completion as a source of truth instead of just the message
@@ -185,9 +216,15 @@ class OpenAIClient(ModelClient):
         completion: Union[ChatCompletion, Generator[ChatCompletionChunk, None, None]],
     ) -> "GeneratorOutput":
         """Parse the completion, and put it into the raw_response."""
-        log.debug(f"completion: {completion}, parser: {self.chat_completion_parser}")
+        # the parser is chosen per call, a streaming call does not change it for the later calls
+        parser = (
+            handle_streaming_response
+            if isinstance(completion, Stream)
+            else self.chat_completion_parser
+        )
+        log.debug(f"completion: {completion}, parser: {parser}")
         try:
-            data = self.chat_completion_parser(completion)
+            data = parser(completion)
             usage = self.track_completion_usage(completion)
             return GeneratorOutput(
                 data=None, error=None, raw_response=data, usage=usage
@@ -196,6 +233,27 @@ class OpenAIClient(ModelClient):
             log.error(f"Error parsing the completion: {e}")
             return GeneratorOutput(data=None, error=str(e), raw_response=completion)
 
+    def parse_chat_completion_stream(
+        self, completion: Stream[ChatCompletionChunk]
+    ) -> Iterator[str]:
+        r"""Yield the content deltas of a streaming chat completion."""
+        for chunk in completion:
+            # the last chunk of a stream with usage has no choices
+            if chunk.choices:
+                delta = parse_stream_response(chunk)
+                if delta:
+                    yield delta
+
+    async def aparse_chat_completion_stream(
+        self, completion: AsyncStream[ChatCompletionChunk]
+    ) -> AsyncIterator[str]:
+        r"""Yield the content deltas of a streaming chat completion from ``acall``."""
+        async for chunk in completion:
+            if chunk.choices:
+                delta = parse_stream_response(chunk)
+                if delta:
+                    yield delta
+
     def track_completion_usage(
         self,
         completion: Union[ChatCompletion, Generator[ChatCompletionChunk, None, None]],
@@ -356,6 +414,7 @@ class OpenAIClient(ModelClient):
             BadRequestError,
         ),
         max_time=5,
+        on_backoff=report_backoff_to_scheduler,
     )
     def call(self, api_kwargs: Dict = {}, model_type: ModelType = ModelType.UNDEFINED):
         """
@@ -365,10 +424,6 @@ class OpenAIClient(ModelClient):
         if model_type == ModelType.EMBEDDER:
             return self.sync_client.embeddings.create(**api_kwargs)
         elif model_type == ModelType.LLM:
-            if "stream" in api_kwargs and api_kwargs.get("stream", False):
-                log.debug("streaming call")
-                self.chat_completion_parser = handle_streaming_response
-                return self.sync_client.chat.completions.create(**api_kwargs)
             return self.sync_client.chat.completions.create(**api_kwargs)
         elif model_type == ModelType.IMAGE_GENERATION:
             # Determine which image API to call based on the presence of image/mask
@@ -396,6 +451,7 @@ class OpenAIClient(ModelClient):
             BadRequestError,
         ),
         max_time=5,
+        on_backoff=report_backoff_to_scheduler,
     )
     async def acall(
         self, api_kwargs: Dict = {}, model_type: ModelType = ModelType.UNDEFINED
@@ -1,15 +1,19 @@
 """Huggingface transformers ModelClient integration."""
 
-from typing import Any, Dict, Union, List, Optional, Sequence
+from typing import Any, Dict, Union, List, Optional, Sequence, Tuple
+import asyncio
 import logging
-from functools import lru_cache
+from functools import lru_cache, partial
 import re
 import warnings
 
+import numpy as np
+
 
 from adalflow.core.model_client import ModelClient
 from adalflow.core.types import GeneratorOutput, ModelType, Embedding, EmbedderOutput
-from adalflow.core.functional import get_top_k_indices_scores
+from adalflow.core.functional import get_top_k_indices_scores, normalize_rows
+from adalflow.components.model_client.batching import MicroBatcher
 
 # optional import
 from adalflow.utils.lazy_import import safe_import, OptionalPackages
@@ -59,9 +63,13 @@ class TransformerEmbedder:
     References:
     - transformers: https://huggingface.co/docs/transformers/en/index
     - thenlper/gte-base model:https://huggingface.co/thenlper/gte-base
+
+    With :meth:`enable_micro_batching`, the texts of concurrent calls are embedded together in batches
+    by a :class:`MicroBatcher<components.model_client.batching.MicroBatcher>`.
     """
 
     models: Dict[str, type] = {}
+    batcher: Optional[MicroBatcher] = None
 
     def __init__(self, model_name: Optional[str] = "thenlper/gte-base"):
         super().__init__()
@@ -69,6 +77,22 @@ class TransformerEmbedder:
         if model_name is not None:
             self.init_model(model_name=model_name)
 
+    def enable_micro_batching(self, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        r"""Batch the texts of concurrent calls, grouped by ``max_batch_size`` or ``max_wait_ms`` and sorted by length."""
+        self.disable_micro_batching()
+        self.batcher = MicroBatcher(
+            self._embed_texts,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            sort_key=len,
+            name="TransformerEmbedderBatcher",
+        )
+
+    def disable_micro_batching(self):
+        if self.batcher is not None:
+            self.batcher.close()
+            self.batcher = None
+
     @lru_cache(None)
     def init_model(self, model_name: str):
         try:
@@ -87,26 +111,35 @@ class TransformerEmbedder:
         input=Union[str, List[str]],
         tolist: bool = True,
     ):
+        if isinstance(input, str):
+            input = [input]
+        if self.batcher is not None:
+            embeddings = np.stack(self.batcher.map(input))
+        else:
+            embeddings = self._embed_texts(input)
+        if tolist:
+            return embeddings.tolist()
+        return torch.from_numpy(embeddings)
+
+    def _embed_texts(self, texts: List[str]) -> np.ndarray:
+        r"""Embed the texts in one forward pass, one normalized float32 row per text."""
         model = self.models.get("thenlper/gte-base", None)
         if model is None:
             # initialize the model
             self.init_model("thenlper/gte-base")
+            model = self.model
 
-        if isinstance(input, str):
-            input = [input]
         # Tokenize the input texts
         batch_dict = self.tokenizer(
-            input, max_length=512, padding=True, truncation=True, return_tensors="pt"
+            texts, max_length=512, padding=True, truncation=True, return_tensors="pt"
         )
-        outputs = model(**batch_dict)
-        embeddings = average_pool(
-            outputs.last_hidden_state, batch_dict["attention_mask"]
-        )
-        # (Optionally) normalize embeddings
-        embeddings = F.normalize(embeddings, p=2, dim=1)
-        if tolist:
-            embeddings = embeddings.tolist()
-        return embeddings
+        with torch.inference_mode():
+            outputs = model(**batch_dict)
+            embeddings = average_pool(
+                outputs.last_hidden_state, batch_dict["attention_mask"]
+            )
+        # (Optionally) normalize embeddings, in place on the float32 cpu array
+        return normalize_rows(embeddings.cpu().float().numpy())
 
     def __call__(self, **kwargs):
         if "model" not in kwargs:
@@ -150,6 +183,10 @@ def clean_device_cache():
         torch.mps.set_per_process_memory_fraction(1.0)
 
 
+def _pair_length(pair: Tuple[str, str]) -> int:
+    return len(pair[0]) + len(pair[1])
+
+
 class TransformerReranker:
     __doc__ = r"""Local model SDK for a reranker model using transformers.
 
@@ -159,8 +196,11 @@ class TransformerReranker:
 
     note:
     If you are using Macbook M1 series chips, you need to ensure ``torch.device("mps")`` is set.
+
+    With :meth:`enable_micro_batching`, the (query, document) pairs of concurrent calls are scored together in batches.
     """
     models: Dict[str, type] = {}
+    batcher: Optional[MicroBatcher] = None
 
     def __init__(self, model_name: Optional[str] = "BAAI/bge-reranker-base"):
         self.model_name = model_name or "BAAI/bge-reranker-base"
@@ -199,11 +239,19 @@ class TransformerReranker:
 
         # convert the query and documents to pair input
         input = [(query, doc) for doc in documents]
+        if self.batcher is not None:
+            return self.batcher.map(input)
+        return self._score_pairs(input, model)
 
-        with torch.no_grad():
+    def _score_pairs(
+        self, pairs: List[Tuple[str, str]], model: Optional[Any] = None
+    ) -> List[float]:
+        r"""Score the (query, document) pairs in one forward pass."""
+        model = model or self.models.get(self.model_name, None) or self.model
+        with torch.inference_mode():
 
             inputs = self.tokenizer(
-                input,
+                pairs,
                 padding=True,
                 truncation=True,
                 return_tensors="pt",
@@ -223,6 +271,22 @@ class TransformerReranker:
         scores = scores.tolist()
         return scores
 
+    def enable_micro_batching(self, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        r"""Batch the pairs of concurrent calls, grouped by ``max_batch_size`` or ``max_wait_ms`` and sorted by length."""
+        self.disable_micro_batching()
+        self.batcher = MicroBatcher(
+            self._score_pairs,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            sort_key=_pair_length,
+            name="TransformerRerankerBatcher",
+        )
+
+    def disable_micro_batching(self):
+        if self.batcher is not None:
+            self.batcher.close()
+            self.batcher = None
+
     def __call__(self, **kwargs):
         r"""Ensure "model" and "input" are in the kwargs."""
         if "model" not in kwargs:
@@ -406,36 +470,64 @@ class TransformerLLM:
             f"Start to infer model {model}, messages: {messages}, kwargs: {kwargs}"
         )
 
-        if model == "HuggingFaceH4/zephyr-7b-beta":
+        prompt, final_kwargs = self._prepare_pipeline_input(
+            model_to_use, model, messages, max_tokens, **kwargs
+        )
+        outputs = model_to_use(prompt, **final_kwargs)
+
+        log.info(f"Outputs: {outputs}")
+        return outputs
 
-            prompt = model_to_use.tokenizer.apply_chat_template(
+    def _prepare_pipeline_input(
+        self,
+        pipe: Any,
+        model: str,
+        messages: Sequence[Dict[str, str]],
+        max_tokens: Optional[int] = None,
+        **kwargs,
+    ):
+        r"""Build the pipeline prompt and generation kwargs of one request."""
+        final_kwargs = {
+            "max_new_tokens": max_tokens or 256,
+            "do_sample": True,
+            "temperature": kwargs.get("temperature", 0.7),
+            "top_k": kwargs.get("top_k", 50),
+            "top_p": kwargs.get("top_p", 0.95),
+        }
+        if model == "HuggingFaceH4/zephyr-7b-beta":
+            prompt = pipe.tokenizer.apply_chat_template(
                 messages, tokenize=False, add_generation_prompt=True
             )
-
-            final_kwargs = {
-                "max_new_tokens": max_tokens or 256,
-                "do_sample": True,
-                "temperature": kwargs.get("temperature", 0.7),
-                "top_k": kwargs.get("top_k", 50),
-                "top_p": kwargs.get("top_p", 0.95),
-            }
-            outputs = model_to_use(prompt, **final_kwargs)
         elif model == "google/gemma-2-2b":
-            final_kwargs = {
-                "max_new_tokens": max_tokens or 256,
-                "do_sample": True,
-                "temperature": kwargs.get("temperature", 0.7),
-                "top_k": kwargs.get("top_k", 50),
-                "top_p": kwargs.get("top_p", 0.95),
-            }
-            text = messages[0]["content"]
-            outputs = model_to_use(
-                text,
-                **final_kwargs,
-            )
+            prompt = messages[0]["content"]
+        else:
+            raise ValueError(f"Model {model} is not supported")
+        return prompt, final_kwargs
 
-        log.info(f"Outputs: {outputs}")
-        return outputs
+    def batch_infer_llm(self, api_kwargs_list: List[Dict[str, Any]]) -> List[Any]:
+        r"""Run a batch of requests, in one pipeline call for the pipeline models.
+
+        The requests share the model and generation kwargs of the first one, as they do when they come
+        from the same ``Generator``. Each output has the same format as the output of :meth:`infer_llm`.
+        """
+        model = api_kwargs_list[0]["model"]
+        if self.model_to_init_func.get(model, None) != "use_pipeline":
+            return [self.infer_llm(**api_kwargs) for api_kwargs in api_kwargs_list]
+        if model not in self.models:
+            self.init_model(model_name=model)
+        pipe = self.models[model]
+        prompts = []
+        final_kwargs = None
+        for api_kwargs in api_kwargs_list:
+            api_kwargs = api_kwargs.copy()
+            del api_kwargs["model"]
+            prompt, generation_kwargs = self._prepare_pipeline_input(
+                pipe, model, **api_kwargs
+            )
+            prompts.append(prompt)
+            if final_kwargs is None:
+                final_kwargs = generation_kwargs
+        return pipe(prompts, batch_size=len(prompts), **final_kwargs)
 
     def _infer_from_automodelcasual_lm(
         self,
@@ -502,6 +594,14 @@ class TransformerLLM:
         output = self.infer_llm(**kwargs)
         return output
 
+    def batch_call(self, api_kwargs_list: List[Dict[str, Any]]) -> List[Any]:
+        r"""Batch version of ``__call__``."""
+        model_name = api_kwargs_list[0]["model"]
+        if model_name != self.model_name:
+            self.model_name = model_name
+            self.init_model(model_name=model_name)
+        return self.batch_infer_llm(api_kwargs_list)
+
 
 class TransformersClient(ModelClient):
     __doc__ = r"""LightRAG API client for transformers.
@@ -511,8 +611,19 @@ class TransformersClient(ModelClient):
     Some modeles are gated, you will need to their page to get the access token.
     Find how to apply tokens here: https://huggingface.co/docs/hub/security-tokens
     Once you have a token and have access, put the token in the environment variable HF_TOKEN.
+
+    Args:
+        model_name (Optional[str], optional): The model to load at initialization. Defaults to None.
+        micro_batching (bool, optional): Batch the inputs of concurrent embedder and reranker calls, see
+            :class:`MicroBatcher<components.model_client.batching.MicroBatcher>`. Defaults to False.
+        max_batch_size (int, optional): The maximum number of inputs in a micro-batch. Defaults to 32.
+        max_wait_ms (float, optional): How long an input waits for a micro-batch to fill, in milliseconds. Defaults to 5.0.
     """
 
+    micro_batching: bool = False
+    max_batch_size: int = 32
+    max_wait_ms: float = 5.0
+
     support_models = {
         "thenlper/gte-base": {
             "type": ModelType.EMBEDDER,
@@ -524,9 +635,18 @@ class TransformersClient(ModelClient):
         "google/gemma-2-2b": {"type": ModelType.LLM},
     }
 
-    def __init__(self, model_name: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        micro_batching: bool = False,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ) -> None:
         super().__init__()
         self._model_name = model_name
+        self.micro_batching = micro_batching
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
         if self._model_name:
             assert (
                 self._model_name in self.support_models
@@ -540,10 +660,17 @@ class TransformersClient(ModelClient):
         self.async_client = None
 
     def init_sync_client(self):
-        return TransformerEmbedder()
+        return self._enable_micro_batching(TransformerEmbedder())
 
     def init_reranker_client(self):
-        return TransformerReranker()
+        return self._enable_micro_batching(TransformerReranker())
+
+    def _enable_micro_batching(self, client):
+        if self.micro_batching:
+            client.enable_micro_batching(
+                max_batch_size=self.max_batch_size, max_wait_ms=self.max_wait_ms
+            )
+        return client
 
     def init_llm_client(self):
         return TransformerLLM()
@@ -662,6 +789,51 @@ class TransformersClient(ModelClient):
         else:
             raise ValueError(f"model_type {model_type} is not supported")
 
+    async def acall(
+        self, api_kwargs: Dict = {}, model_type: ModelType = ModelType.UNDEFINED
+    ):
+        r"""Run :meth:`call` in the default executor, so that concurrent async calls share the micro-batches."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, partial(self.call, api_kwargs=api_kwargs, model_type=model_type)
+        )
+
+    def supports_batch_call(
+        self,
+        api_kwargs_list: List[Dict],
+        model_type: ModelType = ModelType.UNDEFINED,
+    ) -> bool:
+        r"""Only the LLM requests of one model, with an llm client that has a ``batch_call`` method, run as one batch."""
+        if (
+            model_type != ModelType.LLM
+            or not api_kwargs_list
+            or len({api_kwargs.get("model") for api_kwargs in api_kwargs_list}) != 1
+        ):
+            return False
+        if not hasattr(self, "llm_client") or self.llm_client is None:
+            self.llm_client = self.init_llm_client()
+        return hasattr(self.llm_client, "batch_call")
+
+    def batch_call(
+        self,
+        api_kwargs_list: List[Dict] = [],
+        model_type: ModelType = ModelType.UNDEFINED,
+    ) -> List[Any]:
+        r"""Send a batch of LLM requests to the llm client in one call when :meth:`supports_batch_call`.
+
+        Otherwise the requests are called one at a time.
+        """
+        if self.supports_batch_call(api_kwargs_list, model_type):
+            if api_kwargs_list[0]["model"] not in self.support_models:
+                raise ValueError(
+                    f"model {api_kwargs_list[0]['model']} is not supported"
+                )
+            return self.llm_client.batch_call(api_kwargs_list)
+        return [
+            self.call(api_kwargs=api_kwargs, model_type=model_type)
+            for api_kwargs in api_kwargs_list
+        ]
+
     def convert_inputs_to_api_kwargs(
         self,
         input: Any,  # for retriever, it is a single query,
@@ -1,7 +1,8 @@
 """DataClassParser will help users interact with LLMs even better than JsonOutputParser and YamlOutputParser with DataClass."""
 
 from dataclasses import is_dataclass
-from typing import Any, Literal, List, Optional
+from functools import lru_cache
+from typing import Any, Literal, List, Optional, Tuple
 import logging
 
 from adalflow.core.component import Component
@@ -41,6 +42,36 @@ __________
 {% endif %}
 """
 
+# compiled once and shared by all the parsers
+_OUTPUT_FORMAT_PROMPTS = {
+    "json": Prompt(template=JSON_OUTPUT_FORMAT),
+    "yaml": Prompt(template=YAML_OUTPUT_FORMAT),
+}
+_EXAMPLES_PROMPT = Prompt(template=EXAMPLES_FORMAT)
+
+
+@lru_cache(maxsize=256)
+def _compile_format_strs(
+    data_class: type,
+    schema_version: int,
+    format_type: str,
+    input_fields: Tuple[str, ...],
+    output_fields: Tuple[str, ...],
+) -> Tuple[str, str]:
+    r"""Build the input and output format strings of a data class once per schema version.
+
+    ``schema_version`` is only part of the cache key, it changes when ``set_task_desc``,
+    ``set_input_fields`` or ``set_output_fields`` change the class.
+    """
+    if format_type == "yaml":
+        input_schema = data_class.to_yaml_signature(include=list(input_fields))
+        output_schema = data_class.to_yaml_signature(include=list(output_fields))
+    else:
+        input_schema = data_class.to_json_signature(include=list(input_fields))
+        output_schema = data_class.to_json_signature(include=list(output_fields))
+    output_format_str = _OUTPUT_FORMAT_PROMPTS[format_type](schema=output_schema)
+    return input_schema, output_format_str
+
 
 class DataClassParser(Component):
     __doc__ = r"""Made the structured output even simpler compared with JsonOutputParser and YamlOutputParser.
@@ -84,6 +115,9 @@ class DataClassParser(Component):
             )
         """
 
+    # the version of the data class the fields were read at, -1 re-reads them
+    _schema_version: int = -1
+
     def __init__(
         self,
         data_class: DataClass,
@@ -105,29 +139,30 @@ class DataClassParser(Component):
         self._format_type = format_type
         self._data_class: DataClass = data_class
         self._output_processor = YamlParser() if format_type == "yaml" else JsonParser()
-        self.output_format_prompt = (
-            Prompt(template=YAML_OUTPUT_FORMAT)
-            if format_type == "yaml"
-            else Prompt(template=JSON_OUTPUT_FORMAT)
+        self.output_format_prompt = _OUTPUT_FORMAT_PROMPTS[format_type]
+        self._schema_version = data_class.__schema_version__
+
+    def _get_format_strs(self) -> Tuple[str, str]:
+        r"""Return the cached (input, output) format strings, rebuilt after the data class changes."""
+        if self._schema_version != self._data_class.__schema_version__:
+            self._input_fields = self._data_class.get_input_fields()
+            self._output_fields = self._data_class.get_output_fields()
+            self._schema_version = self._data_class.__schema_version__
+        return _compile_format_strs(
+            self._data_class,
+            self._schema_version,
+            self._format_type,
+            tuple(self._input_fields),
+            tuple(self._output_fields),
         )
 
     def get_input_format_str(self) -> str:
         r"""Return the formatted instructions to use in prompt for the input format."""
-        if self._format_type == "yaml":
-            return self._data_class.to_yaml_signature(include=self._input_fields)
-        else:
-            return self._data_class.to_json_signature(include=self._input_fields)
+        return self._get_format_strs()[0]
 
     def get_output_format_str(self) -> str:
         r"""Return the formatted instructions to use in prompt for the output format."""
-        output_format_str = None
-        if self._format_type == "yaml":
-            schema = self._data_class.to_yaml_signature(include=self._output_fields)
-            output_format_str = Prompt(template=YAML_OUTPUT_FORMAT)(schema=schema)
-        else:
-            schema = self._data_class.to_json_signature(include=self._output_fields)
-            output_format_str = Prompt(template=JSON_OUTPUT_FORMAT)(schema=schema)
-        return output_format_str
+        return self._get_format_strs()[1]
 
     def get_input_str(self, input: DataClass) -> str:
         r"""Return the formatted input string."""
@@ -163,7 +198,7 @@ class DataClassParser(Component):
                 )
                 str_examples.append(per_example_str)
 
-        examples_str = Prompt(template=EXAMPLES_FORMAT)(examples=str_examples)
+        examples_str = _EXAMPLES_PROMPT(examples=str_examples)
         return examples_str
 
     def call(self, input: str) -> Any:
@@ -13,7 +13,13 @@ import logging
 
 from adalflow.core.component import Component
 from adalflow.core.prompt_builder import Prompt
-from adalflow.core.string_parser import YamlParser, ListParser, JsonParser
+from adalflow.core.string_parser import (
+    Parser,
+    YamlParser,
+    ListParser,
+    JsonParser,
+    JsonStreamParser,
+)
 from adalflow.core.base_data_class import DataClass, DataClassFormatType
 from adalflow.core.base_data_class import ExcludeType, IncludeType
 
@@ -92,6 +98,13 @@ class OutputParser(Component):
         r"""Parse the output string to the desired format and return the parsed output."""
         raise NotImplementedError("This is an abstract method.")
 
+    def create_stream_parser(self) -> Optional[Parser]:
+        r"""Return a new incremental parser with a ``feed(delta)`` method for a streaming Generator.
+
+        None when the output can only be parsed once it is complete.
+        """
+        return None
+
 
 class YamlOutputParser(OutputParser):
     __doc__ = r"""YAML output parser using dataclass for schema extraction.
@@ -307,6 +320,10 @@ class JsonOutputParser(OutputParser):
             log.error(f"Error in converting dict to data class: {e}")
             raise e
 
+    def create_stream_parser(self) -> JsonStreamParser:
+        r"""Return a parser that yields the partial JSON dict while the output streams."""
+        return JsonStreamParser()
+
     def _extra_repr(self) -> str:
         s = f"""data_class={self.data_class.__name__}, examples={self.examples}, exclude_fields={self._exclude_fields}, \
             include_fields={self._include_fields}, return_data_class={self._return_data_class}"""
@@ -1,5 +1,6 @@
 from .bm25_retriever import (
     BM25Retriever,
+    BM25SparseIndex,
     split_text_by_word_fn,
     split_text_by_word_fn_then_lower_tokenized,
 )
@@ -34,6 +35,7 @@ LanceDBRetriever = LazyImport(
 
 __all__ = [
     "BM25Retriever",
+    "BM25SparseIndex",
     "LLMRetriever",
     "FAISSRetriever",
     "RerankerRetriever",
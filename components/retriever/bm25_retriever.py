@@ -1,10 +1,14 @@
 """BM25 retriever implementation. """
 
-from typing import List, Dict, Optional, Callable, Any, Sequence
+from typing import List, Dict, Optional, Callable, Any, Sequence, Tuple, Literal, Set
+from collections import Counter
 import numpy as np
 import heapq
 import math
+import os
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 
 from adalflow.core.tokenizer import Tokenizer
 from adalflow.core.types import (
@@ -32,14 +36,23 @@ def split_text_by_word_fn(x: str) -> List[str]:
     return x.split(" ")
 
 
+@lru_cache(None)
+def _get_tokenizer() -> Tokenizer:
+    return Tokenizer()
+
+
+@lru_cache(maxsize=2**18)
+def _tokenize_word(word: str) -> Tuple[str, ...]:
+    r"""The decoded tokens of a word, cached as words repeat a lot across a corpus."""
+    tokenizer = _get_tokenizer()
+    return tuple(tokenizer.decode([token]) for token in tokenizer.encode(word))
+
+
 def split_text_by_word_fn_then_lower_tokenized(x: str) -> List[str]:
-    tokenizer = Tokenizer()
     words = x.lower().split(" ")
-    tokens = [tokenizer.encode(word) for word in words]
     final_tokens: List[str] = []
-    for token_list in tokens:
-        for token in token_list:
-            final_tokens.append(tokenizer.decode([token]))
+    for word in words:
+        final_tokens.extend(_tokenize_word(word))
     return final_tokens
 
 
@@ -55,6 +68,444 @@ def split_text_tokenized(x: str) -> List[str]:
     return final_tokens
 
 
+def _count_term_freqs(
+    split_function: Callable[[str], List[str]], documents: Sequence[str]
+) -> List[Dict[str, int]]:
+    r"""Tokenize a chunk of documents and count the terms of each, run in the worker processes."""
+    return [dict(Counter(split_function(doc))) for doc in documents]
+
+
+def _argtop_k(scores: np.ndarray, top_k: int) -> np.ndarray:
+    r"""Positions of the ``top_k`` largest scores, best first.
+
+    Uses ``np.argpartition`` to find the k-th best score in O(n), then breaks ties
+    by the lower position like ``heapq.nlargest`` does."""
+    n = len(scores)
+    if top_k <= 0 or n == 0:
+        return np.zeros(0, dtype=np.int64)
+    if top_k < n:
+        kth = np.argpartition(-scores, top_k - 1)[:top_k]
+        threshold = scores[kth].min()
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(n)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order[:top_k]]
+
+
+class BM25SparseIndex:
+    __doc__ = r"""Inverted index of a BM25 corpus held in CSR arrays.
+
+    The postings of term ``t`` are ``doc_ids[indptr[t]:indptr[t + 1]]`` with the
+    term frequencies at the same positions in ``term_freqs``. Doc ids inside each
+    postings list are sorted ascending.
+
+    Scoring a query only touches the postings of its terms instead of every document in the corpus.
+
+    Documents can be appended with :meth:`add_term_freqs`, which merges the new postings into the
+    sorted CSR arrays without re-sorting the existing ones. Deleted documents are tombstoned in ``deleted``
+    and their postings are dropped by :meth:`compact`.
+
+    Args:
+        vocab (Dict[str, int]): Mapping from a term to its term id.
+        indptr (np.ndarray): Offsets of each term's postings, shape ``(len(vocab) + 1,)``.
+        doc_ids (np.ndarray): Doc ids of all postings, shape ``(nnz,)``.
+        term_freqs (np.ndarray): Term frequencies of all postings, shape ``(nnz,)``.
+        doc_len (np.ndarray): Length of each document, shape ``(total_documents,)``.
+        deleted (np.ndarray, optional): Tombstone mask of the documents, shape ``(total_documents,)``.
+        doc_freqs (np.ndarray, optional): Number of live documents containing each term, computed from the postings if not given.
+    """
+
+    def __init__(
+        self,
+        vocab: Dict[str, int],
+        indptr: np.ndarray,
+        doc_ids: np.ndarray,
+        term_freqs: np.ndarray,
+        doc_len: np.ndarray,
+        deleted: Optional[np.ndarray] = None,
+        doc_freqs: Optional[np.ndarray] = None,
+    ):
+        self.vocab = vocab
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.doc_len = doc_len
+        self.deleted = (
+            deleted if deleted is not None else np.zeros(len(doc_len), dtype=bool)
+        )
+        # n(q_i) for each term id, only counting the live documents
+        self.doc_freqs: np.ndarray = np.diff(indptr)
+        if doc_freqs is not None:
+            self.doc_freqs = doc_freqs
+        elif self.deleted.any():
+            live = ~self.deleted[self.doc_ids]
+            self.doc_freqs = np.bincount(
+                self._posting_term_ids()[live], minlength=len(vocab)
+            )
+        self.idf: np.ndarray = np.zeros(len(vocab), dtype=np.float64)
+        self._weights: Optional[np.ndarray] = None
+        self._weights_key: Optional[Tuple[float, float, float]] = None
+
+    @classmethod
+    def from_term_freqs(cls, term_freqs: Sequence[Dict[str, int]]) -> "BM25SparseIndex":
+        r"""Build the index from the per-document ``<token, freq>`` dicts."""
+        index = cls(
+            vocab={},
+            indptr=np.zeros(1, dtype=np.int64),
+            doc_ids=np.zeros(0, dtype=np.int32),
+            term_freqs=np.zeros(0, dtype=np.int32),
+            doc_len=np.zeros(0, dtype=np.int64),
+        )
+        index.add_term_freqs(term_freqs)
+        return index
+
+    @classmethod
+    def from_corpus(cls, corpus: Sequence[List[str]]) -> "BM25SparseIndex":
+        r"""Build the index from a list of tokenized documents."""
+        return cls.from_term_freqs([Counter(document) for document in corpus])
+
+    @property
+    def total_documents(self) -> int:
+        r"""Number of document slots, including the tombstoned ones."""
+        return len(self.doc_len)
+
+    def _posting_term_ids(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self.vocab)), np.diff(self.indptr))
+
+    def add_term_freqs(self, term_freqs: Sequence[Dict[str, int]]) -> List[int]:
+        r"""Append documents given as ``<token, freq>`` dicts.
+
+        The new postings are inserted at the end of their terms' postings lists, so the
+        Python work scales with the added documents and the existing arrays are only copied once.
+
+        Returns:
+            List[int]: The doc ids of the added documents.
+        """
+        first_doc_id = self.total_documents
+        num_terms = len(self.vocab)
+        term_ids: List[int] = []
+        doc_ids: List[int] = []
+        freqs: List[int] = []
+        doc_len: List[int] = []
+        for doc_id, term_freq in enumerate(term_freqs, start=first_doc_id):
+            doc_len.append(sum(term_freq.values()))
+            for token, freq in term_freq.items():
+                term_id = self.vocab.setdefault(token, len(self.vocab))
+                term_ids.append(term_id)
+                doc_ids.append(doc_id)
+                freqs.append(freq)
+
+        new_terms = len(self.vocab) - num_terms
+        term_ids_np = np.asarray(term_ids, dtype=np.int64)
+        # stable sort keeps the doc ids ascending inside each postings list
+        order = np.argsort(term_ids_np, kind="stable")
+        term_ids_np = term_ids_np[order]
+        counts = np.bincount(term_ids_np, minlength=len(self.vocab))
+
+        indptr = np.concatenate(
+            [self.indptr, np.full(new_terms, self.indptr[-1], dtype=np.int64)]
+        )
+        insert_at = indptr[term_ids_np + 1]
+        self.doc_ids = np.insert(
+            self.doc_ids, insert_at, np.asarray(doc_ids, dtype=np.int32)[order]
+        )
+        self.term_freqs = np.insert(
+            self.term_freqs, insert_at, np.asarray(freqs, dtype=np.int32)[order]
+        )
+        indptr[1:] += np.cumsum(counts)
+        self.indptr = indptr
+        self.doc_freqs = (
+            np.concatenate(
+                [self.doc_freqs, np.zeros(new_terms, dtype=self.doc_freqs.dtype)]
+            )
+            + counts
+        )
+        self.idf = np.concatenate([self.idf, np.zeros(new_terms)])
+        self.doc_len = np.concatenate(
+            [self.doc_len, np.asarray(doc_len, dtype=np.int64)]
+        )
+        self.deleted = np.concatenate([self.deleted, np.zeros(len(doc_len), bool)])
+        self._weights = None
+        return list(range(first_doc_id, self.total_documents))
+
+    def delete(self, doc_ids: Sequence[int]) -> int:
+        r"""Tombstone documents and remove them from the document frequencies.
+
+        Their postings are kept until :meth:`compact`.
+
+        Returns:
+            int: The number of newly deleted documents.
+        """
+        doc_ids_np = np.unique(np.asarray(doc_ids, dtype=np.int64))
+        doc_ids_np = doc_ids_np[~self.deleted[doc_ids_np]]
+        if not len(doc_ids_np):
+            return 0
+        self.deleted[doc_ids_np] = True
+        hits = np.flatnonzero(np.isin(self.doc_ids, doc_ids_np))
+        hit_terms = np.searchsorted(self.indptr, hits, side="right") - 1
+        self.doc_freqs = self.doc_freqs - np.bincount(
+            hit_terms, minlength=len(self.vocab)
+        )
+        return len(doc_ids_np)
+
+    def compact(self) -> np.ndarray:
+        r"""Drop the tombstoned documents and the terms no live document contains.
+
+        The live documents are renumbered in their original order.
+
+        Returns:
+            np.ndarray: The new doc id of each old doc id, -1 for the deleted ones.
+        """
+        live_docs = ~self.deleted
+        new_doc_ids = np.cumsum(live_docs) - 1
+        new_doc_ids[self.deleted] = -1
+
+        live_terms = self.doc_freqs > 0
+        new_term_ids = np.cumsum(live_terms) - 1
+        keep = live_docs[self.doc_ids]
+        term_ids = new_term_ids[self._posting_term_ids()[keep]]
+
+        self.vocab = {
+            token: int(new_term_ids[term_id])
+            for token, term_id in self.vocab.items()
+            if live_terms[term_id]
+        }
+        self.doc_ids = new_doc_ids[self.doc_ids[keep]].astype(np.int32)
+        self.term_freqs = self.term_freqs[keep]
+        self.indptr = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(self.vocab)), out=self.indptr[1:])
+        self.doc_freqs = self.doc_freqs[live_terms]
+        self.idf = self.idf[live_terms]
+        self.doc_len = self.doc_len[live_docs]
+        self.deleted = np.zeros(len(self.doc_len), dtype=bool)
+        self._weights = None
+        return new_doc_ids
+
+    def calc_idf(self, epsilon: float, total_documents: int) -> float:
+        r"""Compute the idf of every term, same as :meth:`BM25Retriever._calc_idf`.
+
+        Args:
+            epsilon (float): Used to adapt the negative idf score to epilon * average_idf.
+            total_documents (int): The number of live documents.
+
+        Returns:
+            float: The average idf before the negative idfs are replaced.
+        """
+        df = self.doc_freqs.astype(np.float64)
+        idf = np.log(total_documents - df + 0.5) - np.log(df + 0.5)
+        # terms only in the deleted documents do not count, like a rebuilt index
+        present = self.doc_freqs > 0
+        average_idf = float(idf[present].mean()) if present.any() else 0.0
+        idf[idf < 0] = epsilon * average_idf
+        self.idf = idf
+        self._weights = None
+        return average_idf
+
+    def bm25_weights(self, k1: float, b: float, avgdl: float) -> np.ndarray:
+        r"""The BM25-weighted doc-term matrix, aligned with ``doc_ids``.
+
+        The weight of a posting is its term's contribution to the document score,
+        ``idf(t) * f(t, d) * (k1 + 1) / (f(t, d) + k1 * (1 - b + b * |d| / avgdl))``.
+        It is cached until the idf or the BM25 parameters change.
+        """
+        key = (k1, b, avgdl)
+        if self._weights is None or self._weights_key != key:
+            norm = k1 * (1 - b + b * self.doc_len / avgdl)
+            term_ids = self._posting_term_ids()
+            q_freq = self.term_freqs
+            self._weights = self.idf[term_ids] * (
+                q_freq * (k1 + 1) / (q_freq + norm[self.doc_ids])
+            )
+            self._weights_key = key
+        return self._weights
+
+    def score(
+        self, query: List[str], k1: float, b: float, avgdl: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        r"""Score the documents containing at least one query term.
+
+        Args:
+            query (List[str]): The tokenized query.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The sorted doc ids and their BM25 scores.
+        """
+        _, doc_ids, scores = self.score_batch([query], k1, b, avgdl)
+        return doc_ids, scores
+
+    def score_batch(
+        self, queries: List[List[str]], k1: float, b: float, avgdl: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        r"""Score a batch of queries as one sparse product of the query-term and the doc-term matrix.
+
+        Args:
+            queries (List[List[str]]): The tokenized queries.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The nonzero entries of the query-doc score
+            matrix in COO format (rows, doc ids, scores), sorted by row and then by doc id.
+        """
+        weights = self.bm25_weights(k1, b, avgdl)
+        # the query-term matrix in COO format, a repeated term is kept as a repeated entry
+        rows: List[int] = []
+        term_ids: List[int] = []
+        for row, query in enumerate(queries):
+            for token in query:
+                term_id = self.vocab.get(token)
+                if term_id is not None:
+                    rows.append(row)
+                    term_ids.append(term_id)
+        if not term_ids:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0, dtype=np.float64)
+
+        # gather the postings of every query term in one pass
+        term_ids_np = np.asarray(term_ids, dtype=np.int64)
+        starts = self.indptr[term_ids_np]
+        lengths = self.indptr[term_ids_np + 1] - starts
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+        entry_rows = np.repeat(np.asarray(rows, dtype=np.int64), lengths)
+
+        # sum the contributions per (query, document) in the query-term order
+        keys = entry_rows * self.total_documents + self.doc_ids[positions]
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights[positions])
+        return (
+            unique_keys // self.total_documents,
+            unique_keys % self.total_documents,
+            scores,
+        )
+
+    def top_k(
+        self, query: List[str], top_k: int, k1: float, b: float, avgdl: float
+    ) -> Tuple[List[int], List[float]]:
+        r"""Retrieve the ``top_k`` doc indices and scores for a tokenized query."""
+        doc_ids, scores = self.score(query, k1, b, avgdl)
+        return self._select_top_k(doc_ids, scores, top_k)
+
+    def top_k_batch(
+        self, queries: List[List[str]], top_k: int, k1: float, b: float, avgdl: float
+    ) -> List[Tuple[List[int], List[float]]]:
+        r"""Retrieve the ``top_k`` doc indices and scores for each of the tokenized queries."""
+        rows, doc_ids, scores = self.score_batch(queries, k1, b, avgdl)
+        bounds = np.searchsorted(rows, np.arange(len(queries) + 1))
+        return [
+            self._select_top_k(
+                doc_ids[bounds[row] : bounds[row + 1]],
+                scores[bounds[row] : bounds[row + 1]],
+                top_k,
+            )
+            for row in range(len(queries))
+        ]
+
+    def _select_top_k(
+        self, doc_ids: np.ndarray, scores: np.ndarray, top_k: int
+    ) -> Tuple[List[int], List[float]]:
+        has_deleted = self.deleted.any()
+        if has_deleted:
+            live = ~self.deleted[doc_ids]
+            doc_ids, scores = doc_ids[live], scores[live]
+        top_k = min(top_k, self.total_documents - int(self.deleted.sum()))
+        best = _argtop_k(scores, top_k)
+        if len(best) < top_k or (len(best) and scores[best[-1]] <= 0):
+            # documents without any query term score 0 and can still make the top k
+            dense = np.zeros(self.total_documents)
+            dense[doc_ids] = scores
+            if has_deleted:
+                dense[self.deleted] = -np.inf
+            best_docs = _argtop_k(dense, top_k)
+            return best_docs.tolist(), dense[best_docs].tolist()
+        return doc_ids[best].tolist(), scores[best].tolist()
+
+    def save(self, path: str):
+        r"""Save the index to the directory ``path`` as ``.npy`` arrays and a json vocabulary.
+
+        The vocabulary is saved in term id order. The cached :meth:`bm25_weights` are saved too,
+        so a loaded index can score without computing them.
+        """
+        os.makedirs(path, exist_ok=True)
+        arrays = {
+            "indptr": self.indptr,
+            "doc_ids": self.doc_ids,
+            "term_freqs": self.term_freqs,
+            "doc_len": self.doc_len,
+            "doc_freqs": self.doc_freqs,
+            "idf": self.idf,
+            "deleted": self.deleted,
+        }
+        if self._weights is not None:
+            arrays["bm25_weights"] = self._weights
+        for name, array in arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), array)
+        save_json(
+            {"vocab": list(self.vocab.keys()), "weights_key": self._weights_key},
+            os.path.join(path, "vocab.json"),
+        )
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = "r") -> "BM25SparseIndex":
+        r"""Load an index saved by :meth:`save`.
+
+        Args:
+            path (str): The directory of the index.
+            mmap_mode (str, optional): Passed to ``np.load`` for the postings, document lengths and weights.
+                With the default "r", they are memory-mapped read-only, so processes loading the same index share
+                them through the page cache. Use None to read them into memory.
+        """
+        vocab_dict = load_json(os.path.join(path, "vocab.json"))
+
+        def _load(name: str, mmap: Optional[str] = None) -> np.ndarray:
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap)
+
+        index = cls(
+            vocab={token: i for i, token in enumerate(vocab_dict["vocab"])},
+            indptr=_load("indptr", mmap_mode),
+            doc_ids=_load("doc_ids", mmap_mode),
+            term_freqs=_load("term_freqs", mmap_mode),
+            doc_len=_load("doc_len", mmap_mode),
+            # small and updated in place by delete
+            deleted=_load("deleted"),
+            doc_freqs=_load("doc_freqs"),
+        )
+        index.idf = _load("idf")
+        if vocab_dict.get("weights_key") and os.path.exists(
+            os.path.join(path, "bm25_weights.npy")
+        ):
+            index._weights = _load("bm25_weights", mmap_mode)
+            index._weights_key = tuple(vocab_dict["weights_key"])
+        return index
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": type(self).__name__,
+            "data": {
+                "vocab": list(self.vocab.keys()),
+                "indptr": self.indptr.tolist(),
+                "doc_ids": self.doc_ids.tolist(),
+                "term_freqs": self.term_freqs.tolist(),
+                "doc_len": self.doc_len.tolist(),
+                "deleted": np.flatnonzero(self.deleted).tolist(),
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BM25SparseIndex":
+        data = data["data"]
+        doc_len = np.asarray(data["doc_len"], dtype=np.int64)
+        deleted = np.zeros(len(doc_len), dtype=bool)
+        deleted[data.get("deleted", [])] = True
+        return cls(
+            vocab={token: i for i, token in enumerate(data["vocab"])},
+            indptr=np.asarray(data["indptr"], dtype=np.int64),
+            doc_ids=np.asarray(data["doc_ids"], dtype=np.int32),
+            term_freqs=np.asarray(data["term_freqs"], dtype=np.int32),
+            doc_len=doc_len,
+            deleted=deleted,
+        )
+
+
 class BM25Retriever(Retriever[str, RetrieverStrQueryType]):
     __doc__ = r"""Fast Implementation of Best Matching 25 ranking function.
 
@@ -96,6 +547,13 @@ class BM25Retriever(Retriever[str, RetrieverStrQueryType]):
         document_map_func: (Callable, optional): The function to transform the document into `List[str]`.
             You don't need it if your documents are already in format `List[str]`.
         use_tokenizer: (bool, optional): Whether to use the default tokenizer to split the text into words. Default is True.
+        index_type: (str, optional): The engine that holds the term frequencies. Default is "dict".
+
+            - "dict": a ``<token, freq>`` dict per document, every query term is looked up in every document.
+            - "sparse": an inverted index (:class:`BM25SparseIndex`) in CSR arrays, only the documents containing
+              a query term are scored. Preferred for large corpora, the scores are the same as "dict".
+        compaction_threshold: (float, optional): The fraction of deleted documents that triggers :meth:`compact`
+            in :meth:`delete_documents`. Set to None to only compact manually. Default is 0.25.
 
     Examples:
 
@@ -122,7 +580,22 @@ class BM25Retriever(Retriever[str, RetrieverStrQueryType]):
             retriever.build_index_from_documents(documents)
             output = retriever("hello")
 
-    3. Save the index to file and load it back:
+    3. Use the sparse inverted index for large corpora:
+
+    .. code-block:: python
+
+            retriever = BM25Retriever(top_k=1, documents=documents, index_type="sparse")
+            output = retriever("hello")
+
+    4. Add and delete documents without rebuilding the index:
+
+    .. code-block:: python
+
+            retriever.add_documents(["hello again"])  # indexed as document 3
+            retriever.delete_documents([0])
+            output = retriever("hello")
+
+    5. Save the index to file and load it back:
 
     .. code-block:: python
 
@@ -131,10 +604,20 @@ class BM25Retriever(Retriever[str, RetrieverStrQueryType]):
             output = retriever2("hello")
             print(output)
 
+    For large corpora, save to a directory of ``.npy`` arrays instead. Loading memory-maps them,
+    so several processes can share one index through the page cache:
+
+    .. code-block:: python
+
+            retriever.save_to_dir("bm25_index")
+            retriever2 = BM25Retriever.load_from_dir("bm25_index")
+
     note:
     The retriever only fill in the ``doc_indices`` and ``doc_scores``. The ``documents`` needs to be filled in by the user.
     """
 
+    _idf_stale: bool = False
+
     def __init__(
         self,
         top_k: int = 5,
@@ -144,6 +627,8 @@ class BM25Retriever(Retriever[str, RetrieverStrQueryType]):
         documents: Optional[Sequence[Any]] = None,
         document_map_func: Optional[Callable[[Any], str]] = None,
         use_tokenizer: bool = True,
+        index_type: Literal["dict", "sparse"] = "dict",
+        compaction_threshold: Optional[float] = 0.25,
     ):
         r"""
         - nd: <token, freq> (n(q_i) in the formula)
@@ -152,8 +637,16 @@ class BM25Retriever(Retriever[str, RetrieverStrQueryType]):
         - doc_len: list of document lengths (|d| in the formula)
         - avgdl: average document length in the corpus (avgdl in the formula)
         - total_documents: total number of documents in the corpus (N in the formula)
+        - sparse_index: the CSR inverted index replacing nd, t2d, idf and doc_len when index_type is "sparse"
+        - tombstones: indices of the deleted documents that are still in t2d and doc_len until compaction
         """
         super().__init__()
+        if index_type not in ("dict", "sparse"):
+            raise ValueError(
+                f"index_type should be either 'dict' or 'sparse', got {index_type}"
+            )
+        self.index_type = index_type
+        self.compaction_threshold = compaction_threshold
         self.k1 = k1
         self.b = b
         self.epsilon = epsilon
@@ -178,6 +671,10 @@ class BM25Retriever(Retriever[str, RetrieverStrQueryType]):
             "epsilon",
             "indexed",
             "use_tokenizer",
+            "index_type",
+            "sparse_index",
+            "tombstones",
+            "compaction_threshold",
         ]
         # initialize the index
         self.reset_index()
@@ -192,6 +689,9 @@ class BM25Retriever(Retriever[str, RetrieverStrQueryType]):
         self.idf: Dict[str, float] = {}  # idf of each term
         self.doc_len: List[int] = []  # list of document lengths
         self.avgdl: float = 0  # average document length
+        self.sparse_index: Optional[BM25SparseIndex] = None
+        self.tombstones: Set[int] = set()  # deleted documents, only for "dict"
+        self._idf_stale: bool = False  # idf is recomputed lazily after add/delete
         self.indexed: bool = (
             False  # this is important to check if the retrieve is possible
         )
@@ -207,30 +707,86 @@ class BM25Retriever(Retriever[str, RetrieverStrQueryType]):
 
         return tokenized_documents
 
+    def _apply_split_function_parallel(
+        self, documents: List[str], num_workers: int, chunk_size: int
+    ) -> List[Dict[str, int]]:
+        r"""Tokenize the documents in chunks across a process pool.
+
+        Each worker returns the ``<token, freq>`` dicts of its chunk instead of the tokens,
+        the chunks are merged in the order of the documents."""
+        if self._split_function is None:
+            raise ValueError("split_function is not defined")
+        chunks = [
+            documents[start : start + chunk_size]
+            for start in range(0, len(documents), chunk_size)
+        ]
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            results = executor.map(
+                partial(_count_term_freqs, self._split_function), chunks
+            )
+            return [term_freq for chunk in results for term_freq in chunk]
+
+    def _tokenize_and_count(
+        self, documents: List[str], num_workers: Optional[int], chunk_size: int
+    ) -> Tuple[List[Dict[str, int]], Optional[List[List[str]]]]:
+        r"""The term frequencies of the documents, and the tokenized documents when tokenized in this process."""
+        if num_workers is not None and num_workers > 1:
+            term_freqs = self._apply_split_function_parallel(
+                documents, num_workers, chunk_size
+            )
+            return term_freqs, None
+        tokenized_documents = self._apply_split_function(documents)
+        return [Counter(document) for document in tokenized_documents], (
+            tokenized_documents
+        )
+
     def _initialize(self, corpus: List[List[str]]):
         r"""Initialize the term to document dictionary with the term frequencies in each document.
         The corpi is a list of tokenized documents."""
+        self._initialize_from_term_freqs([Counter(document) for document in corpus])
 
-        self.total_documents = len(corpus)
+    def _initialize_from_term_freqs(self, term_freqs: List[Dict[str, int]]):
+        r"""Same as :meth:`_initialize` with the ``<token, freq>`` dict of each document."""
+        self.total_documents = len(term_freqs)
 
-        for document in corpus:
-            self.doc_len.append(len(document))
-            term_freq = {}
-            for token in document:
-                if token not in term_freq:
-                    term_freq[token] = 0
-                term_freq[token] += 1
+        if self.index_type == "sparse":
+            self.sparse_index = BM25SparseIndex.from_term_freqs(term_freqs)
+            self.avgdl = float(self.sparse_index.doc_len.mean())
+            return
 
-            self.t2d.append(term_freq)
+        self._add_term_freqs(term_freqs)
+        self.avgdl = sum(self.doc_len) / len(term_freqs)
 
-            for word, _ in term_freq.items():
+    def _add_term_freqs(self, term_freqs: List[Dict[str, int]]):
+        r"""Append the term frequencies of new documents to t2d, doc_len and nd."""
+        for term_freq in term_freqs:
+            self.doc_len.append(sum(term_freq.values()))
+            self.t2d.append(dict(term_freq))
+
+            for word in term_freq:
                 if word not in self.nd:
                     self.nd[word] = 0
                 self.nd[word] += 1
 
-        self.avgdl = sum(self.doc_len) / len(corpus)
+    def _update_avgdl(self):
+        if self.total_documents == 0:
+            self.avgdl = 0
+        elif self.index_type == "sparse":
+            live = ~self.sparse_index.deleted
+            self.avgdl = float(self.sparse_index.doc_len[live].mean())
+        else:
+            total_len = sum(self.doc_len) - sum(
+                self.doc_len[i] for i in self.tombstones
+            )
+            self.avgdl = total_len / self.total_documents
 
     def _calc_idf(self):
+        if self.index_type == "sparse":
+            self.average_idf = self.sparse_index.calc_idf(
+                self.epsilon, self.total_documents
+            )
+            self._idf_stale = False
+            return
         idf_sum = 0
         negative_idf = (
             []
@@ -242,13 +798,15 @@ class BM25Retriever(Retriever[str, RetrieverStrQueryType]):
             idf_sum += idf
             if idf < 0:
                 negative_idf.append(token)
-        self.average_idf = idf_sum / len(self.nd)  # average idf for each term
+        # average idf for each term
+        self.average_idf = idf_sum / len(self.nd) if self.nd else 0
 
         # replace negative idf with epsilon * average_idf
         # NOTE: we can still have negative idf if most terms are too common, especially when the corpus is small
         eps = self.epsilon * self.average_idf
         for token in negative_idf:
             self.idf[token] = eps
+        self._idf_stale = False
 
     def _get_scores(self, query: List[str]) -> List[float]:
         r"""Calculate the BM25 score for the query and the documents in the corpus
@@ -256,7 +814,14 @@ class BM25Retriever(Retriever[str, RetrieverStrQueryType]):
         Args:
             query: List[str]: The tokenized query
         """
-        score = np.zeros(self.total_documents)
+        if self.index_type == "sparse":
+            doc_ids, scores = self.sparse_index.score(
+                query, self.k1, self.b, self.avgdl
+            )
+            score = np.zeros(self.sparse_index.total_documents)
+            score[doc_ids] = scores
+            return score.tolist()
+        score = np.zeros(len(self.t2d))
         doc_len = np.array(self.doc_len)
         for q in query:
             q_freq = np.array([(doc.get(q) or 0) for doc in self.t2d])
@@ -274,6 +839,9 @@ class BM25Retriever(Retriever[str, RetrieverStrQueryType]):
             query: List[str]: The tokenized query
             doc_ids: List[int]: The list of document indexes to calculate the score
         """
+        if self.index_type == "sparse":
+            scores = self._get_scores(query)
+            return [scores[di] for di in doc_ids]
         assert all(di < len(self.t2d) for di in doc_ids)
         score = np.zeros(len(doc_ids))
         doc_len = np.array(self.doc_len)[doc_ids]
@@ -286,43 +854,199 @@ class BM25Retriever(Retriever[str, RetrieverStrQueryType]):
             )
         return score.tolist()
 
+    def _map_documents(
+        self,
+        documents: RetrieverDocumentsType,
+        document_map_func: Optional[Callable[[Any], str]] = None,
+    ) -> List[str]:
+        if document_map_func:
+            assert callable(document_map_func), "document_map_func should be callable"
+            assert isinstance(
+                document_map_func(documents[0]), str
+            ), "document_map_func should return a string"
+            return [document_map_func(doc) for doc in documents]
+        return documents
+
     def build_index_from_documents(
         self,
         documents: RetrieverDocumentsType,
         document_map_func: Optional[Callable[[Any], str]] = None,
+        num_workers: Optional[int] = None,
+        chunk_size: int = 1000,
         **kwargs,
     ):
-        r"""Built index from the `text` field of each document in the list of documents"""
+        r"""Built index from the `text` field of each document in the list of documents
+
+        Args:
+            documents (RetrieverDocumentsType): The documents to index.
+            document_map_func (Callable, optional): The function to transform the document into `str`.
+            num_workers (int, optional): Tokenize the documents across a process pool of this size.
+                The term frequencies of each chunk are merged in the document order and ``tokenized_documents``
+                is not kept. Default is None, tokenizing in this process.
+            chunk_size (int, optional): The number of documents per task sent to a worker. Default is 1000.
+        """
         assert documents, "documents should not be empty"
         self.reset_index()
         self.documents = documents
         # the documents to be indexed
-        if document_map_func:
-            assert callable(document_map_func), "document_map_func should be callable"
-            assert isinstance(
-                document_map_func(documents[0]), str
-            ), "document_map_func should return a string"
-            list_of_documents_str = [document_map_func(doc) for doc in documents]
-        else:
-            list_of_documents_str = documents
+        list_of_documents_str = self._map_documents(documents, document_map_func)
 
-        self.tokenized_documents = self._apply_split_function(list_of_documents_str)
-        self._initialize(self.tokenized_documents)
+        term_freqs, self.tokenized_documents = self._tokenize_and_count(
+            list_of_documents_str, num_workers, chunk_size
+        )
+        self._initialize_from_term_freqs(term_freqs)
         self._calc_idf()
         self.indexed = True
 
+    def add_documents(
+        self,
+        documents: RetrieverDocumentsType,
+        document_map_func: Optional[Callable[[Any], str]] = None,
+        num_workers: Optional[int] = None,
+        chunk_size: int = 1000,
+    ) -> List[int]:
+        r"""Add documents to the index without rebuilding it.
+
+        Only the new documents are tokenized and counted. The document frequencies and lengths
+        are updated in place and the idf is recomputed lazily on the next retrieval.
+
+        Args:
+            documents (RetrieverDocumentsType): The documents to add.
+            document_map_func (Callable, optional): The function to transform the document into `str`.
+            num_workers (int, optional): Tokenize across a process pool, see :meth:`build_index_from_documents`.
+            chunk_size (int, optional): The number of documents per task sent to a worker. Default is 1000.
+
+        Returns:
+            List[int]: The indices of the added documents.
+        """
+        assert documents, "documents should not be empty"
+        if not self.indexed:
+            self.build_index_from_documents(
+                documents, document_map_func, num_workers, chunk_size
+            )
+            return list(range(self.total_documents))
+
+        list_of_documents_str = self._map_documents(documents, document_map_func)
+        term_freqs, tokenized_documents = self._tokenize_and_count(
+            list_of_documents_str, num_workers, chunk_size
+        )
+        if self.index_type == "sparse":
+            doc_indices = self.sparse_index.add_term_freqs(term_freqs)
+        else:
+            doc_indices = list(range(len(self.t2d), len(self.t2d) + len(term_freqs)))
+            self._add_term_freqs(term_freqs)
+
+        if tokenized_documents is None:
+            self.tokenized_documents = None
+        elif getattr(self, "tokenized_documents", None) is not None:
+            self.tokenized_documents.extend(tokenized_documents)
+        if self.documents is not None:
+            self.documents = list(self.documents) + list(documents)
+        self.total_documents += len(term_freqs)
+        self._update_avgdl()
+        self._idf_stale = True
+        return doc_indices
+
+    def delete_documents(self, doc_indices: List[int]):
+        r"""Delete documents from the index without rebuilding it.
+
+        The documents are tombstoned: they are excluded from the results and the document
+        frequencies right away, and removed from the index by :meth:`compact`, which runs
+        automatically once the deleted fraction exceeds ``compaction_threshold``.
+
+        Args:
+            doc_indices (List[int]): The indices of the documents to delete.
+        """
+        if not self.indexed:
+            raise ValueError("Index is not built. Please build the index first.")
+        num_slots = (
+            self.sparse_index.total_documents
+            if self.index_type == "sparse"
+            else len(self.t2d)
+        )
+        for doc_index in doc_indices:
+            if not 0 <= doc_index < num_slots:
+                raise ValueError(f"doc index {doc_index} is out of range")
+
+        if self.index_type == "sparse":
+            num_deleted = self.sparse_index.delete(doc_indices)
+        else:
+            num_deleted = 0
+            for doc_index in set(doc_indices) - self.tombstones:
+                self.tombstones.add(doc_index)
+                num_deleted += 1
+                for word in self.t2d[doc_index]:
+                    self.nd[word] -= 1
+                    if self.nd[word] == 0:
+                        del self.nd[word]
+                        self.idf.pop(word, None)
+
+        self.total_documents -= num_deleted
+        self._update_avgdl()
+        self._idf_stale = True
+        if (
+            self.compaction_threshold is not None
+            and num_slots
+            and (num_slots - self.total_documents) / num_slots
+            > self.compaction_threshold
+        ):
+            self.compact()
+
+    def compact(self) -> List[int]:
+        r"""Remove the deleted documents from the index.
+
+        The remaining documents keep their order but are renumbered, and ``documents`` is compacted the same way,
+        so the indices in the next :class:`RetrieverOutput` refer to the compacted documents.
+
+        Returns:
+            List[int]: The new index of each old document index, -1 for the deleted documents.
+        """
+        if self.index_type == "sparse":
+            mapping = self.sparse_index.compact().tolist()
+        else:
+            mapping, new_index = [], 0
+            for doc_index in range(len(self.t2d)):
+                if doc_index in self.tombstones:
+                    mapping.append(-1)
+                else:
+                    mapping.append(new_index)
+                    new_index += 1
+            self.t2d = [tf for i, tf in enumerate(self.t2d) if mapping[i] >= 0]
+            self.doc_len = [dl for i, dl in enumerate(self.doc_len) if mapping[i] >= 0]
+            self.tombstones = set()
+
+        if getattr(self, "tokenized_documents", None) is not None:
+            self.tokenized_documents = [
+                doc for i, doc in enumerate(self.tokenized_documents) if mapping[i] >= 0
+            ]
+        if self.documents is not None:
+            self.documents = [
+                doc for i, doc in enumerate(self.documents) if mapping[i] >= 0
+            ]
+        return mapping
+
     def call(
-        self, input: RetrieverStrQueriesType, top_k: Optional[int] = None, **kwargs
+        self,
+        input: RetrieverStrQueriesType,
+        top_k: Optional[int] = None,
+        batch_size: int = 256,
+        **kwargs,
     ) -> RetrieverOutputType:
         """
         Retrieve the top n documents for the query and return only the indexes of the documents.
 
+        With ``index_type="sparse"``, the queries are scored in batches: each batch is one sparse product
+        of the query-term matrix and the BM25-weighted doc-term matrix, followed by a top k per row.
+
         Args:
             input: Union[str, List[str]]: The query or list of queries
             top_k: Optional[int]: The number of documents to return
+            batch_size: int: The number of queries scored together with ``index_type="sparse"``. Default is 256.
         """
         if not self.indexed:
             raise ValueError("Index is not built. Please build the index first.")
+        if self._idf_stale:
+            self._calc_idf()
 
         top_k = top_k or self.top_k
         output: RetrieverOutputType = []
@@ -332,11 +1056,31 @@ class BM25Retriever(Retriever[str, RetrieverStrQueryType]):
             pass
         else:
             raise ValueError("input should be a string or a list of strings")
+        if self.index_type == "sparse":
+            for start in range(0, len(input), batch_size):
+                queries = input[start : start + batch_size]
+                results = self.sparse_index.top_k_batch(
+                    [self._split_function(query) for query in queries],
+                    top_k,
+                    self.k1,
+                    self.b,
+                    self.avgdl,
+                )
+                for query, (top_k_idx, top_k_scores) in zip(queries, results):
+                    output.append(
+                        RetrieverOutput(
+                            doc_indices=top_k_idx, doc_scores=top_k_scores, query=query
+                        )
+                    )
+            return output
         # process each query
         for query in input:
             tokens = self._split_function(query)
             scores = self._get_scores(tokens)
-            top_k_idx = heapq.nlargest(top_k, range(len(scores)), scores.__getitem__)
+            candidates = range(len(scores))
+            if self.tombstones:
+                candidates = [i for i in candidates if i not in self.tombstones]
+            top_k_idx = heapq.nlargest(top_k, candidates, scores.__getitem__)
             top_k_scores = [scores[i] for i in top_k_idx]
             output.append(
                 RetrieverOutput(
@@ -346,11 +1090,14 @@ class BM25Retriever(Retriever[str, RetrieverStrQueryType]):
         return output
 
     def save_to_file(self, path: str):
+        if self._idf_stale:
+            self._calc_idf()
         index_dict = super().to_dict()
         # filter out index_dict[data] that is not in self.index_keys
         for key in list(index_dict["data"].keys()):
             if key not in self.index_keys:
                 del index_dict["data"][key]
+        index_dict["data"]["tombstones"] = sorted(self.tombstones)
         try:
             save_json(index_dict, path)
         except Exception as e:
@@ -369,12 +1116,93 @@ class BM25Retriever(Retriever[str, RetrieverStrQueryType]):
                 if instance._use_tokenizer
                 else split_text_by_word_fn
             )
+            if not hasattr(instance, "index_type"):
+                instance.index_type = "dict"
+                instance.sparse_index = None
+            instance.tombstones = set(getattr(instance, "tombstones", []))
+            if not hasattr(instance, "compaction_threshold"):
+                instance.compaction_threshold = 0.25
+            if instance.sparse_index is not None:
+                # the idf array is not saved, recompute it from the document frequencies
+                instance.sparse_index.calc_idf(
+                    instance.epsilon, instance.total_documents
+                )
             return instance
         except Exception as e:
             log.error(f"Error loading the index from file: {e}")
             raise e
 
+    def save_to_dir(self, path: str):
+        r"""Save the index to the directory ``path`` in a binary format that can be memory-mapped.
+
+        The postings, document lengths, document frequencies and idf are saved as ``.npy`` arrays by
+        :meth:`BM25SparseIndex.save` and the parameters in ``config.json``. An index with ``index_type="dict"``
+        is converted to a :class:`BM25SparseIndex` first. ``documents`` is not saved.
+        """
+        if not self.indexed:
+            raise ValueError("Index is not built. Please build the index first.")
+        if self._idf_stale:
+            self._calc_idf()
+        if self.index_type == "sparse":
+            sparse_index = self.sparse_index
+        else:
+            deleted = np.zeros(len(self.t2d), dtype=bool)
+            deleted[list(self.tombstones)] = True
+            sparse_index = BM25SparseIndex.from_term_freqs(self.t2d)
+            sparse_index.delete(np.flatnonzero(deleted))
+            sparse_index.calc_idf(self.epsilon, self.total_documents)
+        sparse_index.bm25_weights(self.k1, self.b, self.avgdl)
+        try:
+            sparse_index.save(path)
+            save_json(
+                {
+                    "top_k": self.top_k,
+                    "k1": self.k1,
+                    "b": self.b,
+                    "epsilon": self.epsilon,
+                    "use_tokenizer": self._use_tokenizer,
+                    "compaction_threshold": self.compaction_threshold,
+                    "avgdl": self.avgdl,
+                    "total_documents": self.total_documents,
+                    "average_idf": self.average_idf,
+                },
+                os.path.join(path, "config.json"),
+            )
+        except Exception as e:
+            log.error(f"Error saving the index to directory: {e}")
+            raise e
+
+    @classmethod
+    def load_from_dir(cls, path: str, mmap_mode: Optional[str] = "r"):
+        r"""Load an index saved by :meth:`save_to_dir` as a retriever with ``index_type="sparse"``.
+
+        Args:
+            path (str): The directory of the index.
+            mmap_mode (str, optional): Memory-map the large arrays with ``np.load(mmap_mode=...)``. Default is "r",
+                use None to read them into memory.
+        """
+        try:
+            config = load_json(os.path.join(path, "config.json"))
+            instance = cls(
+                top_k=config["top_k"],
+                k1=config["k1"],
+                b=config["b"],
+                epsilon=config["epsilon"],
+                use_tokenizer=config["use_tokenizer"],
+                index_type="sparse",
+                compaction_threshold=config["compaction_threshold"],
+            )
+            instance.sparse_index = BM25SparseIndex.load(path, mmap_mode=mmap_mode)
+            instance.avgdl = config["avgdl"]
+            instance.total_documents = config["total_documents"]
+            instance.average_idf = config["average_idf"]
+            instance.indexed = True
+            return instance
+        except Exception as e:
+            log.error(f"Error loading the index from directory: {e}")
+            raise e
+
     def _extra_repr(self) -> str:
-        s = f"top_k={self.top_k}, k1={self.k1}, b={self.b}, epsilon={self.epsilon}, use_tokenizer={self._use_tokenizer}"
+        s = f"top_k={self.top_k}, k1={self.k1}, b={self.b}, epsilon={self.epsilon}, use_tokenizer={self._use_tokenizer}, index_type={self.index_type}"
         s += f", total_documents={self.total_documents}"
         return s
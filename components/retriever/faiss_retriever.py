@@ -14,6 +14,7 @@ from typing import (
 import numpy as np
 import logging
 import os
+import time
 
 
 from adalflow.core.retriever import Retriever
@@ -24,9 +25,11 @@ from adalflow.core.types import (
     RetrieverStrQueryType,
     EmbedderOutputType,
 )
-from adalflow.core.functional import normalize_np_array, is_normalized
+from adalflow.core.functional import normalize_rows, is_normalized
+from adalflow.core.db import DocumentStore
 
 from adalflow.utils.lazy_import import safe_import, OptionalPackages
+from adalflow.utils.file_io import save_json, load_json
 
 safe_import(OptionalPackages.FAISS.value[0], OptionalPackages.FAISS.value[1])
 import faiss
@@ -44,6 +47,8 @@ FAISSRetrieverQueriesType = Sequence[FAISSRetrieverQueryType]
 FAISSRetrieverQueriesStrType = Sequence[RetrieverStrQueryType]
 FAISSRetrieverQueriesEmbeddingType = Sequence[FAISSRetrieverEmbeddingQueryType]
 
+FAISSIndexType = Literal["flat", "ivf_flat", "ivf_pq", "hnsw"]
+
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
 
@@ -62,6 +67,18 @@ class FAISSRetriever(
         dimensions (Optional[int], optional): Dimension of the embeddings. Defaults to None. It can automatically infer the dimensions from the first chunk.
         documents (Optional[FAISSRetrieverDocumentType], optional): List of embeddings. Format can be List[List[float]] or List[np.ndarray]. Defaults to None.
         metric (Literal["cosine", "euclidean", "prob"], optional): The metric to use for the retrieval. Defaults to "prob" which converts cosine similarity to probability.
+        index_type (Literal["flat", "ivf_flat", "ivf_pq", "hnsw"], optional): The FAISS index to build. Defaults to "flat", the exact search.
+            The other types are approximate, see :meth:`evaluate_recall` to measure their recall against "flat".
+        index_params (Dict[str, Any], optional): Build parameters of the index. Defaults to None.
+
+            - "nlist": number of inverted lists of "ivf_flat" and "ivf_pq". Defaults to ``4 * sqrt(N)``.
+            - "m", "nbits": number of sub-quantizers and bits per code of "ivf_pq". Defaults to 8 and 8, ``m`` must divide the dimensions.
+            - "M", "ef_construction": graph degree and construction depth of "hnsw". Defaults to 32 and 40.
+            - "train_size": number of vectors sampled to train "ivf_flat" and "ivf_pq". Defaults to ``64 * nlist`` (at least ``64 * 2**nbits`` for "ivf_pq").
+        nprobe (int, optional): Number of inverted lists visited per query by the ivf indexes. Defaults to 8.
+        ef_search (int, optional): Search depth of the "hnsw" index. Defaults to 64.
+        keep_embeddings (bool, optional): Keep a copy of the indexed embeddings in ``xb`` and ``documents``. Defaults to True.
+            Set to False to only hold the vectors inside the faiss index, halving the resident memory. :meth:`evaluate_recall` needs them.
 
     How FAISS works:
 
@@ -77,8 +94,39 @@ class FAISSRetriever(
     - faiss.IndexFlatL2: L2 or Euclidean distance, [-inf, inf]
     - faiss.IndexFlatIP: Inner product of embeddings (inner product of normalized vectors will be cosine similarity, [-1, 1])
 
+    Approximate index types, for millions of vectors where the exact O(N*d) search is too slow:
+    - "ivf_flat": clusters the vectors into ``nlist`` inverted lists and only searches the ``nprobe`` closest ones.
+    - "ivf_pq": same as "ivf_flat" but compresses the vectors with product quantization, to fit more vectors in memory.
+    - "hnsw": a navigable graph searched with depth ``ef_search``, no training needed.
+
+    The ivf indexes are trained on a random sample of the documents before adding them.
+    ``nprobe`` and ``ef_search`` trade recall for latency and can also be passed per call:
+
+    .. code-block:: python
+
+        retriever = FAISSRetriever(top_k=5, documents=embeddings, index_type="ivf_flat", index_params={"nlist": 1024})
+        output = retriever(query_embeddings, nprobe=32)
+        print(retriever.evaluate_recall(query_embeddings, search_params=[{"nprobe": 8}, {"nprobe": 32}]))
+
     We choose cosine similarity and convert it to range [0, 1] by adding 1 and dividing by 2 to simulate probability in [0, 1]
 
+    Incremental updates:
+
+    :meth:`add_embeddings` and :meth:`remove_ids` grow and shrink the index in place for streaming ingestion.
+    The ``doc_indices`` in the output are the ids of the embeddings, which are the document positions
+    for an index built by :meth:`build_index_from_documents`.
+
+    Persistence:
+
+    :meth:`save_to_file` writes the index with ``faiss.write_index`` and the retriever settings to a json sidecar file.
+    :meth:`load_from_file` can memory-map the index, so processes loading it share the vectors through the page cache
+    instead of each re-adding them:
+
+    .. code-block:: python
+
+        retriever.save_to_file("index.faiss")  # also writes index.faiss.meta.json
+        retriever = FAISSRetriever.load_from_file("index.faiss", embedder=embedder, mmap=True)
+
     Install FAISS:
 
     As FAISS is optional package, you can install it with pip for cpu version:
@@ -102,6 +150,11 @@ class FAISSRetriever(
             Callable[[Any], FAISSRetrieverDocumentEmbeddingType]
         ] = None,
         metric: Literal["cosine", "euclidean", "prob"] = "prob",
+        index_type: FAISSIndexType = "flat",
+        index_params: Optional[Dict[str, Any]] = None,
+        nprobe: int = 8,
+        ef_search: int = 64,
+        keep_embeddings: bool = True,
     ):
         super().__init__()
 
@@ -113,12 +166,21 @@ class FAISSRetriever(
         self.metric = metric
         if self.metric == "cosine" or self.metric == "prob":
             self._faiss_index_type = faiss.IndexFlatIP
+            self._faiss_metric = faiss.METRIC_INNER_PRODUCT
             self._needs_normalized_embeddings = True
         elif self.metric == "euclidean":
             self._faiss_index_type = faiss.IndexFlatL2
+            self._faiss_metric = faiss.METRIC_L2
             self._needs_normalized_embeddings = False
         else:
             raise ValueError(f"Invalid metric: {self.metric}")
+        if index_type not in ("flat", "ivf_flat", "ivf_pq", "hnsw"):
+            raise ValueError(f"Invalid index_type: {index_type}")
+        self.index_type = index_type
+        self.index_params = index_params or {}
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.keep_embeddings = keep_embeddings
 
         if documents:
             self.documents = documents
@@ -129,6 +191,7 @@ class FAISSRetriever(
         self.total_documents: int = 0
         self.documents: Sequence[Any] = None
         self.xb: np.ndarray = None
+        self.ids: np.ndarray = None  # the id of each row in xb
         self.dimensions: Optional[int] = None
         self.indexed: bool = False
 
@@ -142,10 +205,84 @@ class FAISSRetriever(
             ), f"Dimension mismatch: {self.dimensions} != {self.xb.shape[1]}"
         self.total_documents = xb.shape[0]
 
-        self.index = self._faiss_index_type(self.dimensions)
-        self.index.add(xb)
+        self.index = self._create_faiss_index(self.total_documents)
+        self._train_faiss_index(self.index, xb)
+        # the ids of the documents are their positions
+        self.ids = np.arange(self.total_documents, dtype=np.int64)
+        self.index.add_with_ids(xb, self.ids)
         self.indexed = True
 
+    def _get_nlist(self, num_vectors: int) -> int:
+        nlist = self.index_params.get("nlist") or int(4 * np.sqrt(num_vectors))
+        return max(1, min(nlist, num_vectors))
+
+    def _create_faiss_index(self, num_vectors: int) -> "faiss.Index":
+        r"""Create the empty faiss index of ``index_type`` for ``num_vectors`` vectors.
+
+        The index supports ``add_with_ids``: the flat and hnsw indexes are wrapped in ``faiss.IndexIDMap2``,
+        the ivf indexes store the ids in their inverted lists."""
+        if self.index_type == "flat":
+            return faiss.IndexIDMap2(self._faiss_index_type(self.dimensions))
+        if self.index_type == "hnsw":
+            index = faiss.index_factory(
+                self.dimensions,
+                f"HNSW{self.index_params.get('M', 32)}",
+                self._faiss_metric,
+            )
+            index.hnsw.efConstruction = self.index_params.get("ef_construction", 40)
+            return faiss.IndexIDMap2(index)
+        nlist = self._get_nlist(num_vectors)
+        if self.index_type == "ivf_flat":
+            spec = f"IVF{nlist},Flat"
+        else:
+            m = self.index_params.get("m", 8)
+            nbits = self.index_params.get("nbits", 8)
+            if self.dimensions % m != 0:
+                raise ValueError(
+                    f"index_params['m']={m} should divide the dimensions {self.dimensions}"
+                )
+            spec = f"IVF{nlist},PQ{m}x{nbits}"
+        return faiss.index_factory(self.dimensions, spec, self._faiss_metric)
+
+    def _train_faiss_index(self, index: "faiss.Index", xb: np.ndarray):
+        r"""Train the index on a random sample of ``xb`` if the index type needs training."""
+        if index.is_trained:
+            return
+        train_size = self.index_params.get("train_size")
+        if not train_size:
+            train_size = 64 * self._get_nlist(len(xb))
+            if self.index_type == "ivf_pq":
+                train_size = max(
+                    train_size, 64 * 2 ** self.index_params.get("nbits", 8)
+                )
+        train_size = min(train_size, len(xb))
+        rng = np.random.default_rng(self.index_params.get("seed", 0))
+        sample = np.sort(rng.choice(len(xb), size=train_size, replace=False))
+        log.info(f"Training the {self.index_type} index on {train_size} vectors")
+        index.train(np.ascontiguousarray(xb[sample], dtype=np.float32))
+
+    def _get_search_params(
+        self, nprobe: Optional[int] = None, ef_search: Optional[int] = None
+    ) -> Optional["faiss.SearchParameters"]:
+        r"""Search parameters of the index type, passed per search instead of set on the index."""
+        if self.index_type in ("ivf_flat", "ivf_pq"):
+            return faiss.SearchParametersIVF(nprobe=nprobe or self.nprobe)
+        if self.index_type == "hnsw":
+            return faiss.SearchParametersHNSW(efSearch=ef_search or self.ef_search)
+        return None
+
+    def _search(
+        self,
+        xq: np.ndarray,
+        top_k: int,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ):
+        params = self._get_search_params(nprobe, ef_search)
+        if params is None:
+            return self.index.search(xq, top_k)
+        return self.index.search(xq, top_k, params=params)
+
     def build_index_from_documents(
         self,
         documents: Sequence[Any],
@@ -159,7 +296,10 @@ class FAISSRetriever(
             documents: List of embeddings. Format can be List[List[float]] or List[np.ndarray]
 
         If you are using Document format, pass them as [doc.vector for doc in documents]
+        A DocumentStore is indexed from its vector matrix without copy.
         """
+        if isinstance(documents, DocumentStore) and not document_map_func:
+            documents = documents.vectors
         if document_map_func:
             assert callable(document_map_func), "document_map_func should be callable"
             documents = [document_map_func(doc) for doc in documents]
@@ -175,24 +315,94 @@ class FAISSRetriever(
                     len(doc) == len(documents[0]) for doc in documents
                 ), "All embeddings should be of the same size"
                 self.xb = np.array(documents, dtype=np.float32)
+                owns_xb = True
             else:
                 self.xb = documents
+                owns_xb = False
             if self._needs_normalized_embeddings:
-                first_vector = self.xb[0]
-                if not is_normalized(first_vector):
+                if not is_normalized(self.xb):
                     log.warning(
                         "Embeddings are not normalized, normalizing the embeddings"
                     )
-                    self.xb = normalize_np_array(self.xb)
+                    # the converted copy is normalized in place, the caller's array is not modified
+                    self.xb = normalize_rows(self.xb, inplace=owns_xb)
 
             self._preprare_faiss_index_from_np_array(self.xb)
             log.info(f"Index built with {self.total_documents} chunks")
+            if not self.keep_embeddings:
+                # the faiss index holds its own copy of the vectors
+                self.xb = None
+                self.ids = None
+                self.documents = None
         except Exception as e:
             log.error(f"Error building index: {e}, resetting the index")
             # reset the index
             self.reset_index()
             raise e
 
+    def add_embeddings(
+        self,
+        ids: Sequence[int],
+        vectors: FAISSRetrieverDocumentsType,
+    ):
+        r"""Add embeddings to the index in place, without rebuilding it.
+
+        Only the new batch is converted and normalized. When the index is not built yet,
+        it is built (and trained for the ivf index types) from this batch.
+
+        Args:
+            ids: The unique ids of the embeddings, returned as ``doc_indices`` when retrieved.
+                :meth:`build_index_from_documents` uses the positions of the documents as their ids.
+            vectors: The embeddings, in the same format as the documents of :meth:`build_index_from_documents`.
+        """
+        xb = np.array(vectors, dtype=np.float32, ndmin=2)
+        ids_np = np.asarray(ids, dtype=np.int64)
+        if len(ids_np) != len(xb):
+            raise ValueError(
+                f"The number of ids {len(ids_np)} and vectors {len(xb)} should match"
+            )
+        if self._needs_normalized_embeddings:
+            normalize_rows(xb)
+        if not self.dimensions:
+            self.dimensions = xb.shape[1]
+        elif self.dimensions != xb.shape[1]:
+            raise ValueError(f"Dimension mismatch: {self.dimensions} != {xb.shape[1]}")
+
+        if not self.indexed:
+            self.index = self._create_faiss_index(len(xb))
+            self._train_faiss_index(self.index, xb)
+            self.indexed = True
+        self.index.add_with_ids(xb, ids_np)
+        self.total_documents = self.index.ntotal
+        if self.keep_embeddings:
+            self.xb = xb if self.xb is None else np.concatenate([self.xb, xb])
+            self.ids = (
+                ids_np if self.ids is None else np.concatenate([self.ids, ids_np])
+            )
+            self.documents = self.xb
+
+    def remove_ids(self, ids: Sequence[int]) -> int:
+        r"""Remove embeddings from the index by their ids.
+
+        The "hnsw" index type does not support removal.
+
+        Returns:
+            int: The number of removed embeddings.
+        """
+        assert (
+            self.indexed
+        ), "Index is not built. Please build the index using build_index_from_documents"
+        if self.index_type == "hnsw":
+            raise ValueError("The hnsw index type does not support removing ids")
+        ids_np = np.asarray(ids, dtype=np.int64)
+        num_removed = self.index.remove_ids(ids_np)
+        self.total_documents = self.index.ntotal
+        if self.xb is not None:
+            keep = ~np.isin(self.ids, ids_np)
+            self.xb, self.ids = self.xb[keep], self.ids[keep]
+            self.documents = self.xb
+        return num_removed
+
     def _convert_cosine_similarity_to_probability(self, D: np.ndarray) -> np.ndarray:
         D = (D + 1) / 2
         D = np.round(D, 3)
@@ -203,18 +413,14 @@ class FAISSRetriever(
     ) -> RetrieverOutputType:
         r"""Convert the indices and distances to RetrieverOutputType format."""
         output: RetrieverOutputType = []
-        # Step 1: Filter out the -1, -1 columns along with its scores when top_k > len(chunks)
-        if -1 in Ind:
-            valid_columns = ~np.any(Ind == -1, axis=0)
-
-            D = D[:, valid_columns]
-            Ind = Ind[:, valid_columns]
-        # Step 2: processing rows (one query at a time)
-        for row in zip(Ind, D):
-            indices, distances = row
+        # processing rows (one query at a time)
+        for indices, distances in zip(Ind, D):
+            # faiss pads a row with -1 when it finds fewer than top_k results, e.g. when
+            # top_k > len(chunks) or an ivf/hnsw search reaches too few candidates
+            keep = indices >= 0
             # convert from numpy to list
-            retrieved_documents_indices = indices.tolist()
-            retrieved_documents_scores = distances.tolist()
+            retrieved_documents_indices = indices[keep].tolist()
+            retrieved_documents_scores = distances[keep].tolist()
             output.append(
                 RetrieverOutput(
                     doc_indices=retrieved_documents_indices,
@@ -228,6 +434,8 @@ class FAISSRetriever(
         self,
         input: FAISSRetrieverQueriesEmbeddingType,
         top_k: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
     ) -> RetrieverOutputType:
         if not self.indexed or self.index.ntotal == 0:
             raise ValueError(
@@ -242,8 +450,10 @@ class FAISSRetriever(
         except Exception as e:
             log.error(f"Error converting input to numpy array: {e}")
             raise e
+        if self._needs_normalized_embeddings:
+            xq = normalize_rows(xq, inplace=xq is not input)
 
-        D, Ind = self.index.search(xq, top_k if top_k else self.top_k)
+        D, Ind = self._search(xq, top_k if top_k else self.top_k, nprobe, ef_search)
         if self.metric == "prob":
             D = self._convert_cosine_similarity_to_probability(D)
         output: RetrieverOutputType = self._to_retriever_output(Ind, D)
@@ -253,12 +463,16 @@ class FAISSRetriever(
         self,
         input: Union[str, List[str]],
         top_k: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
     ) -> RetrieverOutputType:
         r"""Retrieve the top k chunks given the query or queries in string format.
 
         Args:
             input: The query or list of queries in string format. Note: ensure the maximum number of queries fits into the embedder.
             top_k: The number of chunks to retrieve. When top_k is not provided, it will use the default top_k set during initialization.
+            nprobe: Overrides the ``nprobe`` of the ivf index types for this call.
+            ef_search: Overrides the ``ef_search`` of the "hnsw" index type for this call.
 
         When top_k is not provided, it will use the default top_k set during initialization.
         """
@@ -289,7 +503,9 @@ class FAISSRetriever(
             log.error(f"Error embedding queries: {e}")
             raise e
         xq = np.array(queries_embeddings, dtype=np.float32)
-        D, Ind = self.index.search(xq, top_k if top_k else self.top_k)
+        if self._needs_normalized_embeddings:
+            normalize_rows(xq)
+        D, Ind = self._search(xq, top_k if top_k else self.top_k, nprobe, ef_search)
         D = self._convert_cosine_similarity_to_probability(D)
 
         output: RetrieverOutputType = [
@@ -310,6 +526,8 @@ class FAISSRetriever(
         self,
         input: FAISSRetrieverQueriesEmbeddingType,
         top_k: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
     ) -> RetrieverOutputType:
         r"""Retrieve the top k chunks given the query or queries in embedding format."""
         ...
@@ -319,6 +537,8 @@ class FAISSRetriever(
         self,
         input: FAISSRetrieverQueriesStrType,
         top_k: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
     ) -> RetrieverOutputType:
         r"""Retrieve the top k chunks given the query or queries in string format."""
         ...
@@ -327,8 +547,13 @@ class FAISSRetriever(
         self,
         input: FAISSRetrieverQueriesType,
         top_k: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
     ) -> RetrieverOutputType:
-        r"""Retrieve the top k chunks given the query or queries in embedding or string format."""
+        r"""Retrieve the top k chunks given the query or queries in embedding or string format.
+
+        ``nprobe`` and ``ef_search`` override the search depth of the approximate index types for this call.
+        """
         assert (
             self.indexed
         ), "Index is not built. Please build the index using build_index_from_documents"
@@ -336,16 +561,141 @@ class FAISSRetriever(
             isinstance(input, Sequence) and isinstance(input[0], str)
         ):
             assert self.embedder, "Embedder is not provided"
-            return self.retrieve_string_queries(input, top_k)
+            return self.retrieve_string_queries(input, top_k, nprobe, ef_search)
         else:
-            return self.retrieve_embedding_queries(input, top_k)
+            return self.retrieve_embedding_queries(input, top_k, nprobe, ef_search)
+
+    def evaluate_recall(
+        self,
+        queries: FAISSRetrieverQueriesEmbeddingType,
+        top_k: Optional[int] = None,
+        search_params: Optional[List[Dict[str, int]]] = None,
+    ) -> List[Dict[str, Any]]:
+        r"""Benchmark the recall and latency of the index against an exact flat index on the same vectors.
+
+        Args:
+            queries: The query embeddings.
+            top_k: The number of chunks to retrieve. Defaults to the ``top_k`` of the retriever.
+            search_params: The settings to benchmark, e.g. ``[{"nprobe": 4}, {"nprobe": 16}]`` or ``[{"ef_search": 32}]``.
+                Defaults to the current ``nprobe`` and ``ef_search``.
+
+        Returns:
+            List[Dict[str, Any]]: One entry per setting with its ``recall`` at ``top_k`` and its ``latency_ms`` per query,
+            followed by the entry of the exact "flat" search for the approximate index types.
+        """
+        assert (
+            self.indexed
+        ), "Index is not built. Please build the index using build_index_from_documents"
+        if self.xb is None:
+            raise ValueError("evaluate_recall needs the indexed vectors in self.xb")
+        top_k = top_k or self.top_k
+        xq = np.ascontiguousarray(queries, dtype=np.float32)
+
+        flat_index = faiss.IndexIDMap2(self._faiss_index_type(self.dimensions))
+        flat_index.add_with_ids(
+            np.ascontiguousarray(self.xb, dtype=np.float32), self.ids
+        )
+        start = time.perf_counter()
+        _, expected = flat_index.search(xq, top_k)
+        flat_latency = (time.perf_counter() - start) * 1000 / len(xq)
+
+        results: List[Dict[str, Any]] = []
+        for params in search_params or [{}]:
+            start = time.perf_counter()
+            _, Ind = self._search(xq, top_k, **params)
+            latency = (time.perf_counter() - start) * 1000 / len(xq)
+            hits = sum(
+                len(set(row[row >= 0]) & set(expected_row[expected_row >= 0]))
+                for row, expected_row in zip(Ind, expected)
+            )
+            results.append(
+                {
+                    "index_type": self.index_type,
+                    **params,
+                    "recall": hits / max(1, int((expected >= 0).sum())),
+                    "latency_ms": latency,
+                }
+            )
+        if self.index_type != "flat":
+            results.append(
+                {"index_type": "flat", "recall": 1.0, "latency_ms": flat_latency}
+            )
+        return results
+
+    def save_to_file(self, path: str):
+        r"""Save the faiss index to ``path`` and the retriever settings to ``{path}.meta.json``.
+
+        The embedder is not saved, pass it again to :meth:`load_from_file`.
+        """
+        assert (
+            self.indexed
+        ), "Index is not built. Please build the index using build_index_from_documents"
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            faiss.write_index(self.index, path)
+            save_json(self._get_metadata(), f"{path}.meta.json")
+        except Exception as e:
+            log.error(f"Error saving the index to file: {e}")
+            raise e
+
+    def _get_metadata(self) -> Dict[str, Any]:
+        return {
+            "top_k": self.top_k,
+            "dimensions": self.dimensions,
+            "metric": self.metric,
+            "index_type": self.index_type,
+            "index_params": self.index_params,
+            "nprobe": self.nprobe,
+            "ef_search": self.ef_search,
+            "total_documents": self.total_documents,
+        }
+
+    @classmethod
+    def load_from_file(
+        cls,
+        path: str,
+        embedder: Optional[Embedder] = None,
+        mmap: bool = False,
+    ) -> "FAISSRetriever":
+        r"""Load a retriever saved by :meth:`save_to_file`.
+
+        Args:
+            path (str): The path of the faiss index.
+            embedder (Embedder, optional): The embedder for string queries, the same one used for the index.
+            mmap (bool, optional): Memory-map the index read-only with ``faiss.IO_FLAG_MMAP`` instead of reading it
+                into memory. Processes loading the same file then share it through the page cache. Defaults to False.
+        """
+        try:
+            metadata = load_json(f"{path}.meta.json")
+            instance = cls(
+                embedder=embedder,
+                top_k=metadata["top_k"],
+                dimensions=metadata["dimensions"],
+                metric=metadata["metric"],
+                index_type=metadata["index_type"],
+                index_params=metadata["index_params"],
+                nprobe=metadata["nprobe"],
+                ef_search=metadata["ef_search"],
+                keep_embeddings=False,
+            )
+            io_flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0
+            instance.index = faiss.read_index(path, io_flags)
+            instance.dimensions = metadata["dimensions"]
+            instance.total_documents = metadata["total_documents"]
+            instance.indexed = True
+            return instance
+        except Exception as e:
+            log.error(f"Error loading the index from file: {e}")
+            raise e
 
     def _extra_repr(self) -> str:
         s = f"top_k={self.top_k}"
         if self.metric:
             s += f", metric={self.metric}"
+        if self.index_type != "flat":
+            s += f", index_type={self.index_type}"
         if self.dimensions:
             s += f", dimensions={self.dimensions}"
-        if self.documents:
+        if self.total_documents:
             s += f", total_documents={self.total_documents}"
         return s
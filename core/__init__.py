@@ -2,11 +2,11 @@ from .base_data_class import DataClass, required_field, DataClassFormatType
 
 from .component import Component, FunComponent, fun_to_component
 from .container import Sequential, ComponentList
-from .db import LocalDB
+from .db import LocalDB, DocumentStore
 from .default_prompt_template import DEFAULT_ADALFLOW_SYSTEM_PROMPT
 from .embedder import Embedder, BatchEmbedder
 from .generator import Generator, BackwardEngine
-from .model_client import ModelClient
+from .model_client import ModelClient, RateLimiter, RateLimitScheduler
 
 # from .parameter import Parameter
 from .prompt_builder import Prompt
@@ -48,6 +48,7 @@ from adalflow.utils.registry import EntityMapping
 
 __all__ = [
     "LocalDB",
+    "DocumentStore",
     "Component",
     "Sequential",
     "ComponentList",
@@ -63,6 +64,8 @@ __all__ = [
     # "Parameter",
     "required_field",
     "ModelClient",
+    "RateLimiter",
+    "RateLimitScheduler",
     "Embedder",
     "BatchEmbedder",
     "Retriever",
@@ -1,6 +1,6 @@
 """A base class that provides an easy way for data to interact with LLMs."""
 
-from typing import List, Dict, Any, Optional, Union, Callable, Type
+from typing import List, Dict, Any, Optional, Union, Callable, Tuple, Type
 import collections
 from collections import OrderedDict
 
@@ -21,6 +21,7 @@ import logging
 from adalflow.core.functional import (
     # dataclass_obj_to_dict,
     custom_asdict,
+    dataclass_field_names,
     dataclass_obj_from_dict,
     get_dataclass_schema,
     convert_schema_to_signature,
@@ -55,6 +56,53 @@ class DataClassFormatType(enum.Enum):
 yaml.add_representer(collections.OrderedDict, represent_ordereddict)
 
 
+class _FieldPlan:
+    r"""The fields of a DataClass subclass, precomputed for :meth:`DataClass.to_dict`.
+
+    ``ordered_names`` are the fields in the serialized order: the input fields, the output
+    fields, then the rest in declaration order. The plan keeps a copy of ``__input_fields__`` and
+    ``__output_fields__`` and is rebuilt when they change, reassigned or edited in place.
+    """
+
+    __slots__ = ("field_names", "ordered_names", "input_fields", "output_fields")
+
+    def __init__(self, cls: Type):
+        self.input_fields: List[str] = list(cls.__input_fields__)
+        self.output_fields: List[str] = list(cls.__output_fields__)
+        self.field_names: Tuple[str, ...] = dataclass_field_names(cls)
+        field_set = set(self.field_names)
+        ordered_names: Dict[str, None] = {}
+        for name in (*self.input_fields, *self.output_fields, *self.field_names):
+            if name in field_set:
+                ordered_names.setdefault(name)
+        self.ordered_names: Tuple[str, ...] = tuple(ordered_names)
+
+
+_FIELD_PLANS: Dict[Type, _FieldPlan] = {}
+_parameter_cls: Optional[Type] = None
+
+
+def _get_field_plan(cls: Type) -> _FieldPlan:
+    plan = _FIELD_PLANS.get(cls)
+    if (
+        plan is None
+        or plan.input_fields != cls.__input_fields__
+        or plan.output_fields != cls.__output_fields__
+    ):
+        plan = _FIELD_PLANS[cls] = _FieldPlan(cls)
+    return plan
+
+
+def _get_parameter_cls() -> Type:
+    # imported on first use, adalflow.optim imports this module
+    global _parameter_cls
+    if _parameter_cls is None:
+        from adalflow.optim.parameter import Parameter
+
+        _parameter_cls = Parameter
+    return _parameter_cls
+
+
 def required_field() -> Callable[[], Any]:
     """
     A factory function to create a required field in a dataclass.
@@ -187,6 +235,8 @@ class DataClass:
     """
     __input_fields__: List[str] = []
     __output_fields__: List[str] = []
+    # bumped by the setters below, so that the caches of the derived schemas are refreshed
+    __schema_version__ = 0
 
     def __post_init__(self):
 
@@ -214,6 +264,7 @@ class DataClass:
             task_desc (str): The task description to set.
         """
         cls.__doc__ = task_desc
+        cls.__schema_version__ += 1
 
     @classmethod
     def get_input_fields(cls):
@@ -229,6 +280,7 @@ class DataClass:
             input_fields (List[str]): The input fields to set.
         """
         cls.__input_fields__ = input_fields
+        cls.__schema_version__ += 1
 
     @classmethod
     def get_output_fields(cls):
@@ -244,6 +296,7 @@ class DataClass:
             output_fields (List[str]): The output fields to set.
         """
         cls.__output_fields__ = output_fields
+        cls.__schema_version__ += 1
 
     def to_dict(
         self,
@@ -293,17 +346,15 @@ class DataClass:
         """
         if not is_dataclass(self):
             raise ValueError("to_dict() called on a class type, not an instance.")
+        plan = _get_field_plan(self.__class__)
         # convert all fields to its data if its parameter
-        fields = self.__dataclass_fields__
-        from adalflow.optim.parameter import Parameter
+        Parameter = _get_parameter_cls()
 
-        for f in fields.values():
-            # print(f"field: {f}")
-            field_value = getattr(self, f.name)
+        for name in plan.field_names:
+            field_value = getattr(self, name)
             # if its a parameter, convert to its data
             if isinstance(field_value, Parameter):
-                setattr(self, f.name, field_value.data)
-        # print(f"adapted self: {self}")
+                setattr(self, name, field_value.data)
 
         # ensure only either include or exclude is used not both
         if include and exclude:
@@ -313,48 +364,23 @@ class DataClass:
 
         excluded: Optional[Dict[str, List[str]]] = None
         if include:  # only support unnested fields
-            # fild all fields of the class
-            fields = self.__dataclass_fields__
             # generate the excluded dict
             excluded = {
                 self.__class__.__name__: [
-                    f.name for f in fields.values() if f.name not in include
+                    name for name in plan.field_names if name not in include
                 ]
             }
         elif exclude:
             if exclude and isinstance(exclude, List):
                 excluded = {self.__class__.__name__: exclude}
             elif exclude and isinstance(exclude, Dict):
-                excluded = deepcopy(exclude)
+                # only read, no need to copy
+                excluded = exclude
             else:
                 excluded = None
-        # return custom_asdict(self, exclude=excluded)
-        # Convert the dataclass to a dictionary
-
-        raw_dict = custom_asdict(self, exclude=excluded)
-
-        # Reorder the dictionary based on input_field and output_field
-        input_fields = self.get_input_fields()
-        output_fields = self.get_output_fields()
-
-        ordered_dict = OrderedDict()
-
-        # First, add input fields in order
-        for field_name in input_fields:
-            if field_name in raw_dict:
-                ordered_dict[field_name] = raw_dict[field_name]
-
-        # Then, add output fields in order
-        for field_name in output_fields:
-            if field_name in raw_dict:
-                ordered_dict[field_name] = raw_dict[field_name]
-
-        # Finally, add any remaining fields (if there are any)
-        for field_name, value in raw_dict.items():
-            if field_name not in ordered_dict:
-                ordered_dict[field_name] = value
 
-        return dict(ordered_dict)
+        # Convert the dataclass to a dictionary, ordered by input_field and output_field
+        return custom_asdict(self, exclude=excluded, field_names=plan.ordered_names)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "DataClass":
@@ -381,7 +407,7 @@ class DataClass:
         """
         try:
             dclass = dataclass_obj_from_dict(cls, data)
-            logger.debug(f"Dataclass instance created from dict: {dclass}")
+            logger.debug("Dataclass instance created from dict: %s", dclass)
             return dclass
         except TypeError as e:
             raise ValueError(f"Failed to load data: {e}")
@@ -1,15 +1,33 @@
 """LocalDB to perform in-memory storage and data persistence(pickle or any filesystem) for data models like documents and dialogturn."""
 
-from typing import List, Optional, Callable, Dict, Any, TypeVar, Generic, overload
+from typing import (
+    List,
+    Optional,
+    Callable,
+    Dict,
+    Any,
+    TypeVar,
+    Generic,
+    Iterable,
+    Iterator,
+    Literal,
+    Sequence,
+    Union,
+    overload,
+)
+import json
 import logging
 import os
 from dataclasses import field, dataclass
 import pickle
 
+import numpy as np
 
 from adalflow.core.component import Component
+from adalflow.core.types import Document
 from adalflow.utils.registry import EntityMapping
 from adalflow.utils.global_config import get_adalflow_default_root_path
+from adalflow.utils.lazy_import import safe_import, OptionalPackages
 
 
 log = logging.getLogger(__name__)
@@ -31,6 +49,8 @@ class LocalDB(Generic[T], Component):
        This is highly useful to manage experiments with different data transformations.
     3. You can save the state of the LocalDB to a pickle file and load it back later. All states are restored.
         str(local_db.__dict__) == str(local_db_loaded.__dict__) should be True.
+    4. For large corpora of documents, load a :class:`DocumentStore` instead of a list of documents.
+       It supports the list operations used here, and the TextSplitter and ToEmbeddings transformers.
 
     .. note::
         The transformer should be of type Component. We made the effort in the library to make every component picklable.
@@ -377,3 +397,389 @@ class LocalDB(Generic[T], Component):
                 or globals()[_transformer_type_names[key]]
             )
             self.transformer_setups[key] = class_type.from_dict(transformer_file)
+
+
+# columns of a DocumentStore other than the vector, in the order of the Document fields
+_DOCUMENT_COLUMNS = (
+    "id",
+    "text",
+    "meta_data",
+    "order",
+    "score",
+    "parent_doc_id",
+    "estimated_num_tokens",
+)
+
+
+class DocumentStore:
+    __doc__ = r"""A columnar store of documents, with the vectors in one contiguous float32 matrix.
+
+    A ``List[Document]`` keeps every vector as a list of Python floats, about 32 bytes per float.
+    The store keeps one Python list per Document field and the vectors in a ``(num_documents, dim)``
+    float32 matrix, 4 bytes per float, that grows in place as documents are added.
+
+    Indexing the store returns a :class:`Document` view: its fields share the stored objects and its
+    ``vector`` is a row view of the matrix, nothing is copied. The views of the removed or moved rows are
+    invalid after :meth:`insert` or :meth:`pop`. Either all documents have vectors of the same dimension,
+    or none has a vector.
+
+    The store supports the list operations used by :class:`LocalDB` (``append``, ``extend``, ``insert``,
+    ``pop``, ``copy``, iteration), so it can be loaded as its items. ``TextSplitter`` and ``ToEmbeddings``
+    accept and return a store, ``FAISSRetriever.build_index_from_documents`` indexes its vector matrix.
+    It persists to Parquet or Arrow IPC with ``pyarrow``, an Arrow IPC file is memory-mapped on load.
+
+    Args:
+        documents (Optional[Iterable[Document]]): The documents to store. Defaults to None.
+
+    Example:
+
+    .. code-block:: python
+
+        from adalflow.core.db import DocumentStore
+        from adalflow.components.data_process import TextSplitter, ToEmbeddings
+
+        store = DocumentStore(documents)
+        chunks = TextSplitter(split_by="word", chunk_size=400)(store)
+        chunks = ToEmbeddings(embedder=embedder)(chunks)
+        retriever.build_index_from_documents(chunks)  # indexes chunks.vectors
+        chunks.save("chunks.arrow")
+
+        chunks = DocumentStore.load("chunks.arrow")  # memory-mapped
+        print(chunks[0].text, chunks.vectors.shape)
+    """
+
+    def __init__(self, documents: Optional[Iterable[Document]] = None):
+        self._columns: Dict[str, List[Any]] = {name: [] for name in _DOCUMENT_COLUMNS}
+        # (capacity, dim) float32 buffer, the first len(self) rows are used
+        self._vectors: Optional[np.ndarray] = None
+        if documents is not None:
+            self.extend(documents)
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Document]) -> "DocumentStore":
+        return cls(documents)
+
+    def __len__(self) -> int:
+        return len(self._columns["id"])
+
+    @property
+    def vectors(self) -> Optional[np.ndarray]:
+        r"""The ``(num_documents, dim)`` float32 vector matrix, a view without copy. None without vectors."""
+        if self._vectors is None:
+            return None
+        return self._vectors[: len(self)]
+
+    @property
+    def embedding_dim(self) -> Optional[int]:
+        return None if self._vectors is None else self._vectors.shape[1]
+
+    def column(self, name: str) -> List[Any]:
+        r"""Return the list of a Document field, such as "text", shared with the store."""
+        return self._columns[name]
+
+    @property
+    def texts(self) -> List[str]:
+        return self._columns["text"]
+
+    @property
+    def ids(self) -> List[Any]:
+        return self._columns["id"]
+
+    def set_vectors(self, vectors: Union[np.ndarray, Sequence[Sequence[float]]]):
+        r"""Set the vectors of all documents, a float32 C-contiguous matrix is used without copy."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[0] != len(self):
+            raise ValueError(
+                f"Expected vectors of shape ({len(self)}, dim), got {vectors.shape}"
+            )
+        self._vectors = vectors
+
+    def _document(self, index: int, vector: Optional[np.ndarray] = None) -> Document:
+        columns = self._columns
+        if vector is None:
+            vector = self._vectors[index] if self._vectors is not None else []
+        return Document(
+            text=columns["text"][index],
+            meta_data=columns["meta_data"][index],
+            vector=vector,
+            id=columns["id"][index],
+            order=columns["order"][index],
+            score=columns["score"][index],
+            parent_doc_id=columns["parent_doc_id"][index],
+            estimated_num_tokens=columns["estimated_num_tokens"][index],
+        )
+
+    @overload
+    def __getitem__(self, index: int) -> Document: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "DocumentStore": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.select(range(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("DocumentStore index out of range")
+        return self._document(index)
+
+    def __iter__(self) -> Iterator[Document]:
+        for index in range(len(self)):
+            yield self._document(index)
+
+    def select(self, indices: Sequence[int]) -> "DocumentStore":
+        r"""Return a new store with the documents at ``indices``, such as the ``doc_indices`` of a RetrieverOutput."""
+        indices = list(indices)
+        store = DocumentStore()
+        for name, values in self._columns.items():
+            store._columns[name] = [values[i] for i in indices]
+        if self._vectors is not None:
+            store._vectors = self.vectors[np.asarray(indices, dtype=np.int64)]
+        return store
+
+    def to_documents(self, vectors_as_list: bool = False) -> List[Document]:
+        r"""Return the documents as a list, with the vectors as lists of floats when ``vectors_as_list``."""
+        if not vectors_as_list or self._vectors is None:
+            return list(self)
+        vectors = self.vectors.tolist()
+        return [self._document(i, vector) for i, vector in enumerate(vectors)]
+
+    def _reserve(self, num_rows: int, dim: int):
+        r"""Make room for ``num_rows`` more vectors, growing the buffer geometrically."""
+        size = len(self)
+        if self._vectors is None:
+            if size:
+                raise ValueError(
+                    "Cannot add documents with vectors to a store without vectors"
+                )
+            self._vectors = np.empty((num_rows, dim), dtype=np.float32)
+            return
+        if self._vectors.shape[1] != dim:
+            raise ValueError(
+                f"Expected vectors of dimension {self._vectors.shape[1]}, got {dim}"
+            )
+        capacity = self._vectors.shape[0]
+        # a loaded matrix can be read-only, so it is copied to a writable buffer first
+        if size + num_rows > capacity or not self._vectors.flags.writeable:
+            capacity = max(size + num_rows, capacity + capacity // 2)
+            vectors = np.empty((capacity, dim), dtype=np.float32)
+            vectors[:size] = self._vectors[:size]
+            self._vectors = vectors
+
+    def _check_no_vectors(self, num_rows: int):
+        if self._vectors is not None and num_rows:
+            raise ValueError(
+                "Documents without vectors cannot be added to a store with vectors"
+            )
+
+    def append(self, document: Document):
+        self.extend([document])
+
+    def extend(self, documents: Iterable[Document]):
+        r"""Add documents at the end, their vectors are copied into the matrix in one pass."""
+        if isinstance(documents, DocumentStore):
+            self._extend_store(documents)
+            return
+        documents = list(documents)
+        if not documents:
+            return
+        with_vectors = [
+            doc.vector is not None and len(doc.vector) > 0 for doc in documents
+        ]
+        if any(with_vectors):
+            if not all(with_vectors):
+                raise ValueError(
+                    "Either all documents have vectors of the same dimension, or none"
+                )
+            vectors = np.asarray([doc.vector for doc in documents], dtype=np.float32)
+            if vectors.ndim != 2:
+                raise ValueError("All vectors should have the same dimension")
+            self._reserve(len(documents), vectors.shape[1])
+            size = len(self)
+            self._vectors[size : size + len(documents)] = vectors
+        else:
+            self._check_no_vectors(len(documents))
+        for name, values in self._columns.items():
+            values.extend(getattr(doc, name) for doc in documents)
+
+    def _extend_store(self, store: "DocumentStore"):
+        if store._vectors is not None and len(store):
+            self._reserve(len(store), store._vectors.shape[1])
+            size = len(self)
+            self._vectors[size : size + len(store)] = store.vectors
+        else:
+            self._check_no_vectors(len(store))
+        for name, values in self._columns.items():
+            values.extend(store._columns[name])
+
+    def insert(self, index: int, document: Document):
+        r"""Insert a document before ``index``, the vectors after it are moved by one row."""
+        size = len(self)
+        index = max(0, min(index + size if index < 0 else index, size))
+        self.append(document)
+        if index == size:
+            return
+        for values in self._columns.values():
+            values.insert(index, values.pop())
+        if self._vectors is not None:
+            vector = self._vectors[size].copy()
+            self._vectors[index + 1 : size + 1] = self._vectors[index:size]
+            self._vectors[index] = vector
+
+    def pop(self, index: Optional[int] = None) -> Document:
+        r"""Remove and return the document at ``index``, the last one by default, like ``list.pop``."""
+        size = len(self)
+        if index is None:
+            index = size - 1
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("pop index out of range")
+        vector = None
+        if self._vectors is not None:
+            vector = self._vectors[index].copy()
+            if index < size - 1:
+                if not self._vectors.flags.writeable:
+                    self._reserve(0, self._vectors.shape[1])
+                self._vectors[index : size - 1] = self._vectors[index + 1 : size]
+        document = self._document(index, vector)
+        for values in self._columns.values():
+            del values[index]
+        if self._vectors is not None and not len(self):
+            self._vectors = None
+        return document
+
+    def copy(self, include_vectors: bool = True) -> "DocumentStore":
+        r"""Return a copy with new column lists, the stored objects such as the meta_data are shared.
+
+        The vectors are copied, unless ``include_vectors`` is False, which returns a store without vectors.
+        """
+        store = DocumentStore()
+        store._columns = {name: list(values) for name, values in self._columns.items()}
+        if include_vectors and self._vectors is not None:
+            store._vectors = self.vectors.copy()
+        return store
+
+    def to_arrow(self) -> Any:
+        r"""Convert the store to a ``pyarrow.Table``, the meta_data are stored as JSON strings."""
+        pa = safe_import(
+            OptionalPackages.PYARROW.value[0], OptionalPackages.PYARROW.value[1]
+        )
+        columns = self._columns
+
+        def as_str(values: List[Any]) -> List[Optional[str]]:
+            return [None if value is None else str(value) for value in values]
+
+        arrays = {
+            "id": pa.array(as_str(columns["id"]), type=pa.string()),
+            "text": pa.array(columns["text"], type=pa.string()),
+            "meta_data": pa.array(
+                [
+                    None if meta is None else json.dumps(meta, default=str)
+                    for meta in columns["meta_data"]
+                ],
+                type=pa.string(),
+            ),
+            "order": pa.array(columns["order"], type=pa.int64()),
+            "score": pa.array(columns["score"], type=pa.float64()),
+            "parent_doc_id": pa.array(as_str(columns["parent_doc_id"]), pa.string()),
+            "estimated_num_tokens": pa.array(
+                columns["estimated_num_tokens"], type=pa.int64()
+            ),
+        }
+        if self._vectors is not None:
+            dim = self._vectors.shape[1]
+            # the flat float32 buffer is wrapped without copy
+            values = pa.array(self.vectors.reshape(-1), type=pa.float32())
+            arrays["vector"] = pa.FixedSizeListArray.from_arrays(values, dim)
+        return pa.table(arrays)
+
+    @classmethod
+    def from_arrow(cls, table: Any) -> "DocumentStore":
+        r"""Create a store from a ``pyarrow.Table`` written by :meth:`to_arrow`.
+
+        The vector matrix is a view of the Arrow buffer when the table has a single chunk, such as a
+        memory-mapped Arrow IPC file. It is then read-only, and copied on the first write.
+        """
+        store = cls()
+        for name in _DOCUMENT_COLUMNS:
+            store._columns[name] = table.column(name).to_pylist()
+        store._columns["meta_data"] = [
+            None if meta is None else json.loads(meta)
+            for meta in store._columns["meta_data"]
+        ]
+        if "vector" in table.column_names and table.num_rows:
+            vector_column = table.column("vector")
+            dim = vector_column.type.list_size
+            if vector_column.num_chunks == 1:
+                vectors = vector_column.chunk(0)
+            else:
+                vectors = vector_column.combine_chunks()
+            store._vectors = (
+                vectors.flatten().to_numpy(zero_copy_only=False).reshape(-1, dim)
+            )
+        return store
+
+    def save(self, path: str, format: Optional[Literal["parquet", "arrow"]] = None):
+        r"""Save the store to a Parquet or an Arrow IPC file.
+
+        Args:
+            path (str): The file path.
+            format (Optional[Literal["parquet", "arrow"]]): Defaults to None, "arrow" for the ".arrow",
+                ".feather" and ".ipc" suffixes and "parquet" otherwise.
+        """
+        pa = safe_import(
+            OptionalPackages.PYARROW.value[0], OptionalPackages.PYARROW.value[1]
+        )
+        format = format or _infer_store_format(path)
+        table = self.to_arrow()
+        file_dir = os.path.dirname(path)
+        if file_dir:
+            os.makedirs(file_dir, exist_ok=True)
+        if format == "parquet":
+            import pyarrow.parquet as pq
+
+            pq.write_table(table, path)
+        elif format == "arrow":
+            with pa.OSFile(path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        else:
+            raise ValueError(f"Unsupported format {format}, use parquet or arrow")
+        log.info(f"Saved {len(self)} documents to {path}")
+
+    @classmethod
+    def load(
+        cls, path: str, format: Optional[Literal["parquet", "arrow"]] = None
+    ) -> "DocumentStore":
+        r"""Load a store saved by :meth:`save`. An Arrow IPC file is memory-mapped, its vectors are not read in memory."""
+        pa = safe_import(
+            OptionalPackages.PYARROW.value[0], OptionalPackages.PYARROW.value[1]
+        )
+        format = format or _infer_store_format(path)
+        if format == "parquet":
+            import pyarrow.parquet as pq
+
+            table = pq.read_table(path)
+        elif format == "arrow":
+            table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        else:
+            raise ValueError(f"Unsupported format {format}, use parquet or arrow")
+        return cls.from_arrow(table)
+
+    def __getstate__(self):
+        # the spare capacity of the vector buffer is not pickled
+        return {"_columns": self._columns, "_vectors": self.vectors}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def __repr__(self) -> str:
+        return f"DocumentStore(num_documents={len(self)}, embedding_dim={self.embedding_dim})"
+
+
+def _infer_store_format(path: str) -> str:
+    if os.path.splitext(path)[1].lower() in (".arrow", ".feather", ".ipc"):
+        return "arrow"
+    return "parquet"
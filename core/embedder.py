@@ -1,11 +1,15 @@
 r"""The component that orchestrates model client (Embedding models in particular) and output processors."""
 
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, Dict, List, Callable
+import asyncio
 import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 
 from adalflow.core.types import ModelType, EmbedderOutput
-from adalflow.core.model_client import ModelClient
+from adalflow.core.model_client import ModelClient, RateLimiter
 from adalflow.core.types import (
     EmbedderOutputType,
     EmbedderInputType,
@@ -140,7 +144,7 @@ class Embedder(Component):
         output: EmbedderOutputType = None
         response = None
         try:
-            response = self.model_client.call(
+            response = self.model_client.scheduled_call(
                 api_kwargs=api_kwargs, model_type=self.model_type
             )
         except Exception as e:
@@ -169,7 +173,7 @@ class Embedder(Component):
         output: EmbedderOutputType = None
         response = None
         try:
-            response = await self.model_client.acall(
+            response = await self.model_client.ascheduled_call(
                 api_kwargs=api_kwargs, model_type=self.model_type
             )
         except Exception as e:
@@ -195,15 +199,154 @@ class Embedder(Component):
 class BatchEmbedder(Component):
     __doc__ = r"""Adds batching to the embedder component.
 
+    By default the batches are embedded one after another. With ``max_concurrency`` above 1 the batches
+    are sent concurrently through ``Embedder.acall``, or through a thread pool with ``Embedder.call``
+    when the model client does not implement ``acall``. The outputs are always returned in the input order.
+
     Args:
         embedder (Embedder): The embedder to use for batching.
         batch_size (int, optional): The batch size to use for batching. Defaults to 100.
+        max_concurrency (int, optional): The maximum number of batches in flight. Defaults to 1.
+        requests_per_minute (Optional[int], optional): Limit on the number of requests sent per minute. Defaults to None.
+        tokens_per_minute (Optional[int], optional): Limit on the number of input tokens sent per minute. The tokens are counted
+            with ``token_counter``. Defaults to None.
+        max_retries (int, optional): How many times a failed batch is retried. Defaults to 0, no retries.
+        backoff_base (float, optional): The base delay in seconds of the exponential backoff between retries,
+            with full jitter. Defaults to 1.0.
+        token_counter (Optional[Callable[[str], int]], optional): Counts the tokens of one input. Defaults to
+            ``Tokenizer().count_tokens``.
+
+    Example:
+
+    .. code-block:: python
+
+        batch_embedder = BatchEmbedder(
+            embedder=embedder,
+            batch_size=100,
+            max_concurrency=8,
+            requests_per_minute=3000,
+            tokens_per_minute=1_000_000,
+        )
+        outputs = batch_embedder(input=texts)  # or: await batch_embedder.acall(input=texts)
     """
 
-    def __init__(self, embedder: Embedder, batch_size: int = 100) -> None:
-        super().__init__(batch_size=batch_size)
+    def __init__(
+        self,
+        embedder: Embedder,
+        batch_size: int = 100,
+        max_concurrency: int = 1,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_retries: int = 0,
+        backoff_base: float = 1.0,
+        token_counter: Optional[Callable[[str], int]] = None,
+    ) -> None:
+        super().__init__(
+            batch_size=batch_size,
+            max_concurrency=max_concurrency,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            max_retries=max_retries,
+            backoff_base=backoff_base,
+        )
         self.embedder = embedder
         self.batch_size = batch_size
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._token_counter = token_counter
+        self._request_limiter = (
+            RateLimiter(requests_per_minute) if requests_per_minute else None
+        )
+        self._token_limiter = (
+            RateLimiter(tokens_per_minute) if tokens_per_minute else None
+        )
+
+    def _supports_async(self) -> bool:
+        r"""Whether the model client overrides the no-op ``ModelClient.acall``."""
+        return type(self.embedder.model_client).acall is not ModelClient.acall
+
+    def _split_batches(self, input: BatchEmbedderInputType) -> List[List[str]]:
+        if isinstance(input, str):
+            input = [input]
+        return [
+            input[i : i + self.batch_size]
+            for i in range(0, len(input), self.batch_size)
+        ]
+
+    def _count_tokens(self, batch_input: List[str]) -> int:
+        if self._token_counter is None:
+            from adalflow.core.tokenizer import Tokenizer
+
+            self._token_counter = Tokenizer().count_tokens
+        return sum(self._token_counter(text) for text in batch_input)
+
+    def _reserve(self, batch_input: List[str]) -> float:
+        r"""Reserve the rate limit for one request and return how long to wait for it."""
+        delay = 0.0
+        if self._request_limiter is not None:
+            delay = self._request_limiter.reserve(1)
+        if self._token_limiter is not None:
+            delay = max(
+                delay, self._token_limiter.reserve(self._count_tokens(batch_input))
+            )
+        return delay
+
+    def _backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, self.backoff_base * 2**attempt)
+
+    def _embed_batch(
+        self, batch_input: List[str], model_kwargs: Optional[Dict] = {}
+    ) -> EmbedderOutputType:
+        r"""Embed one batch with the sync ``Embedder.call``, with rate limiting and retries."""
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._reserve(batch_input))
+            output = self.embedder.call(input=batch_input, model_kwargs=model_kwargs)
+            if output.error is None or attempt == self.max_retries:
+                return output
+            log.warning(
+                f"Batch embedding failed: {output.error}, retry {attempt + 1}/{self.max_retries}"
+            )
+            time.sleep(self._backoff_delay(attempt))
+        return output
+
+    async def _aembed_batch(
+        self,
+        batch_input: List[str],
+        model_kwargs: Optional[Dict],
+        semaphore: asyncio.Semaphore,
+    ) -> EmbedderOutputType:
+        r"""Embed one batch with ``Embedder.acall``, with rate limiting and retries."""
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                await asyncio.sleep(self._reserve(batch_input))
+                output = await self.embedder.acall(
+                    input=batch_input, model_kwargs=model_kwargs
+                )
+                if output.error is None or attempt == self.max_retries:
+                    return output
+                log.warning(
+                    f"Batch embedding failed: {output.error}, retry {attempt + 1}/{self.max_retries}"
+                )
+                await asyncio.sleep(self._backoff_delay(attempt))
+            return output
+
+    def _call_in_threads(
+        self, batches: List[List[str]], model_kwargs: Optional[Dict]
+    ) -> BatchEmbedderOutputType:
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            # map keeps the input order
+            return list(
+                tqdm(
+                    executor.map(
+                        lambda batch: self._embed_batch(batch, model_kwargs), batches
+                    ),
+                    total=len(batches),
+                    desc="Batch embedding documents",
+                )
+            )
 
     def call(
         self, input: BatchEmbedderInputType, model_kwargs: Optional[Dict] = {}
@@ -216,20 +359,45 @@ class BatchEmbedder(Component):
             model_kwargs (Optional[Dict], optional): The model kwargs to pass to the embedder. Defaults to {}.
 
         Returns:
-            BatchEmbedderOutputType: The output from the embedder.
+            BatchEmbedderOutputType: The output from the embedder, one ``EmbedderOutput`` per batch in the input order.
         """
+        batches = self._split_batches(input)
+        if self.max_concurrency > 1:
+            try:
+                asyncio.get_running_loop()
+                in_event_loop = True
+            except RuntimeError:
+                in_event_loop = False
+            if self._supports_async() and not in_event_loop:
+                return asyncio.run(self.acall(input=input, model_kwargs=model_kwargs))
+            return self._call_in_threads(batches, model_kwargs)
 
-        if isinstance(input, str):
-            input = [input]
-        n = len(input)
         embeddings: List[EmbedderOutputType] = []
-        for i in tqdm(
-            range(0, n, self.batch_size),
-            desc="Batch embedding documents",
-        ):
-            batch_input = input[i : i + self.batch_size]
-            batch_output = self.embedder.call(
-                input=batch_input, model_kwargs=model_kwargs
-            )
+        for batch_input in tqdm(batches, desc="Batch embedding documents"):
+            batch_output = self._embed_batch(batch_input, model_kwargs)
             embeddings.append(batch_output)
         return embeddings
+
+    async def acall(
+        self, input: BatchEmbedderInputType, model_kwargs: Optional[Dict] = {}
+    ) -> BatchEmbedderOutputType:
+        r"""Call the embedder with batching, keeping up to ``max_concurrency`` batches in flight.
+
+        Clients without async support are called from a thread pool instead.
+
+        Returns:
+            BatchEmbedderOutputType: The output from the embedder, one ``EmbedderOutput`` per batch in the input order.
+        """
+        batches = self._split_batches(input)
+        if not self._supports_async():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, self._call_in_threads, batches, model_kwargs
+            )
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = [
+            self._aembed_batch(batch_input, model_kwargs, semaphore)
+            for batch_input in batches
+        ]
+        # gather keeps the input order
+        return await asyncio.gather(*tasks)
@@ -17,6 +17,8 @@ from typing import (
     Set,
     Sequence,
     TypeVar,
+    Iterable,
+    Iterator,
 )
 import logging
 import numpy as np
@@ -41,8 +43,46 @@ T_co = TypeVar("T_co", covariant=True)
 ########################################################################################
 
 
+# values of these types are returned as they are by custom_asdict and dataclass_obj_from_dict
+_ATOMIC_TYPES = frozenset({str, int, float, bool, bytes, complex, type(None)})
+
+# per-class plans, so that the fields of a dataclass are only reflected on once
+_DATACLASS_FIELD_NAMES: Dict[type, Optional[Tuple[str, ...]]] = {}
+_DATACLASS_FIELD_TYPES: Dict[type, Dict[str, Tuple[Any, bool]]] = {}
+
+
+def dataclass_field_names(cls: type) -> Optional[Tuple[str, ...]]:
+    r"""Return the field names of a dataclass type in declaration order, or None for other types.
+
+    The result is cached per type, as the fields of a dataclass do not change after its creation.
+    """
+    try:
+        return _DATACLASS_FIELD_NAMES[cls]
+    except KeyError:
+        names = tuple(f.name for f in fields(cls)) if is_dataclass(cls) else None
+        _DATACLASS_FIELD_NAMES[cls] = names
+        return names
+
+
+def _dataclass_field_types(cls: type) -> Dict[str, Tuple[Any, bool]]:
+    r"""Map each field of a dataclass type to its type and whether the type may be a dataclass."""
+    try:
+        return _DATACLASS_FIELD_TYPES[cls]
+    except KeyError:
+        field_types = {
+            f.name: (f.type, is_potential_dataclass(f.type))
+            for f in cls.__dataclass_fields__.values()
+        }
+        _DATACLASS_FIELD_TYPES[cls] = field_types
+        return field_types
+
+
 def custom_asdict(
-    obj, *, dict_factory=dict, exclude: ExcludeType = None
+    obj,
+    *,
+    dict_factory=dict,
+    exclude: ExcludeType = None,
+    field_names: Optional[Sequence[str]] = None,
 ) -> Dict[str, Any]:
     """Equivalent to asdict() from dataclasses module but with exclude fields.
 
@@ -53,25 +93,47 @@ def custom_asdict(
     The function applies recursively to field values that are
     dataclass instances. This will also look into built-in containers:
     tuples, lists, and dicts.
+
+    If given, 'field_names' are the top-level fields to convert, in this order,
+    instead of all the fields in declaration order.
     """
     if not is_dataclass_instance(obj):
         raise TypeError("custom_asdict() should be called on dataclass instances")
-    return _asdict_inner(obj, dict_factory, exclude or {})
+    exclude = exclude or {}
+    if field_names is None:
+        return _asdict_inner(obj, dict_factory, exclude)
+    excluded = exclude.get(obj.__class__.__name__, ())
+    return dict_factory(
+        [
+            (name, _asdict_inner(getattr(obj, name), dict_factory, exclude))
+            for name in field_names
+            if name not in excluded
+        ]
+    )
 
 
 def _asdict_inner(obj, dict_factory, exclude):
-    if is_dataclass_instance(obj):
-        result = []
-        for f in fields(obj):
-            if f.name in exclude.get(obj.__class__.__name__, []):
-                continue
-            value = _asdict_inner(getattr(obj, f.name), dict_factory, exclude)
-            result.append((f.name, value))
-        return dict_factory(result)
+    obj_type = type(obj)
+    if obj_type in _ATOMIC_TYPES:
+        return obj
+    names = dataclass_field_names(obj_type)
+    if names is not None:
+        excluded = exclude.get(obj_type.__name__, ()) if exclude else ()
+        return dict_factory(
+            [
+                (name, _asdict_inner(getattr(obj, name), dict_factory, exclude))
+                for name in names
+                if name not in excluded
+            ]
+        )
     elif isinstance(obj, tuple) and hasattr(obj, "_fields"):
         return type(obj)(*[_asdict_inner(v, dict_factory, exclude) for v in obj])
     elif isinstance(obj, (list, tuple)):
-        return type(obj)(_asdict_inner(v, dict_factory, exclude) for v in obj)
+        items = [
+            v if type(v) in _ATOMIC_TYPES else _asdict_inner(v, dict_factory, exclude)
+            for v in obj
+        ]
+        return items if obj_type is list else obj_type(items)
     elif isinstance(obj, dict):
         return type(obj)(
             (
@@ -245,7 +307,7 @@ def dataclass_obj_from_dict(cls: Type[object], data: Dict[str, object]) -> Any:
        # TrecDataList(data=[TrecData(question='What is the capital of France?', label=0)], name='trec_data_list')
 
     """
-    log.debug(f"Dataclass: {cls}, Data: {data}")
+    log.debug("Dataclass: %s, Data: %s", cls, data)
     if data is None:
         return None
 
@@ -253,76 +315,64 @@ def dataclass_obj_from_dict(cls: Type[object], data: Dict[str, object]) -> Any:
         cls
     ):  # Optional[Address] will be false, and true for each check
 
-        log.debug(
-            f"{is_dataclass(cls)} of {cls}, {is_potential_dataclass(cls)} of {cls}"
-        )
         # Ensure the data is a dictionary
         if not isinstance(data, dict):
             raise ValueError(
                 f"Expected data of type dict for {cls}, but got {type(data).__name__}"
             )
         cls_type = extract_dataclass_type(cls)
-        fieldtypes = {f.name: f.type for f in cls_type.__dataclass_fields__.values()}
-
-        restored_data = cls_type(
-            **{
-                key: dataclass_obj_from_dict(fieldtypes[key], value)
-                for key, value in data.items()
-            }
-        )
-        return restored_data
-    elif isinstance(data, (list, tuple)):
-        log.debug(f"List or Tuple: {cls}, {data}")
-        restored_data = []
-        for item in data:
-            if check_data_class_field_args_zero(cls):
-                # restore the value to its dataclass type
-                restored_data.append(dataclass_obj_from_dict(cls.__args__[0], item))
-
-            elif check_if_class_field_args_zero_exists(cls):
-                # Use the original data [Any]
-                restored_data.append(dataclass_obj_from_dict(cls.__args__[0], item))
+        fieldtypes = _dataclass_field_types(cls_type)
 
+        kwargs = {}
+        for key, value in data.items():
+            field_type, maybe_dataclass = fieldtypes[key]
+            # plain values of plain fields are kept as they are
+            if type(value) in _ATOMIC_TYPES and not maybe_dataclass:
+                kwargs[key] = value
             else:
-                restored_data.append(item)
+                kwargs[key] = dataclass_obj_from_dict(field_type, value)
+        restored_data = cls_type(**kwargs)
         return restored_data
+    elif isinstance(data, (list, tuple)):
+        log.debug("List or Tuple: %s, %s", cls, data)
+        if check_if_class_field_args_zero_exists(cls):
+            # restore the items to their (data)class type
+            return list(_restore_items(cls.__args__[0], data))
+        return list(data)
 
     elif isinstance(data, set):
-        log.debug(f"Set: {cls}, {data}")
-        restored_data = set()
-        for item in data:
-            if check_data_class_field_args_zero(cls):
-                # restore the value to its dataclass type
-                restored_data.add(dataclass_obj_from_dict(cls.__args__[0], item))
-            elif check_if_class_field_args_zero_exists(cls):
-                # Use the original data [Any]
-                restored_data.add(dataclass_obj_from_dict(cls.__args__[0], item))
-
-            else:
-                # Use the original data [Any]
-                restored_data.add(item)
-        return restored_data
+        log.debug("Set: %s, %s", cls, data)
+        if check_if_class_field_args_zero_exists(cls):
+            # restore the items to their (data)class type
+            return set(_restore_items(cls.__args__[0], data))
+        # Use the original data [Any]
+        return set(data)
 
     elif isinstance(data, dict):
-        log.debug(f"Dict: {cls}, {data}")
-        for key, value in data.items():
-            if check_data_class_field_args_one(cls):
-                # restore the value to its dataclass type
-                data[key] = dataclass_obj_from_dict(cls.__args__[1], value)
-            elif check_if_class_field_args_one_exists(cls):
-                # Use the original data [Any]
-
-                data[key] = dataclass_obj_from_dict(cls.__args__[1], value)
-            else:
-                # Use the original data [Any]
+        log.debug("Dict: %s, %s", cls, data)
+        if check_if_class_field_args_one_exists(cls):
+            # restore the values to their (data)class type
+            values = _restore_items(cls.__args__[1], data.values())
+            for key, value in zip(list(data), values):
                 data[key] = value
+        # else use the original data [Any]
         return data
     # else normal data like int, str, float, etc.
     else:
-        log.debug(f"Not datclass, or list, or dict: {cls}, use the original data.")
+        log.debug("Not datclass, or list, or dict: %s, use the original data.", cls)
         return data
 
 
+def _restore_items(item_type: Any, items: Iterable[Any]) -> Iterator[Any]:
+    r"""Restore the items of a container, the type checks are done once for all the items."""
+    maybe_dataclass = is_potential_dataclass(item_type)
+    for item in items:
+        if type(item) in _ATOMIC_TYPES and not maybe_dataclass:
+            yield item
+        else:
+            yield dataclass_obj_from_dict(item_type, item)
+
+
 # Custom representer for OrderedDict
 def represent_ordereddict(dumper, data):
     value = []
@@ -880,22 +930,68 @@ def compose_model_kwargs(default_model_kwargs: Dict, model_kwargs: Dict) -> Dict
 VECTOR_TYPE = Union[List[float], np.ndarray]
 
 
-def is_normalized(v: VECTOR_TYPE, tol=1e-4) -> bool:
+def _iter_row_chunks(v: np.ndarray, chunk_size: int):
+    r"""Yield the row slices of a 2-D array in chunks of ``chunk_size`` rows."""
+    for start in range(0, v.shape[0], chunk_size):
+        yield slice(start, min(start + chunk_size, v.shape[0]))
+
+
+def is_normalized(v: VECTOR_TYPE, tol=1e-4, chunk_size: int = 65536) -> bool:
+    r"""Check if a vector, or every row of a 2-D array, has unit l2 norm.
+
+    The rows are checked ``chunk_size`` at a time so that memory-mapped arrays are not
+    loaded as a whole.
+    """
     if isinstance(v, list):
-        v = np.array(v)
-    # Compute the norm of the vector (assuming v is 1D)
-    norm = np.linalg.norm(v)
-    # Check if the norm is approximately 1
-    return np.abs(norm - 1) < tol
+        v = np.asarray(v, dtype=np.float32)
+    if v.ndim == 1:
+        return bool(np.abs(np.linalg.norm(v) - 1) < tol)
+    for rows in _iter_row_chunks(v, chunk_size):
+        norms = np.linalg.norm(v[rows], axis=1)
+        if not np.all(np.abs(norms - 1) < tol):
+            return False
+    return True
+
+
+def normalize_rows(
+    v: np.ndarray, inplace: bool = True, chunk_size: int = 65536
+) -> np.ndarray:
+    r"""Normalize every row of a 2-D array to unit l2 norm, in float32.
+
+    A writeable float32 array is normalized in place when ``inplace`` is True; any other
+    input (other dtypes, read-only memory maps) is converted into a single new float32 array.
+    The work is done ``chunk_size`` rows at a time, so the temporary memory is bounded by the
+    chunk rather than the whole matrix. Rows with zero norm are left as zeros.
+
+    Args:
+        v (np.ndarray): The 2-D array of vectors, e.g. a ``np.memmap``.
+        inplace (bool): Whether to normalize ``v`` itself when it is possible.
+        chunk_size (int): The number of rows to normalize at a time.
+
+    Returns:
+        np.ndarray: The normalized float32 array.
+    """
+    if not isinstance(v, np.ndarray):
+        v = np.asarray(v, dtype=np.float32)
+    if v.ndim == 1:
+        return normalize_rows(v[None, :], inplace, chunk_size)[0]
+    if inplace and v.dtype == np.float32 and v.flags.writeable:
+        out = v
+    else:
+        out = np.empty(v.shape, dtype=np.float32)
+    for rows in _iter_row_chunks(out, chunk_size):
+        chunk = out[rows]
+        if out is not v:
+            chunk[...] = v[rows]
+        norms = np.linalg.norm(chunk, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        chunk /= norms
+    return out
 
 
 def normalize_np_array(v: np.ndarray) -> np.ndarray:
-    # Compute the norm of the vector (assuming v is 1D)
-    norm = np.linalg.norm(v)
-    # Normalize the vector
-    normalized_v = v / norm
-    # Return the normalized vector
-    return normalized_v
+    r"""Normalize a vector, or every row of a 2-D array, into a new float32 array."""
+    return normalize_rows(v, inplace=False)
 
 
 def normalize_vector(v: VECTOR_TYPE) -> List[float]:
@@ -2,13 +2,26 @@
 
 It is a pipeline that consists of three subcomponents."""
 
-import json
 import re
 import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
-from typing import Any, Dict, Optional, Union, Callable, Tuple, List
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    Optional,
+    Union,
+    Callable,
+    Tuple,
+    List,
+)
 import logging
+import time
 
 
 from adalflow.core.types import (
@@ -25,11 +38,12 @@ from adalflow.optim.parameter import Parameter, GradientContext
 from adalflow.optim.types import ParameterType
 
 from adalflow.core.prompt_builder import Prompt
+from adalflow.core.tokenizer import count_tokens_cached
 from adalflow.core.functional import compose_model_kwargs
 from adalflow.core.model_client import ModelClient
 from adalflow.core.default_prompt_template import DEFAULT_ADALFLOW_SYSTEM_PROMPT
 from adalflow.optim.function import BackwardContext
-from adalflow.utils.cache import CachedEngine
+from adalflow.utils.cache import CachedEngine, SingleFlight, canonical_cache_key
 from adalflow.tracing.callback_manager import CallbackManager
 from adalflow.utils.global_config import get_adalflow_default_root_path
 
@@ -43,7 +57,13 @@ from adalflow.optim.text_grad.backend_engine_prompt import (
     OBJECTIVE_INSTRUCTION_CHAIN,
 )
 
-__all__ = ["Generator", "BackwardEngine", "create_teacher_generator"]
+__all__ = [
+    "Generator",
+    "GeneratorStream",
+    "AsyncGeneratorStream",
+    "BackwardEngine",
+    "create_teacher_generator",
+]
 
 
 log = logging.getLogger(__name__)
@@ -52,6 +72,114 @@ DEBUG_MODE = os.environ.get("DEBUG_MODE", False)
 
 PromptArgType = Dict[str, Union[str, Parameter]]
 
+StreamFinalizer = Callable[[str, Optional[str], Optional[float]], GeneratorOutput]
+
+
+class GeneratorStream:
+    __doc__ = r"""The streaming output of ``Generator.call(..., stream=True)``.
+
+    Iterating it yields the text deltas as they arrive from the model client. Meanwhile it records
+    the time to first token and, when the output processors support it, feeds every delta to an
+    incremental parser whose latest result is in ``partial``. Once the stream ends, ``output`` holds
+    the final ``GeneratorOutput``, processed by the output processors like a non-streaming call, with
+    ``time_to_first_token`` in its metadata.
+
+    Example:
+
+    .. code-block:: python
+
+        stream = generator.call(prompt_kwargs={"input_str": "..."}, stream=True)
+        for delta in stream:
+            print(delta, end="", flush=True)
+            # stream.partial is the partial JSON dict with a JsonOutputParser
+        print(stream.time_to_first_token, stream.output.data)
+    """
+
+    def __init__(
+        self,
+        deltas: Optional[Iterator[str]],
+        finalize: StreamFinalizer,
+        stream_parser: Optional[Any] = None,
+        error: Optional[str] = None,
+        start_time: Optional[float] = None,
+    ):
+        self._deltas = deltas
+        self._finalize = finalize
+        self.stream_parser = stream_parser
+        self._parts: List[str] = []
+        self.partial: Any = None
+        self.error = error
+        self.output: Optional[GeneratorOutput] = None
+        self.time_to_first_token: Optional[float] = None
+        self._start_time = start_time if start_time is not None else time.perf_counter()
+
+    @property
+    def text(self) -> str:
+        r"""The text received so far."""
+        return "".join(self._parts)
+
+    def _on_delta(self, delta: str):
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.perf_counter() - self._start_time
+        self._parts.append(delta)
+        if self.stream_parser is not None:
+            try:
+                self.partial = self.stream_parser.feed(delta)
+            except Exception as e:
+                log.debug(f"Error in the incremental parser: {e}")
+
+    def _on_error(self, e: Exception):
+        log.error(f"Error streaming the model output: {e}")
+        self.error = str(e)
+
+    def _on_end(self):
+        self.output = self._finalize(self.text, self.error, self.time_to_first_token)
+
+    def __iter__(self) -> Iterator[str]:
+        if self.output is not None:
+            return
+        try:
+            for delta in self._deltas or ():
+                self._on_delta(delta)
+                yield delta
+        except Exception as e:
+            self._on_error(e)
+        finally:
+            # also runs when the consumer stops early, with the text received so far
+            self._on_end()
+
+    def get_output(self) -> GeneratorOutput:
+        r"""Consume the rest of the stream and return the final output."""
+        for _ in self:
+            pass
+        return self.output
+
+
+class AsyncGeneratorStream(GeneratorStream):
+    __doc__ = r"""The streaming output of ``Generator.acall(..., stream=True)``, iterated with ``async for``."""
+
+    def __iter__(self):
+        raise TypeError(f"Use async for to iterate {type(self).__name__}")
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        if self.output is not None:
+            return
+        try:
+            if self._deltas is not None:
+                async for delta in self._deltas:
+                    self._on_delta(delta)
+                    yield delta
+        except Exception as e:
+            self._on_error(e)
+        finally:
+            self._on_end()
+
+    async def get_output(self) -> GeneratorOutput:
+        r"""Consume the rest of the stream and return the final output."""
+        async for _ in self:
+            pass
+        return self.output
+
 
 class Generator(GradComponent, CachedEngine, CallbackManager):
     __doc__ = """An user-facing orchestration component for LLM prediction.
@@ -71,6 +199,17 @@ class Generator(GradComponent, CachedEngine, CallbackManager):
         prompt_kwargs (Optional[Dict], optional): The preset prompt kwargs to fill in the variables in the prompt. Defaults to None.
         output_processors (Optional[Component], optional):  The output processors after model call. It can be a single component or a chained component via ``Sequential``. Defaults to None.
         trainable_params (Optional[List[str]], optional): The list of trainable parameters. Defaults to [].
+        cache_ttl (Optional[float], optional): Seconds after which a cached response expires when ``use_cache`` is on. Defaults to None, never.
+        cache_memory_size (int, optional): The maximum number of responses kept in the in-memory cache. Defaults to 1024.
+        cache_disk_size_limit (Optional[int], optional): The size limit in bytes of the disk cache, the least recently stored
+            responses are evicted first. Defaults to None, the diskcache default of 1GB.
+        coalesce_requests (bool, optional): Share one model call among concurrent calls with identical api_kwargs, even without ``use_cache``.
+            Calls that use the cache are always coalesced. Streaming calls never are. Defaults to False.
+        max_prompt_tokens (Optional[int], optional): Render the prompt within this many tokens, see :meth:`Prompt.call_with_budget<core.prompt_builder.Prompt.call_with_budget>`.
+            The lowest-scoring items of the ``prompt_budget_key`` variable are truncated or dropped to fit, and the
+            token count of the prompt is reported in ``metadata["prompt_tokens"]`` of the output. Defaults to None, no budget.
+        prompt_budget_key (str, optional): The prompt variable holding the context items to fit. Defaults to "context_str".
+        prompt_tokenizer (str, optional): The tiktoken encoding used to count the prompt tokens. Defaults to "cl100k_base".
 
     Note:
         The output_processors will be applied to the string output of the model completion. And the result will be stored in the data field of the output.
@@ -81,6 +220,9 @@ class Generator(GradComponent, CachedEngine, CallbackManager):
     model_client: ModelClient  # for better type checking
 
     _use_cache: bool = False
+    max_prompt_tokens: Optional[int] = None
+    prompt_budget_key: str = "context_str"
+    prompt_tokenizer: str = "cl100k_base"
     _kwargs: Dict[str, Any] = (
         {}
     )  # to create teacher generator from student TODO: might reaccess this
@@ -100,6 +242,14 @@ class Generator(GradComponent, CachedEngine, CallbackManager):
         # args for the cache
         cache_path: Optional[str] = None,
         use_cache: bool = False,
+        cache_ttl: Optional[float] = None,
+        cache_memory_size: int = 1024,
+        cache_disk_size_limit: Optional[int] = None,
+        coalesce_requests: bool = False,
+        # args for the prompt token budget
+        max_prompt_tokens: Optional[int] = None,
+        prompt_budget_key: str = "context_str",
+        prompt_tokenizer: str = "cl100k_base",
     ) -> None:
         r"""The default prompt is set to the DEFAULT_ADALFLOW_SYSTEM_PROMPT. It has the following variables:
         - task_desc_str
@@ -126,7 +276,13 @@ class Generator(GradComponent, CachedEngine, CallbackManager):
             cache_path, model_client, model_kwargs.get("model", "default")
         )
 
-        CachedEngine.__init__(self, cache_path=self.cache_path)
+        CachedEngine.__init__(
+            self,
+            cache_path=self.cache_path,
+            cache_ttl=cache_ttl,
+            memory_cache_size=cache_memory_size,
+            disk_size_limit=cache_disk_size_limit,
+        )
 
         Component.__init__(self)
         GradComponent.__init__(self)
@@ -153,6 +309,12 @@ class Generator(GradComponent, CachedEngine, CallbackManager):
         # self.data_map_func: Callable = None
         # self.set_data_map_func()
         self._use_cache = use_cache
+        self.coalesce_requests = coalesce_requests
+        # in-flight calls, keyed like the cache
+        self._single_flight = SingleFlight()
+        self.max_prompt_tokens = max_prompt_tokens
+        self.prompt_budget_key = prompt_budget_key
+        self.prompt_tokenizer = prompt_tokenizer
 
         self._kwargs = {
             "model_client": model_client,
@@ -163,6 +325,13 @@ class Generator(GradComponent, CachedEngine, CallbackManager):
             "name": name,
             "cache_path": cache_path,
             "use_cache": use_cache,
+            "cache_ttl": cache_ttl,
+            "cache_memory_size": cache_memory_size,
+            "cache_disk_size_limit": cache_disk_size_limit,
+            "coalesce_requests": coalesce_requests,
+            "max_prompt_tokens": max_prompt_tokens,
+            "prompt_budget_key": prompt_budget_key,
+            "prompt_tokenizer": prompt_tokenizer,
         }
         self._teacher: Optional["Generator"] = None
         self._trace_api_kwargs: Dict[str, Any] = (
@@ -308,6 +477,10 @@ class Generator(GradComponent, CachedEngine, CallbackManager):
         r"""Get string completion and process it with the output_processors."""
         # parse chat completion will only fill the raw_response
         output: GeneratorOutput = self.model_client.parse_chat_completion(completion)
+        return self._process_raw_response(output)
+
+    def _process_raw_response(self, output: GeneratorOutput) -> GeneratorOutput:
+        r"""Run the output_processors on the raw_response and fill the data field."""
         # Now adding the data filed to the output
         data = output.raw_response
         if self.output_processors:
@@ -324,10 +497,42 @@ class Generator(GradComponent, CachedEngine, CallbackManager):
 
         return output
 
+    def _render_prompt(self, prompt_kwargs: Dict) -> Tuple[str, Optional[int]]:
+        r"""Render the prompt, within ``max_prompt_tokens`` when it is set.
+
+        Returns the prompt and its token count, None when the prompt has no budget.
+        """
+        if self.max_prompt_tokens is None:
+            return self.prompt.call(**prompt_kwargs).strip(), None
+        prompt_str, num_tokens = self.prompt.call_with_budget(
+            self.max_prompt_tokens,
+            budget_key=self.prompt_budget_key,
+            tokenizer_name=self.prompt_tokenizer,
+            **prompt_kwargs,
+        )
+        stripped = prompt_str.strip()
+        if stripped != prompt_str:
+            num_tokens = count_tokens_cached(stripped, self.prompt_tokenizer)
+        return stripped, num_tokens
+
+    @staticmethod
+    def _add_prompt_tokens(output: GeneratorOutput, prompt_tokens: Optional[int]):
+        if prompt_tokens is not None:
+            output.metadata = {
+                **(output.metadata or {}),
+                "prompt_tokens": prompt_tokens,
+            }
+
     def _pre_call(self, prompt_kwargs: Dict, model_kwargs: Dict) -> Dict[str, Any]:
         r"""Prepare the input, prompt_kwargs, model_kwargs for the model call."""
+        return self._pre_call_with_tokens(prompt_kwargs, model_kwargs)[0]
+
+    def _pre_call_with_tokens(
+        self, prompt_kwargs: Dict, model_kwargs: Dict
+    ) -> Tuple[Dict[str, Any], Optional[int]]:
+        r"""Same as :meth:`_pre_call`, also returns the prompt token count of a budgeted prompt."""
         # 1. render the prompt from the template
-        prompt_str = self.prompt.call(**prompt_kwargs).strip()
+        prompt_str, prompt_tokens = self._render_prompt(prompt_kwargs)
 
         # 2. combine the model_kwargs with the default model_kwargs
         composed_model_kwargs = self._compose_model_kwargs(**model_kwargs)
@@ -338,31 +543,80 @@ class Generator(GradComponent, CachedEngine, CallbackManager):
             model_kwargs=composed_model_kwargs,
             model_type=self.model_type,
         )
-        return api_kwargs
+        return api_kwargs, prompt_tokens
+
+    def _should_coalesce(self, api_kwargs: Dict, use_cache: bool) -> bool:
+        # a stream can only be consumed by one caller
+        return (use_cache or self.coalesce_requests) and not api_kwargs.get("stream")
 
     def _model_client_call(self, api_kwargs: Dict, use_cache: bool = False) -> Any:
         # call the model client
         try:
-            # check the cache
-            index_content = json.dumps(api_kwargs)  # + f"training: {self.training}"
+            # check the cache, the key is only built when the cache is used
+            cache_key = None
+            if use_cache or self.coalesce_requests:
+                cache_key = canonical_cache_key(api_kwargs)
             if use_cache:
-                # print(f"check cache first: {no_cache}")
-
-                cached_completion = self._check_cache(index_content)
+                cached_completion = self._lookup_cache(cache_key)
                 if cached_completion is not None:
                     return cached_completion
+            return self._call_model(api_kwargs, cache_key, use_cache)
+        except Exception as e:
+            log.error(f"Error calling the model: {e}")
+            raise e
+
+    def _call_model(
+        self, api_kwargs: Dict, cache_key: Optional[str], use_cache: bool
+    ) -> Any:
+        r"""Call the model client after a cache miss and save the completion to the cache."""
 
-            completion = self.model_client.call(
+        def call_and_save():
+            completion = self.model_client.scheduled_call(
                 api_kwargs=api_kwargs, model_type=self.model_type
             )
             # prepare cache
             if use_cache:
-                self._save_cache(index_content, completion)
+                self._store_cache(cache_key, completion)
             return completion
+
+        if self._should_coalesce(api_kwargs, use_cache):
+            return self._single_flight.do(cache_key, call_and_save)
+        return call_and_save()
+
+    async def _amodel_client_call(
+        self, api_kwargs: Dict, use_cache: bool = False
+    ) -> Any:
+        r"""Async version of :meth:`_model_client_call`, sharing the cache entries with it."""
+        try:
+            cache_key = None
+            if use_cache or self.coalesce_requests:
+                cache_key = canonical_cache_key(api_kwargs)
+            if use_cache:
+                cached_completion = await self._alookup_cache(cache_key)
+                if cached_completion is not None:
+                    return cached_completion
+            return await self._acall_model(api_kwargs, cache_key, use_cache)
         except Exception as e:
             log.error(f"Error calling the model: {e}")
             raise e
 
+    async def _acall_model(
+        self, api_kwargs: Dict, cache_key: Optional[str], use_cache: bool
+    ) -> Any:
+        r"""Async version of :meth:`_call_model`."""
+
+        async def call_and_save():
+            completion = await self.model_client.ascheduled_call(
+                api_kwargs=api_kwargs, model_type=self.model_type
+            )
+            if use_cache:
+                await self._astore_cache(cache_key, completion)
+            return completion
+
+        if self._should_coalesce(api_kwargs, use_cache):
+            return await self._single_flight.ado(cache_key, call_and_save)
+        return await call_and_save()
+
     ##############################################################################################################
     ### Forward, backwards, teacher generator, create demo data instance,
     # are for training and backpropagation
@@ -796,24 +1050,130 @@ class Generator(GradComponent, CachedEngine, CallbackManager):
                 model_kwargs=model_kwargs,
             )
 
+    def _create_stream_parser(self) -> Optional[Any]:
+        r"""A new incremental parser from the output_processors, None when they do not support it."""
+        create_stream_parser = getattr(
+            self.output_processors, "create_stream_parser", None
+        )
+        return create_stream_parser() if callable(create_stream_parser) else None
+
+    def _finalize_stream(
+        self,
+        text: str,
+        error: Optional[str],
+        time_to_first_token: Optional[float],
+        id: Optional[str],
+        api_kwargs: Dict,
+        prompt_kwargs: Dict,
+        model_kwargs: Dict,
+        prompt_tokens: Optional[int] = None,
+    ) -> GeneratorOutput:
+        r"""Build the final output of a stream, the same way as a non-streaming call."""
+        if error is not None:
+            output = GeneratorOutput(raw_response=text or None, error=error)
+        else:
+            try:
+                output = self._process_raw_response(GeneratorOutput(raw_response=text))
+            except Exception as e:
+                log.error(f"Error processing the output: {e}")
+                output = GeneratorOutput(raw_response=text, error=str(e))
+        output.id = id
+        output.metadata = {
+            **(output.metadata or {}),
+            "time_to_first_token": time_to_first_token,
+        }
+        self._add_prompt_tokens(output, prompt_tokens)
+        self._run_callbacks(
+            output,
+            input=api_kwargs,
+            prompt_kwargs=prompt_kwargs,
+            model_kwargs=model_kwargs,
+        )
+        self._trace_api_kwargs = api_kwargs  # tracing
+        return output
+
+    def _prepare_stream(
+        self, prompt_kwargs: Dict, model_kwargs: Dict, id: Optional[str]
+    ) -> Tuple[Dict, Callable, Optional[Any]]:
+        api_kwargs, prompt_tokens = self._pre_call_with_tokens(
+            prompt_kwargs, {**model_kwargs, "stream": True}
+        )
+        finalize = partial(
+            self._finalize_stream,
+            id=id,
+            api_kwargs=api_kwargs,
+            prompt_kwargs=prompt_kwargs,
+            model_kwargs=model_kwargs,
+            prompt_tokens=prompt_tokens,
+        )
+        return api_kwargs, finalize, self._create_stream_parser()
+
+    def _stream_call(
+        self, prompt_kwargs: Dict, model_kwargs: Dict, id: Optional[str]
+    ) -> GeneratorStream:
+        if self.mock_output:
+            return GeneratorStream(
+                iter([self.mock_output_data]),
+                lambda text, error, ttft: GeneratorOutput(data=text, id=id),
+            )
+        api_kwargs, finalize, stream_parser = self._prepare_stream(
+            prompt_kwargs, model_kwargs, id
+        )
+        start_time = time.perf_counter()
+        try:
+            # a stream is never cached
+            completion = self._model_client_call(api_kwargs=api_kwargs, use_cache=False)
+            deltas = self.model_client.parse_chat_completion_stream(completion)
+        except Exception as e:
+            log.error(f"Error calling the model: {e}")
+            return GeneratorStream(None, finalize, stream_parser, error=str(e))
+        return GeneratorStream(deltas, finalize, stream_parser, start_time=start_time)
+
+    async def _astream_call(
+        self, prompt_kwargs: Dict, model_kwargs: Dict, id: Optional[str]
+    ) -> AsyncGeneratorStream:
+        api_kwargs, finalize, stream_parser = self._prepare_stream(
+            prompt_kwargs, model_kwargs, id
+        )
+        start_time = time.perf_counter()
+        try:
+            completion = await self._amodel_client_call(
+                api_kwargs=api_kwargs, use_cache=False
+            )
+            deltas = self.model_client.aparse_chat_completion_stream(completion)
+        except Exception as e:
+            log.error(f"Error calling the model: {e}")
+            return AsyncGeneratorStream(None, finalize, stream_parser, error=str(e))
+        return AsyncGeneratorStream(
+            deltas, finalize, stream_parser, start_time=start_time
+        )
+
     def call(
         self,
         prompt_kwargs: Optional[Dict] = {},  # the input need to be passed to the prompt
         model_kwargs: Optional[Dict] = {},
         use_cache: Optional[bool] = None,
         id: Optional[str] = None,
-    ) -> GeneratorOutputType:
+        stream: bool = False,
+    ) -> Union[GeneratorOutputType, GeneratorStream]:
         r"""
         Call the model_client by formatting prompt from the prompt_kwargs,
         and passing the combined model_kwargs to the model client.
+
+        With ``stream=True``, ``"stream": True`` is added to the model_kwargs and a :class:`GeneratorStream`
+        yielding the text deltas is returned instead. Streams bypass the cache.
         """
+        if stream:
+            return self._stream_call(prompt_kwargs, model_kwargs, id)
         if self.mock_output:
             return GeneratorOutput(data=self.mock_output_data, id=id)
 
         log.debug(f"prompt_kwargs: {prompt_kwargs}")
         log.debug(f"model_kwargs: {model_kwargs}")
 
-        api_kwargs = self._pre_call(prompt_kwargs, model_kwargs)
+        api_kwargs, prompt_tokens = self._pre_call_with_tokens(
+            prompt_kwargs, model_kwargs
+        )
 
         log.debug(f"api_kwargs: {api_kwargs}")
         output: GeneratorOutputType = None
@@ -840,6 +1200,7 @@ class Generator(GradComponent, CachedEngine, CallbackManager):
 
         # User only need to use one of them, no need to use them all.
         output.id = id
+        self._add_prompt_tokens(output, prompt_tokens)
         self._run_callbacks(
             output,
             input=api_kwargs,
@@ -858,23 +1219,31 @@ class Generator(GradComponent, CachedEngine, CallbackManager):
         model_kwargs: Optional[Dict] = {},
         use_cache: Optional[bool] = None,
         id: Optional[str] = None,
-    ) -> GeneratorOutputType:
+        stream: bool = False,
+    ) -> Union[GeneratorOutputType, AsyncGeneratorStream]:
         r"""Async call the model with the input and model_kwargs.
 
+        With ``stream=True`` an :class:`AsyncGeneratorStream` is returned, see :meth:`call`.
+
         :warning::
             Training is not supported in async call yet.
         """
+        if stream:
+            return await self._astream_call(prompt_kwargs, model_kwargs, id)
         log.info(f"prompt_kwargs: {prompt_kwargs}")
         log.info(f"model_kwargs: {model_kwargs}")
 
-        api_kwargs = self._pre_call(prompt_kwargs, model_kwargs)
+        api_kwargs, prompt_tokens = self._pre_call_with_tokens(
+            prompt_kwargs, model_kwargs
+        )
         output: GeneratorOutputType = None
         # call the model client
         completion = None
+        use_cache = use_cache if use_cache is not None else self._use_cache
 
         try:
-            completion = await self.model_client.acall(
-                api_kwargs=api_kwargs, model_type=self.model_type
+            completion = await self._amodel_client_call(
+                api_kwargs=api_kwargs, use_cache=use_cache
             )
         except Exception as e:
             log.error(f"Error calling the model: {e}")
@@ -887,6 +1256,7 @@ class Generator(GradComponent, CachedEngine, CallbackManager):
                 log.error(f"Error processing the output: {e}")
                 output = GeneratorOutput(raw_response=str(completion), error=str(e))
 
+        self._add_prompt_tokens(output, prompt_tokens)
         log.info(f"output: {output}")
         self._run_callbacks(
             output,
@@ -897,6 +1267,240 @@ class Generator(GradComponent, CachedEngine, CallbackManager):
         self._trace_api_kwargs = api_kwargs  # tracing
         return output
 
+    def _batch_pre_call(
+        self, prompt_kwargs_list: List[Dict], model_kwargs: Dict
+    ) -> Tuple[
+        List[Optional[Dict[str, Any]]], List[Optional[str]], List[Optional[int]]
+    ]:
+        r"""Compose the model_kwargs once and render every prompt.
+
+        Returns the api_kwargs of each item, None with an error where the rendering failed, and
+        the prompt token counts of the budgeted prompts.
+        """
+        composed_model_kwargs = self._compose_model_kwargs(**model_kwargs)
+        api_kwargs_list: List[Optional[Dict[str, Any]]] = []
+        errors: List[Optional[str]] = []
+        prompt_tokens: List[Optional[int]] = []
+        for prompt_kwargs in prompt_kwargs_list:
+            num_tokens = None
+            try:
+                prompt_str, num_tokens = self._render_prompt(prompt_kwargs)
+                api_kwargs_list.append(
+                    self.model_client.convert_inputs_to_api_kwargs(
+                        input=prompt_str,
+                        model_kwargs=composed_model_kwargs,
+                        model_type=self.model_type,
+                    )
+                )
+                errors.append(None)
+            except Exception as e:
+                log.error(f"Error preparing the prompt: {e}")
+                api_kwargs_list.append(None)
+                errors.append(str(e))
+            prompt_tokens.append(num_tokens)
+        return api_kwargs_list, errors, prompt_tokens
+
+    def _supports_batch_call(self, api_kwargs_list: List[Dict]) -> bool:
+        r"""Whether the model client can send the batch in one ``batch_call``."""
+        return not any(
+            api_kwargs.get("stream") for api_kwargs in api_kwargs_list
+        ) and self.model_client.supports_batch_call(api_kwargs_list, self.model_type)
+
+    def _batch_post_call(
+        self,
+        prompt_kwargs_list: List[Dict],
+        model_kwargs: Dict,
+        api_kwargs_list: List[Optional[Dict]],
+        completions: List[Any],
+        errors: List[Optional[str]],
+        ids: Optional[List[Optional[str]]],
+        prompt_tokens: Optional[List[Optional[int]]] = None,
+    ) -> List[GeneratorOutputType]:
+        r"""Process the completions into outputs in the input order, one error per failed item."""
+        outputs: List[GeneratorOutputType] = []
+        for i, completion in enumerate(completions):
+            if errors[i] is not None:
+                output = GeneratorOutput(error=errors[i])
+            else:
+                try:
+                    output = self._post_call(completion)
+                except Exception as e:
+                    log.error(f"Error processing the output: {e}")
+                    output = GeneratorOutput(raw_response=str(completion), error=str(e))
+            output.id = ids[i] if ids else None
+            if prompt_tokens:
+                self._add_prompt_tokens(output, prompt_tokens[i])
+            self._run_callbacks(
+                output,
+                input=api_kwargs_list[i],
+                prompt_kwargs=prompt_kwargs_list[i],
+                model_kwargs=model_kwargs,
+            )
+            outputs.append(output)
+        return outputs
+
+    def batch_call(
+        self,
+        prompt_kwargs_list: List[Dict],
+        model_kwargs: Optional[Dict] = {},
+        use_cache: Optional[bool] = None,
+        max_concurrency: int = 8,
+        ids: Optional[List[Optional[str]]] = None,
+    ) -> List[GeneratorOutputType]:
+        r"""Call the model on a batch of prompt_kwargs that share the same model_kwargs.
+
+        The prompts are rendered and the model_kwargs composed once for the batch, and the cache
+        is checked for all the items before any model call. The cache misses are sent in a single
+        ``model_client.batch_call`` when the client implements it, otherwise up to ``max_concurrency``
+        at a time from a thread pool.
+
+        Args:
+            prompt_kwargs_list (List[Dict]): The prompt_kwargs of each item.
+            model_kwargs (Optional[Dict], optional): The model_kwargs shared by the batch. Defaults to {}.
+            use_cache (Optional[bool], optional): Defaults to the ``use_cache`` of the generator.
+            max_concurrency (int, optional): The maximum number of concurrent model calls. Defaults to 8.
+            ids (Optional[List[Optional[str]]], optional): The id of each output. Defaults to None.
+
+        Returns:
+            List[GeneratorOutputType]: One output per item in the input order, failed items carry their own error.
+        """
+        if self.mock_output:
+            return [
+                GeneratorOutput(data=self.mock_output_data, id=ids[i] if ids else None)
+                for i in range(len(prompt_kwargs_list))
+            ]
+        use_cache = use_cache if use_cache is not None else self._use_cache
+        api_kwargs_list, errors, prompt_tokens = self._batch_pre_call(
+            prompt_kwargs_list, model_kwargs
+        )
+        completions: List[Any] = [None] * len(api_kwargs_list)
+        pending = [i for i, error in enumerate(errors) if error is None]
+        cache_keys: List[Optional[str]] = [None] * len(api_kwargs_list)
+        if use_cache or self.coalesce_requests:
+            for i in pending:
+                cache_keys[i] = canonical_cache_key(api_kwargs_list[i])
+        if use_cache and pending:
+            cached = self._lookup_cache_many([cache_keys[i] for i in pending])
+            for i, completion in zip(pending, cached):
+                completions[i] = completion
+            pending = [i for i in pending if completions[i] is None]
+
+        if pending and self._supports_batch_call([api_kwargs_list[i] for i in pending]):
+            try:
+                batch_completions = self.model_client.batch_call(
+                    api_kwargs_list=[api_kwargs_list[i] for i in pending],
+                    model_type=self.model_type,
+                )
+                for i, completion in zip(pending, batch_completions):
+                    completions[i] = completion
+                    if use_cache:
+                        self._store_cache(cache_keys[i], completion)
+            except Exception as e:
+                log.error(f"Error calling the model: {e}")
+                for i in pending:
+                    errors[i] = str(e)
+        elif pending:
+
+            def call_one(i: int):
+                try:
+                    completions[i] = self._call_model(
+                        api_kwargs_list[i], cache_keys[i], use_cache
+                    )
+                except Exception as e:
+                    log.error(f"Error calling the model: {e}")
+                    errors[i] = str(e)
+
+            with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+                list(executor.map(call_one, pending))
+
+        return self._batch_post_call(
+            prompt_kwargs_list,
+            model_kwargs,
+            api_kwargs_list,
+            completions,
+            errors,
+            ids,
+            prompt_tokens,
+        )
+
+    async def abatch_call(
+        self,
+        prompt_kwargs_list: List[Dict],
+        model_kwargs: Optional[Dict] = {},
+        use_cache: Optional[bool] = None,
+        max_concurrency: int = 8,
+        ids: Optional[List[Optional[str]]] = None,
+    ) -> List[GeneratorOutputType]:
+        r"""Async version of :meth:`batch_call`.
+
+        The cache misses are sent through ``model_client.acall`` with at most ``max_concurrency``
+        calls in flight. A native ``model_client.batch_call`` runs in the default executor.
+        """
+        if self.mock_output:
+            return [
+                GeneratorOutput(data=self.mock_output_data, id=ids[i] if ids else None)
+                for i in range(len(prompt_kwargs_list))
+            ]
+        use_cache = use_cache if use_cache is not None else self._use_cache
+        api_kwargs_list, errors, prompt_tokens = self._batch_pre_call(
+            prompt_kwargs_list, model_kwargs
+        )
+        completions: List[Any] = [None] * len(api_kwargs_list)
+        pending = [i for i, error in enumerate(errors) if error is None]
+        cache_keys: List[Optional[str]] = [None] * len(api_kwargs_list)
+        if use_cache or self.coalesce_requests:
+            for i in pending:
+                cache_keys[i] = canonical_cache_key(api_kwargs_list[i])
+        if use_cache and pending:
+            cached = await self._alookup_cache_many([cache_keys[i] for i in pending])
+            for i, completion in zip(pending, cached):
+                completions[i] = completion
+            pending = [i for i in pending if completions[i] is None]
+
+        if pending and self._supports_batch_call([api_kwargs_list[i] for i in pending]):
+            loop = asyncio.get_running_loop()
+            try:
+                batch_completions = await loop.run_in_executor(
+                    None,
+                    partial(
+                        self.model_client.batch_call,
+                        api_kwargs_list=[api_kwargs_list[i] for i in pending],
+                        model_type=self.model_type,
+                    ),
+                )
+                for i, completion in zip(pending, batch_completions):
+                    completions[i] = completion
+                    if use_cache:
+                        await self._astore_cache(cache_keys[i], completion)
+            except Exception as e:
+                log.error(f"Error calling the model: {e}")
+                for i in pending:
+                    errors[i] = str(e)
+        elif pending:
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+            async def call_one(i: int):
+                async with semaphore:
+                    try:
+                        completions[i] = await self._acall_model(
+                            api_kwargs_list[i], cache_keys[i], use_cache
+                        )
+                    except Exception as e:
+                        log.error(f"Error calling the model: {e}")
+                        errors[i] = str(e)
+
+            await asyncio.gather(*[call_one(i) for i in pending])
+
+        return self._batch_post_call(
+            prompt_kwargs_list,
+            model_kwargs,
+            api_kwargs_list,
+            completions,
+            errors,
+            ids,
+            prompt_tokens,
+        )
+
     def __call__(self, *args, **kwargs) -> Union[GeneratorOutputType, Any]:
         if self.training:
             log.debug("Training mode")
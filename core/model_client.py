@@ -1,6 +1,21 @@
 r"""ModelClient is the protocol and base class for all models(either via APIs or local models) to communicate with components."""
 
-from typing import Any, Dict, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+)
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from functools import partial
 
 
 from adalflow.core.component import Component
@@ -11,6 +26,476 @@ from adalflow.core.types import (
     CompletionUsage,
 )
 
+log = logging.getLogger(__name__)
+
+
+def is_rate_limit_error(error: Optional[BaseException]) -> bool:
+    r"""Whether the error is a rate limit error of a provider, an HTTP 429 or a throttling error."""
+    if error is None:
+        return False
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    name = type(error).__name__
+    return status_code == 429 or "RateLimit" in name or "Throttl" in name
+
+
+class RateLimiter:
+    r"""A thread-safe token bucket refilled at ``limit_per_minute / 60`` per second.
+
+    :meth:`reserve` takes the amount out of the bucket right away, possibly going below zero,
+    and returns how many seconds the caller has to wait before using it. Reservations are
+    therefore served in order, for both threads and coroutines.
+    """
+
+    def __init__(self, limit_per_minute: float):
+        self.capacity = float(limit_per_minute)
+        self.rate = self.capacity / 60.0
+        self.available = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self.available = min(
+                self.capacity, self.available + (now - self.updated_at) * self.rate
+            )
+            self.updated_at = now
+            self.available -= amount
+            return max(0.0, -self.available / self.rate)
+
+    def drain(self):
+        r"""Empty the bucket, the next reservations wait for it to refill."""
+        with self._lock:
+            self.available = min(self.available, 0.0)
+
+
+class _Waiter:
+    r"""A caller queued for a concurrency slot, woken up by the caller that releases one."""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        if loop is None:
+            self.event = threading.Event()
+        else:
+            self.future = loop.create_future()
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class _ModelQuota:
+    r"""The rate limits, the adaptive concurrency limit and the metrics of one provider/model."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float],
+        tokens_per_minute: Optional[float],
+        concurrency: float,
+    ):
+        self.request_limiter = (
+            RateLimiter(requests_per_minute) if requests_per_minute else None
+        )
+        self.token_limiter = (
+            RateLimiter(tokens_per_minute) if tokens_per_minute else None
+        )
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.waiters: deque = deque()
+        self.rate_waiting = 0  # callers sleeping for the rate limits
+        self.last_decrease = 0.0
+        self.slow_start = True  # until the first decrease
+        self.latency: Optional[float] = None  # moving average in seconds
+        self.requests = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.wait_seconds = 0.0
+        self.max_queue_depth = 0
+
+
+class RateLimitScheduler:
+    __doc__ = r"""Coordinate the calls of the model clients that share a provider quota.
+
+    The calls are grouped by a key, ``"<client class>/<model>"`` by default. Each key has:
+
+    - a token bucket on the requests per minute and one on the tokens per minute. The tokens of a call
+      are estimated from the text of its api_kwargs with :class:`Tokenizer<core.tokenizer.Tokenizer>`,
+      plus its ``max_tokens``.
+    - an adaptive concurrency limit in AIMD style. It starts at ``initial_concurrency`` and doubles per
+      limit's worth of successful calls until the first decrease, then grows by about one slot per limit's
+      worth of successful calls. It is multiplied by ``decrease_factor`` on a rate limit error (429), or when the
+      average latency goes over ``latency_target``. It decreases at most once per ``decrease_cooldown`` seconds,
+      so a burst of 429s from the same window only counts once. A 429 also drains the request bucket.
+
+    The callers over the concurrency limit wait in a FIFO queue, sync and async callers alike.
+    :meth:`get_metrics` reports the queue depth, the calls in flight and the limit of each key.
+
+    A model client opts in with :meth:`ModelClient.set_rate_limit_scheduler`, and the same scheduler can be
+    shared by all the clients of a process. ``Generator`` and ``Embedder`` then call the model through it.
+
+    Args:
+        requests_per_minute (Optional[float]): The default requests per minute of a key. Defaults to None, no limit.
+        tokens_per_minute (Optional[float]): The default tokens per minute of a key. Defaults to None, no limit.
+        max_concurrency (int): The upper bound of the concurrency limit. Defaults to 64.
+        min_concurrency (int): The lower bound of the concurrency limit. Defaults to 1.
+        initial_concurrency (Optional[int]): The starting concurrency limit. Defaults to None, ``min(4, max_concurrency)``.
+        latency_target (Optional[float]): Decrease the concurrency when the average latency in seconds is above it. Defaults to None.
+        decrease_factor (float): The multiplicative decrease. Defaults to 0.5.
+        decrease_cooldown (float): The minimum seconds between two decreases. Defaults to 1.0.
+        limits (Optional[Dict[str, Dict[str, float]]]): The ``requests_per_minute`` and ``tokens_per_minute`` of
+            specific keys, overriding the defaults. Defaults to None.
+        tokenizer_name (str): The tiktoken encoding used to estimate the tokens. Defaults to "cl100k_base".
+
+    Example:
+
+    .. code-block:: python
+
+        scheduler = RateLimitScheduler(
+            limits={"OpenAIClient/gpt-4o-mini": {"requests_per_minute": 500, "tokens_per_minute": 200_000}},
+            max_concurrency=32,
+        )
+        client = OpenAIClient()
+        client.set_rate_limit_scheduler(scheduler)
+        generator = Generator(model_client=client, model_kwargs={"model": "gpt-4o-mini"})
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: int = 64,
+        min_concurrency: int = 1,
+        initial_concurrency: Optional[int] = None,
+        latency_target: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        decrease_cooldown: float = 1.0,
+        limits: Optional[Dict[str, Dict[str, float]]] = None,
+        tokenizer_name: str = "cl100k_base",
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.initial_concurrency = initial_concurrency
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.limits = dict(limits or {})
+        self.tokenizer_name = tokenizer_name
+        self._lock = threading.Lock()
+        self._quotas: Dict[str, _ModelQuota] = {}
+
+    def _get_quota(self, key: str) -> _ModelQuota:
+        quota = self._quotas.get(key)
+        if quota is None:
+            limits = self.limits.get(key, {})
+            concurrency = self.initial_concurrency or min(4, self.max_concurrency)
+            quota = self._quotas[key] = _ModelQuota(
+                limits.get("requests_per_minute", self.requests_per_minute),
+                limits.get("tokens_per_minute", self.tokens_per_minute),
+                float(
+                    min(max(concurrency, self.min_concurrency), self.max_concurrency)
+                ),
+            )
+        return quota
+
+    def set_limits(
+        self,
+        key: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        r"""Set the rate limits of ``key``, the later calls of the key use the new limits."""
+        with self._lock:
+            self.limits[key] = {
+                "requests_per_minute": requests_per_minute,
+                "tokens_per_minute": tokens_per_minute,
+            }
+            quota = self._get_quota(key)
+            quota.request_limiter = (
+                RateLimiter(requests_per_minute) if requests_per_minute else None
+            )
+            quota.token_limiter = (
+                RateLimiter(tokens_per_minute) if tokens_per_minute else None
+            )
+
+    def estimate_tokens(self, api_kwargs: Dict) -> int:
+        r"""Estimate the tokens of a call: the text of the input and the messages, plus ``max_tokens``."""
+        from adalflow.core.tokenizer import count_tokens_cached
+
+        num_tokens = 0
+        for key in ("messages", "input", "prompt", "system", "contents"):
+            for text in _iter_texts(api_kwargs.get(key)):
+                num_tokens += count_tokens_cached(text, self.tokenizer_name)
+        max_tokens = api_kwargs.get("max_tokens") or api_kwargs.get(
+            "max_completion_tokens"
+        )
+        return num_tokens + (max_tokens if isinstance(max_tokens, int) else 0)
+
+    def _try_acquire(self, quota: _ModelQuota) -> bool:
+        # the queued callers are served first
+        if not quota.waiters and quota.in_flight < int(quota.concurrency):
+            quota.in_flight += 1
+            return True
+        return False
+
+    def _queue(self, quota: _ModelQuota, waiter: _Waiter):
+        quota.waiters.append(waiter)
+        quota.max_queue_depth = max(
+            quota.max_queue_depth, len(quota.waiters) + quota.rate_waiting
+        )
+
+    def _grant(self, quota: _ModelQuota):
+        r"""Hand the free slots to the queued callers, under the lock."""
+        while quota.waiters and quota.in_flight < int(quota.concurrency):
+            quota.in_flight += 1
+            quota.waiters.popleft().wake()
+
+    def _reserve(self, quota: _ModelQuota, api_kwargs: Dict) -> float:
+        delay = 0.0
+        if quota.request_limiter is not None:
+            delay = quota.request_limiter.reserve(1)
+        if quota.token_limiter is not None:
+            delay = max(
+                delay, quota.token_limiter.reserve(self.estimate_tokens(api_kwargs))
+            )
+        return delay
+
+    def acquire(self, key: str, api_kwargs: Dict = {}) -> float:
+        r"""Wait for a concurrency slot and the rate limits of ``key``, return the seconds waited.
+
+        Every :meth:`acquire` has to be followed by one :meth:`release`.
+        """
+        start = time.monotonic()
+        with self._lock:
+            quota = self._get_quota(key)
+            waiter = None
+            if not self._try_acquire(quota):
+                waiter = _Waiter()
+                self._queue(quota, waiter)
+        if waiter is not None:
+            waiter.event.wait()
+        delay = self._reserve(quota, api_kwargs)
+        if delay > 0:
+            self._sleeping(quota, 1)
+            try:
+                time.sleep(delay)
+            finally:
+                self._sleeping(quota, -1)
+        return self._record_wait(quota, start)
+
+    async def aacquire(self, key: str, api_kwargs: Dict = {}) -> float:
+        r"""Async version of :meth:`acquire`."""
+        start = time.monotonic()
+        with self._lock:
+            quota = self._get_quota(key)
+            waiter = None
+            if not self._try_acquire(quota):
+                waiter = _Waiter(asyncio.get_running_loop())
+                self._queue(quota, waiter)
+        if waiter is not None:
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                self._cancel_waiter(quota, waiter)
+                raise
+        delay = self._reserve(quota, api_kwargs)
+        if delay > 0:
+            self._sleeping(quota, 1)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                # no request was sent, give the slot back without counting one
+                with self._lock:
+                    self._release_slot(quota)
+                raise
+            finally:
+                self._sleeping(quota, -1)
+        return self._record_wait(quota, start)
+
+    def _cancel_waiter(self, quota: _ModelQuota, waiter: _Waiter):
+        with self._lock:
+            try:
+                quota.waiters.remove(waiter)
+                return
+            except ValueError:
+                pass  # the slot was already granted, give it back
+            self._release_slot(quota)
+
+    def _release_slot(self, quota: _ModelQuota):
+        r"""Give a slot back without counting a request, under the lock."""
+        quota.in_flight = max(0, quota.in_flight - 1)
+        self._grant(quota)
+
+    def _sleeping(self, quota: _ModelQuota, delta: int):
+        with self._lock:
+            quota.rate_waiting += delta
+            quota.max_queue_depth = max(
+                quota.max_queue_depth, len(quota.waiters) + quota.rate_waiting
+            )
+
+    def _record_wait(self, quota: _ModelQuota, start: float) -> float:
+        waited = time.monotonic() - start
+        with self._lock:
+            quota.wait_seconds += waited
+        return waited
+
+    def release(
+        self,
+        key: str,
+        latency: Optional[float] = None,
+        error: Optional[BaseException] = None,
+    ):
+        r"""Free the slot of ``key`` and adapt its concurrency limit to the outcome of the call."""
+        with self._lock:
+            quota = self._get_quota(key)
+            quota.in_flight = max(0, quota.in_flight - 1)
+            quota.requests += 1
+            if is_rate_limit_error(error):
+                self._on_rate_limit(quota)
+            elif error is not None:
+                quota.errors += 1
+            elif latency is not None:
+                self._on_success(quota, latency)
+            self._grant(quota)
+
+    def record_rate_limit(self, key: str):
+        r"""Report a rate limit error of ``key`` that is retried inside the client, such as by its ``backoff`` decorator."""
+        with self._lock:
+            self._on_rate_limit(self._get_quota(key))
+
+    def _on_rate_limit(self, quota: _ModelQuota):
+        quota.rate_limited += 1
+        if quota.request_limiter is not None:
+            quota.request_limiter.drain()
+        self._decrease(quota)
+
+    def _on_success(self, quota: _ModelQuota, latency: float):
+        quota.latency = (
+            latency if quota.latency is None else 0.8 * quota.latency + 0.2 * latency
+        )
+        if self.latency_target is not None and quota.latency > self.latency_target:
+            self._decrease(quota)
+        elif time.monotonic() - quota.last_decrease >= self.decrease_cooldown:
+            # slow start doubles the limit per limit's worth of successful calls, then the
+            # additive increase adds about one slot, paused for a cooldown after a decrease
+            step = 1.0 if quota.slow_start else 1.0 / quota.concurrency
+            quota.concurrency = min(
+                float(self.max_concurrency), quota.concurrency + step
+            )
+
+    def _decrease(self, quota: _ModelQuota):
+        now = time.monotonic()
+        if now - quota.last_decrease < self.decrease_cooldown:
+            return
+        quota.last_decrease = now
+        quota.slow_start = False
+        quota.concurrency = max(
+            float(self.min_concurrency), quota.concurrency * self.decrease_factor
+        )
+        log.debug(f"Decreased the concurrency limit to {quota.concurrency:.1f}")
+
+    def run(self, key: str, fn: Callable[[], Any], api_kwargs: Dict = {}) -> Any:
+        r"""Run ``fn`` in a slot of ``key``, the latency and the rate limit errors adapt the concurrency."""
+        self.acquire(key, api_kwargs)
+        start = time.monotonic()
+        try:
+            result = fn()
+        except BaseException as e:
+            self.release(key, error=e)
+            raise
+        self.release(key, latency=time.monotonic() - start)
+        return result
+
+    async def arun(
+        self, key: str, fn: Callable[[], Awaitable[Any]], api_kwargs: Dict = {}
+    ) -> Any:
+        r"""Async version of :meth:`run`."""
+        await self.aacquire(key, api_kwargs)
+        start = time.monotonic()
+        try:
+            result = await fn()
+        except BaseException as e:
+            self.release(key, error=e)
+            raise
+        self.release(key, latency=time.monotonic() - start)
+        return result
+
+    def get_metrics(self) -> Dict[str, Dict[str, float]]:
+        r"""Return the metrics of each key.
+
+        - queue_depth: the callers waiting for a slot or for the rate limits, and max_queue_depth its peak.
+        - in_flight: the calls holding a slot, and concurrency_limit the current limit.
+        - requests, rate_limited and errors: the counts of the finished calls and of the 429s.
+        - avg_latency: the moving average of the call latency in seconds.
+        - wait_seconds: the total time the callers waited before their call.
+        """
+        with self._lock:
+            return {
+                key: {
+                    "queue_depth": len(quota.waiters) + quota.rate_waiting,
+                    "max_queue_depth": quota.max_queue_depth,
+                    "in_flight": quota.in_flight,
+                    "concurrency_limit": int(quota.concurrency),
+                    "requests": quota.requests,
+                    "rate_limited": quota.rate_limited,
+                    "errors": quota.errors,
+                    "avg_latency": quota.latency or 0.0,
+                    "wait_seconds": quota.wait_seconds,
+                }
+                for key, quota in self._quotas.items()
+            }
+
+    def __getstate__(self):
+        # the quotas are process-local, only the configuration is pickled
+        state = self.__dict__.copy()
+        del state["_lock"]
+        del state["_quotas"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._quotas = {}
+
+
+def _iter_texts(value: Any) -> Iterator[str]:
+    r"""Yield the strings nested in the api_kwargs value, skipping the image payloads."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if key not in ("image_url", "url", "source", "role", "type"):
+                yield from _iter_texts(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _iter_texts(item)
+
+
+def report_backoff_to_scheduler(details: Dict[str, Any]):
+    r"""``on_backoff`` handler of the clients' ``backoff`` decorators.
+
+    Reports the rate limit errors retried inside the client to its :class:`RateLimitScheduler`.
+    """
+    args = details.get("args") or ()
+    client = args[0] if args else None
+    scheduler = getattr(client, "rate_limit_scheduler", None)
+    if scheduler is None or not is_rate_limit_error(details.get("exception")):
+        return
+    api_kwargs = details.get("kwargs", {}).get("api_kwargs")
+    if api_kwargs is None:
+        api_kwargs = args[1] if len(args) > 1 else {}
+    scheduler.record_rate_limit(client._rate_limit_key(api_kwargs))
+
 
 # TODO: global model registry for all available models in users' project.
 class ModelClient(Component):
@@ -45,6 +530,43 @@ Check the subclasses in `components/model_client/` directory for the functional
         self.sync_client = None
         self.async_client = None
 
+    rate_limit_scheduler: Optional[RateLimitScheduler] = None
+
+    def set_rate_limit_scheduler(self, scheduler: Optional[RateLimitScheduler]):
+        r"""Opt in to a shared :class:`RateLimitScheduler`, ``None`` to opt out.
+
+        ``Generator`` and ``Embedder`` then send the calls through :meth:`scheduled_call` and :meth:`ascheduled_call`.
+        """
+        self.rate_limit_scheduler = scheduler
+
+    def _rate_limit_key(self, api_kwargs: Dict) -> str:
+        r"""The scheduler key of a call, subclass can override it to share a quota across models."""
+        return f"{type(self).__name__}/{api_kwargs.get('model', 'default')}"
+
+    def scheduled_call(
+        self, api_kwargs: Dict = {}, model_type: ModelType = ModelType.UNDEFINED
+    ):
+        r"""Call :meth:`call`, through the rate_limit_scheduler when the client has one."""
+        if self.rate_limit_scheduler is None:
+            return self.call(api_kwargs=api_kwargs, model_type=model_type)
+        return self.rate_limit_scheduler.run(
+            self._rate_limit_key(api_kwargs),
+            partial(self.call, api_kwargs=api_kwargs, model_type=model_type),
+            api_kwargs,
+        )
+
+    async def ascheduled_call(
+        self, api_kwargs: Dict = {}, model_type: ModelType = ModelType.UNDEFINED
+    ):
+        r"""Async version of :meth:`scheduled_call` with :meth:`acall`."""
+        if self.rate_limit_scheduler is None:
+            return await self.acall(api_kwargs=api_kwargs, model_type=model_type)
+        return await self.rate_limit_scheduler.arun(
+            self._rate_limit_key(api_kwargs),
+            partial(self.acall, api_kwargs=api_kwargs, model_type=model_type),
+            api_kwargs,
+        )
+
     def init_sync_client(self):
         raise NotImplementedError(
             f"{type(self).__name__} must implement _init_sync_client method"
@@ -70,6 +592,31 @@ Check the subclasses in `components/model_client/` directory for the functional
         r"""Subclass use this to call the API with the async client."""
         pass
 
+    def batch_call(
+        self,
+        api_kwargs_list: List[Dict] = [],
+        model_type: ModelType = ModelType.UNDEFINED,
+    ) -> List[Any]:
+        r"""Subclass can implement this to send a batch of api_kwargs in one native batch call.
+
+        It returns one completion per api_kwargs in the same order. ``Generator.batch_call`` uses it when it is implemented.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not implement batch_call method"
+        )
+
+    def supports_batch_call(
+        self,
+        api_kwargs_list: List[Dict],
+        model_type: ModelType = ModelType.UNDEFINED,
+    ) -> bool:
+        r"""Whether :meth:`batch_call` can send this batch in one native batch call.
+
+        Defaults to whether the subclass implements :meth:`batch_call`. ``Generator.batch_call`` sends
+        the items one at a time when it is False.
+        """
+        return type(self).batch_call is not ModelClient.batch_call
+
     def convert_inputs_to_api_kwargs(
         self,
         input: Optional[Any] = None,
@@ -96,6 +643,32 @@ Check the subclasses in `components/model_client/` directory for the functional
             f"{type(self).__name__} must implement parse_chat_completion method"
         )
 
+    def parse_chat_completion_stream(self, completion: Any) -> Iterator[str]:
+        r"""Yield the text deltas of a streaming chat completion.
+
+        By default it iterates the ``raw_response`` of :meth:`parse_chat_completion`. Subclass can override it
+        to read the deltas from the provider chunks directly.
+        """
+        output = self.parse_chat_completion(completion)
+        if output.error:
+            raise ValueError(output.error)
+        raw_response = output.raw_response
+        if isinstance(raw_response, str):
+            yield raw_response
+            return
+        for delta in raw_response:
+            if isinstance(delta, GeneratorOutput):
+                delta = delta.raw_response
+            if delta:
+                yield delta
+
+    async def aparse_chat_completion_stream(
+        self, completion: Any
+    ) -> AsyncIterator[str]:
+        r"""Async version of :meth:`parse_chat_completion_stream` for the streams returned by ``acall``."""
+        for delta in self.parse_chat_completion_stream(completion):
+            yield delta
+
     def track_completion_usage(self, *args, **kwargs) -> "CompletionUsage":
         r"""Track the chat completion usage. Use OpenAI standard API for tracking."""
         raise NotImplementedError(
@@ -1,14 +1,15 @@
 """Class prompt builder for AdalFlow system prompt."""
 
-from typing import Dict, Any, Optional, List, TypeVar
+from typing import Dict, Any, Optional, List, TypeVar, Tuple, FrozenSet, Sequence, Union
 import logging
 from functools import lru_cache
 
-from jinja2 import Template, Environment, StrictUndefined, meta
+from jinja2 import Template, Environment, StrictUndefined, meta, nodes
 
 
 from adalflow.core.component import Component
 from adalflow.core.default_prompt_template import DEFAULT_ADALFLOW_SYSTEM_PROMPT
+from adalflow.core.tokenizer import count_tokens_cached, get_tokenizer
 from adalflow.optim.parameter import Parameter
 
 
@@ -16,6 +17,12 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+# preset prompt_kwargs of these types can not change in place, so they are pre-rendered
+_STATIC_VALUE_TYPES = (str, int, float, bool, type(None))
+
+# a context item of a budgeted prompt: a text, or a text with its relevance score
+ContextItemType = Union[str, Tuple[str, float]]
+
 
 class Prompt(Component):
     __doc__ = r"""Renders a text string(prompt) from a Jinja2 template string.
@@ -26,6 +33,11 @@ class Prompt(Component):
         template (str, optional): The Jinja2 template string. Defaults to DEFAULT_ADALFLOW_SYSTEM_PROMPT.
         preset_prompt_kwargs (Optional[Dict], optional): The preset prompt kwargs to fill in the variables in the prompt. Defaults to {}.
 
+    The template is compiled once per template string and shared by all the Prompt instances. The top-level
+    parts of the template that only use preset prompt_kwargs of immutable types (str, int, float, bool, None)
+    are also pre-rendered once into a specialized template, which is used until the prompt_kwargs change or
+    a call overrides one of these variables.
+
     Examples:
         >>> from core.prompt_builder import Prompt
         >>> prompt = Prompt(prompt_kwargs={"task_desc_str": "You are a helpful assistant."})
@@ -58,26 +70,69 @@ class Prompt(Component):
 
         self.template = template or DEFAULT_ADALFLOW_SYSTEM_PROMPT
         self.__create_jinja2_template()
-        self.prompt_variables: List[str] = []
-        for var in self._find_template_variables(self.template):
-            self.prompt_variables.append(var)
+        # sorted for a stable order
+        self.prompt_variables: List[str] = list(_compile_template(self.template)[1])
 
         logger.info(f"{__class__.__name__} has variables: {self.prompt_variables}")
 
         self.prompt_kwargs = prompt_kwargs
+        self._render_plan = None
+
+    # the compiled template and base render context for the current prompt_kwargs
+    _render_plan: Optional[Tuple] = None
 
     def __create_jinja2_template(self):
         r"""Create the Jinja2 template object."""
         try:
-            self.jinja2_template: Template = get_jinja2_environment().from_string(
-                self.template
-            )
+            self.jinja2_template: Template = _compile_template(self.template)[0]
         except Exception as e:
             raise ValueError(f"Invalid Jinja2 template: {e}")
 
+    def _get_render_plan(self) -> Tuple[Template, Dict[str, Any], List, FrozenSet]:
+        r"""Return the template to render, the base context, the Parameter prompt_kwargs and the pre-rendered keys.
+
+        It is rebuilt only when the template or the preset prompt_kwargs changed since the last call.
+        """
+        items = tuple(self.prompt_kwargs.items())
+        plan = self._render_plan
+        if (
+            plan is not None
+            and plan[0] == self.template
+            and len(plan[1]) == len(items)
+            # by identity, a value's __eq__ may not return a bool, e.g. a numpy array
+            and all(
+                key == plan_key and value is plan_value
+                for (key, value), (plan_key, plan_value) in zip(items, plan[1])
+            )
+        ):
+            return plan[2]
+
+        # the jinja2 globals are merged once here instead of in every render
+        context = dict(self.jinja2_template.globals)
+        context.update((key, None) for key in self.prompt_variables)
+        static_items, parameters = [], []
+        for key, value in self.prompt_kwargs.items():
+            if isinstance(value, Parameter):
+                parameters.append((key, value))
+                continue
+            if key in self.prompt_variables and isinstance(value, _STATIC_VALUE_TYPES):
+                static_items.append((key, value))
+            context[key] = value
+        template = _specialize_template(self.template, tuple(static_items))
+        static_keys = frozenset(key for key, _ in static_items)
+        if template is None:
+            template, static_keys = self.jinja2_template, frozenset()
+        self._render_plan = (
+            self.template,
+            items,
+            (template, context, parameters, static_keys),
+        )
+        return self._render_plan[2]
+
     def update_prompt_kwargs(self, **kwargs):
         r"""Update the initial prompt kwargs after Prompt is initialized."""
         self.prompt_kwargs.update(kwargs)
+        self._render_plan = None
 
     def get_prompt_variables(self) -> List[str]:
         r"""Get the prompt kwargs."""
@@ -130,14 +185,119 @@ class Prompt(Component):
         Renders the prompt template with keyword arguments. Allow None values.
         """
         try:
-            pass_kwargs = self.compose_prompt_kwargs(**kwargs)
-            pass_kwargs = _convert_prompt_kwargs_to_str(pass_kwargs)
-            prompt_str = self.jinja2_template.render(**pass_kwargs)
+            template, context, parameters, static_keys = self._get_render_plan()
+            if kwargs and not static_keys.isdisjoint(kwargs):
+                # a pre-rendered variable is overridden
+                template = self.jinja2_template
+            pass_kwargs = context.copy()
+            for key, p in parameters:
+                pass_kwargs[key] = p.data
+            for key, value in kwargs.items():
+                pass_kwargs[key] = value.data if isinstance(value, Parameter) else value
+            # render on the context as is, Template.render would copy it and merge the globals again
+            prompt_str = template.environment.concat(
+                template.root_render_func(
+                    template.new_context(pass_kwargs, shared=True)
+                )
+            )
             return prompt_str
 
         except Exception as e:
             raise ValueError(f"Error rendering Jinja2 template: {e}")
 
+    def call_with_budget(
+        self,
+        max_tokens: int,
+        budget_key: str = "context_str",
+        separator: str = "\n",
+        truncate: bool = True,
+        tokenizer_name: str = "cl100k_base",
+        **kwargs,
+    ) -> Tuple[str, int]:
+        r"""Render the prompt within ``max_tokens`` tokens by fitting the context items of ``budget_key``.
+
+        The value of ``budget_key`` can be a string, a list of strings or ``(text, score)`` tuples,
+        or one or a list of RetrieverOutput whose documents are scored with ``doc_scores``. Strings
+        without a score rank by their position. The items are kept from the highest score down while
+        they fit, the item that overflows is truncated to the remaining tokens when ``truncate`` is on,
+        and the lower-scoring ones are dropped. The kept items are joined with ``separator`` in their
+        input order.
+
+        The token counts of the items and of the prompt without the context are memoized, see
+        :func:`count_tokens_cached<core.tokenizer.count_tokens_cached>`.
+
+        Returns:
+            Tuple[str, int]: The prompt and its number of tokens.
+
+        Raises:
+            ValueError: If the prompt is over ``max_tokens`` even without the context.
+        """
+        value = kwargs.get(budget_key)
+        if value is None:
+            prompt_str = self.call(**kwargs)
+            num_tokens = count_tokens_cached(prompt_str, tokenizer_name)
+            if num_tokens > max_tokens:
+                raise ValueError(
+                    f"The prompt has {num_tokens} tokens, over the budget of {max_tokens}."
+                )
+            return prompt_str, num_tokens
+
+        def count(text: str) -> int:
+            return count_tokens_cached(text, tokenizer_name)
+
+        items = _to_scored_items(value)
+        base_tokens = count(self.call(**{**kwargs, budget_key: ""}))
+        if base_tokens > max_tokens:
+            raise ValueError(
+                f"The prompt has {base_tokens} tokens without {budget_key}, over the budget of {max_tokens}."
+            )
+        budget = max_tokens - base_tokens
+        separator_tokens = count(separator) if separator else 0
+
+        # from the highest score down, the sort is stable so ties keep their input order
+        ranked = sorted(range(len(items)), key=lambda i: -items[i][1])
+        selected: Dict[int, str] = {}
+        for i in ranked:
+            text = items[i][0]
+            cost = count(text) + (separator_tokens if selected else 0)
+            if cost <= budget:
+                selected[i] = text
+                budget -= cost
+                continue
+            remaining = budget - (separator_tokens if selected else 0)
+            if truncate and remaining > 0:
+                selected[i] = _truncate_tokens(text, remaining, tokenizer_name)
+            break
+        kept = [i for i in ranked if i in selected]
+
+        # tokens can merge across the joins and the template can add text around a non-empty
+        # context, so the lowest-scoring kept item is shrunk until the rendered prompt fits
+        tokenizer = get_tokenizer(tokenizer_name)
+        while True:
+            context = separator.join(selected[i] for i in sorted(selected))
+            prompt_str = self.call(**{**kwargs, budget_key: context})
+            num_tokens = tokenizer.count_tokens(prompt_str)
+            if num_tokens <= max_tokens or not kept:
+                break
+            last = kept[-1]
+            text = ""
+            if truncate:
+                overflow = num_tokens - max_tokens
+                text = _truncate_tokens(
+                    selected[last], count(selected[last]) - overflow, tokenizer_name
+                )
+            if text:
+                selected[last] = text
+            else:
+                del selected[last]
+                kept.pop()
+
+        if len(selected) < len(items):
+            logger.debug(
+                f"Dropped {len(items) - len(selected)} of {len(items)} items of {budget_key} to fit {max_tokens} tokens."
+            )
+        return prompt_str, num_tokens
+
     def _extra_repr(self) -> str:
         s = f"template: {self.template}"
         prompt_kwargs_str = _convert_prompt_kwargs_to_str(self.prompt_kwargs)
@@ -151,7 +311,8 @@ class Prompt(Component):
     def from_dict(cls: type[T], data: Dict[str, Any]) -> T:
         obj = super().from_dict(data)
         # recreate the jinja2 template
-        obj.jinja2_template = get_jinja2_environment().from_string(obj.template)
+        obj.jinja2_template = _compile_template(obj.template)[0]
+        obj._render_plan = None
         return obj
 
     def to_dict(self) -> Dict[str, Any]:
@@ -159,11 +320,48 @@ class Prompt(Component):
         Get the dictionary representation of all the Prompt object's attributes, with sorting applied to
         dictionary keys and list elements to ensure consistent ordering.
         """
-        exclude = ["jinja2_template"]  # unserializable object
+        exclude = ["jinja2_template", "_render_plan"]  # unserializable object
         output = super().to_dict(exclude=exclude)
         return output
 
 
+def _to_scored_items(
+    value: Union[str, Any, Sequence[Union[ContextItemType, Any]]],
+) -> List[Tuple[str, float]]:
+    r"""Convert the value of a budgeted prompt variable into ``(text, score)`` items."""
+    if isinstance(value, str):
+        return [(value, 0.0)]
+    if hasattr(value, "documents"):  # a single RetrieverOutput
+        value = [value]
+    items: List[Tuple[str, float]] = []
+    for item in value:
+        if isinstance(item, str):
+            items.append((item, -float(len(items))))
+        elif isinstance(item, (tuple, list)):
+            items.append((str(item[0]), float(item[1])))
+        elif hasattr(item, "documents"):
+            scores = item.doc_scores or []
+            for j, doc in enumerate(item.documents or []):
+                text = getattr(doc, "text", None)
+                text = str(doc) if text is None else text
+                score = float(scores[j]) if j < len(scores) else -float(len(items))
+                items.append((text, score))
+        else:
+            items.append((str(item), -float(len(items))))
+    return items
+
+
+def _truncate_tokens(text: str, max_tokens: int, tokenizer_name: str) -> str:
+    r"""Keep the first ``max_tokens`` tokens of ``text``."""
+    if max_tokens <= 0:
+        return ""
+    tokenizer = get_tokenizer(tokenizer_name)
+    tokens = tokenizer.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return tokenizer.decode(tokens[:max_tokens])
+
+
 def _convert_prompt_kwargs_to_str(prompt_kwargs: Dict) -> Dict[str, str]:
     r"""Convert the prompt_kwargs to a dictionary with string values."""
     prompt_kwargs_str: Dict[str, str] = {}
@@ -192,3 +390,76 @@ def get_jinja2_environment():
         return default_environment
     except Exception as e:
         raise ValueError(f"Invalid Jinja2 environment: {e}")
+
+
+@lru_cache(maxsize=256)
+def _compile_template(template: str) -> Tuple[Template, Tuple[str, ...]]:
+    r"""Compile the template and find its variables, once per template string."""
+    environment = get_jinja2_environment()
+    variables = meta.find_undeclared_variables(environment.parse(template))
+    return environment.from_string(template), tuple(sorted(variables))
+
+
+def _find_node_variables(node: nodes.Node) -> set:
+    environment = get_jinja2_environment()
+    template = nodes.Template([node])
+    template.set_environment(environment)
+    return meta.find_undeclared_variables(template)
+
+
+def _render_node(node: nodes.Node, context: Dict[str, Any]) -> nodes.Output:
+    environment = get_jinja2_environment()
+    text = environment.from_string(nodes.Template([node])).render(context)
+    return nodes.Output([nodes.TemplateData(text)])
+
+
+def _find_stored_names(template: nodes.Template) -> set:
+    names = {node.name for node in template.find_all(nodes.Name) if node.ctx == "store"}
+    names.update(node.name for node in template.find_all(nodes.Macro))
+    return names
+
+
+@lru_cache(maxsize=256)
+def _specialize_template(
+    template: str, static_items: Tuple[Tuple[str, Any], ...]
+) -> Optional[Template]:
+    r"""Compile the template with its top-level parts that only use ``static_items`` pre-rendered.
+
+    Returns None when nothing can be pre-rendered or the pre-rendering fails, the template is then
+    rendered as is.
+    """
+    if not static_items:
+        return None
+    static = dict(static_items)
+    environment = get_jinja2_environment()
+    try:
+        parsed = environment.parse(template)
+        # a name the template assigns is not the preset value everywhere, e.g. after a {% set %}
+        static_keys = set(static) - _find_stored_names(parsed)
+        body: List[nodes.Node] = []
+        rendered = False
+        for node in parsed.body:
+            if isinstance(node, nodes.Output):
+                children = []
+                for child in node.nodes:
+                    if not isinstance(child, nodes.TemplateData) and (
+                        _find_node_variables(nodes.Output([child])) <= static_keys
+                    ):
+                        child = _render_node(nodes.Output([child]), static).nodes[0]
+                        rendered = True
+                    children.append(child)
+                body.append(nodes.Output(children))
+            elif isinstance(node, (nodes.If, nodes.For, nodes.With)) and (
+                _find_node_variables(node) <= static_keys
+            ):
+                body.append(_render_node(node, static))
+                rendered = True
+            else:
+                # e.g. assignments and macros that the rest of the template depends on
+                body.append(node)
+        if not rendered:
+            return None
+        return environment.from_string(nodes.Template(body))
+    except Exception as e:
+        logger.debug(f"Failed to pre-render the template, render it as is: {e}")
+        return None
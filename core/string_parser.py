@@ -2,7 +2,8 @@
 
 From simple data types like boolean, integer, and float to more complex data types like JSON, YAML, and list strings."""
 
-from typing import Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
+import json
 import logging
 
 from adalflow.core.component import Component
@@ -211,6 +212,188 @@ class JsonParser(Parser):
             raise ValueError(f"Error: {e}")
 
 
+class JsonStreamParser(Parser):
+    __doc__ = r"""Incrementally parses a JSON object or array from a stream of text deltas.
+
+    Each :meth:`feed` only scans the new characters, and those of a key or value that is still pending,
+    and adds the values they complete to the partial object, so the cost of a feed does not grow with
+    the parsed prefix. The open containers hold their complete values, and a string value that is still
+    being streamed is included up to its last complete character. The partial object is updated in
+    place by the later feeds. Text before the first ``{`` or ``[``, such as a markdown code fence, is skipped.
+
+    Examples:
+
+    .. code-block:: python
+
+        parser = JsonStreamParser()
+        parser.feed('```json\n{"name": "Jo')  # {"name": "Jo"}
+        parser.feed('hn", "tags": [1, ')  # {"name": "John", "tags": [1]}
+        parser.feed("2]}\n```")  # {"name": "John", "tags": [1, 2]}
+        parser.done  # True
+    """
+
+    _CONTAINERS = {"{": dict, "[": list}
+    _WHITESPACE = " \t\n\r"
+
+    def __init__(self):
+        super().__init__()
+        self.reset()
+
+    def reset(self):
+        r"""Start parsing a new stream."""
+        self.done: bool = False
+        self.partial: JSON_PARSER_OUTPUT_TYPE = None
+        self._text = ""  # the text not consumed yet
+        self._pos = 0  # the next character of _text to scan
+        self._stack: List[Union[Dict, List]] = []  # open containers
+        self._keys: List[Optional[str]] = []  # per container: the key of the next value
+        self._expect_value: List[bool] = []  # per container: a value or a key is next
+        self._token_start = -1  # the pending scalar, or the undecoded part of a string
+        self._in_string = False
+        self._string_is_value = False
+        self._string_value = ""  # the decoded part of the streamed string value
+        self._escape = False
+        self._escape_start = -1  # the last escape sequence of the string
+        self._escape_end = -1
+
+    @staticmethod
+    def _decode_string(chars: str) -> str:
+        return json.loads('"' + chars + '"')
+
+    def _push(self, container: Union[Dict, List]):
+        self._stack.append(container)
+        self._keys.append(None)
+        self._expect_value.append(isinstance(container, list))
+
+    def _add_value(self, value: Any):
+        container = self._stack[-1]
+        if isinstance(container, list):
+            container.append(value)
+        else:
+            container[self._keys[-1]] = value
+
+    def _set_last_value(self, value: Any):
+        container = self._stack[-1]
+        if isinstance(container, list):
+            container[-1] = value
+        else:
+            container[self._keys[-1]] = value
+
+    def _end_scalar(self, text: str, end: int):
+        token = text[self._token_start : end]
+        self._token_start = -1
+        try:
+            self._add_value(json.loads(token))
+        except json.JSONDecodeError:
+            log.debug("Skipped the invalid JSON value %r", token)
+
+    def _end_string(self, text: str, end: int):
+        chars = text[self._token_start : end]
+        self._token_start = -1
+        try:
+            decoded = self._decode_string(chars)
+        except json.JSONDecodeError:
+            log.debug("Skipped the invalid JSON string %r", chars)
+            return
+        if self._string_is_value:
+            self._string_value += decoded
+            self._set_last_value(self._string_value)
+        else:
+            self._keys[-1] = decoded
+
+    def _flush_string(self, text: str):
+        r"""Add the complete characters of the streamed string value to the partial object."""
+        end = len(text)
+        if self._escape or self._escape_end > end:
+            end = self._escape_start
+        if end <= self._token_start:
+            return
+        try:
+            decoded = self._decode_string(text[self._token_start : end])
+        except json.JSONDecodeError:
+            return  # keep the last complete value
+        if decoded and "\ud800" <= decoded[-1] <= "\udbff":
+            # the first half of a surrogate pair, wait for the second one
+            decoded, end = decoded[:-1], end - 6
+        self._string_value += decoded
+        self._token_start = end
+        self._set_last_value(self._string_value)
+
+    def _scan(self, text: str) -> int:
+        r"""Scan ``text`` from ``_pos`` and return where the scan stopped."""
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self.partial is None:
+                if c in "{[":
+                    self.partial = self._CONTAINERS[c]()
+                    self._push(self.partial)
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    self._escape_end = i + (5 if c == "u" else 1)
+                elif c == "\\":
+                    self._escape = True
+                    self._escape_start = i
+                elif c == '"':
+                    self._in_string = False
+                    self._end_string(text, i)
+                continue
+            if self._token_start >= 0:
+                if c not in ",}]" and c not in self._WHITESPACE:
+                    continue
+                self._end_scalar(text, i)
+            if c == '"':
+                self._in_string = True
+                self._string_is_value = self._expect_value[-1]
+                self._token_start = i + 1
+                self._escape_start = self._escape_end = -1
+                if self._string_is_value:
+                    self._string_value = ""
+                    self._add_value("")
+            elif c in "{[":
+                container = self._CONTAINERS[c]()
+                self._add_value(container)
+                self._push(container)
+            elif c in "}]":
+                self._stack.pop()
+                self._keys.pop()
+                self._expect_value.pop()
+                if not self._stack:
+                    self.done = True
+                    return i + 1
+            elif c == ":":
+                self._expect_value[-1] = True
+            elif c == ",":
+                if isinstance(self._stack[-1], dict):
+                    self._expect_value[-1] = False
+            elif c not in self._WHITESPACE and self._expect_value[-1]:
+                self._token_start = i
+        return len(text)
+
+    def feed(self, delta: str) -> JSON_PARSER_OUTPUT_TYPE:
+        r"""Add the next text delta and return the partial object, None before the JSON starts."""
+        if self.done:
+            return self.partial
+        text = self._text + delta
+        end = self._scan(text)
+        if self._in_string and self._string_is_value:
+            self._flush_string(text)
+        # only the pending token is kept for the next feed
+        cut = self._token_start if self._token_start >= 0 else end
+        self._text = text[cut:]
+        self._pos = end - cut
+        if self._token_start >= 0:
+            self._token_start -= cut
+            self._escape_start -= cut
+            self._escape_end -= cut
+        return self.partial
+
+    def call(self, input: str) -> JSON_PARSER_OUTPUT_TYPE:
+        r"""Feed ``input`` as one delta and return the partial object."""
+        return self.feed(input)
+
+
 YAML_PARSER_OUTPUT_TYPE = JSON_PARSER_OUTPUT_TYPE
 
 
@@ -3,7 +3,9 @@ Tokenizer from tiktoken.
 """
 
 import tiktoken
-from typing import List
+import numpy as np
+from functools import lru_cache
+from typing import List, Sequence
 
 # from adalflow.core.component import BaseComponent
 
@@ -46,6 +48,36 @@ class Tokenizer:
         r"""Decodes the input tokens into text."""
         return self.tokenizer.decode(tokens)
 
+    def char_offsets(
+        self, text: str, tokens: List[int], positions: Sequence[int]
+    ) -> List[int]:
+        r"""Return the character offset in ``text`` where ``tokens[position]`` starts, for each position.
+
+        ``tokens`` is the encoding of ``text`` and ``positions`` are sorted, ``len(tokens)`` maps to the
+        end of the text. The tokens between two positions are decoded together, so each token is decoded
+        once. A token that starts inside a multi-byte character gets the offset of that character.
+        """
+        byte_offsets = []
+        byte_offset = 0
+        previous = 0
+        for position in positions:
+            if position > previous:
+                byte_offset += len(
+                    self.tokenizer.decode_bytes(tokens[previous:position])
+                )
+                previous = position
+            byte_offsets.append(byte_offset)
+        if text.isascii():  # bytes and characters match
+            return byte_offsets
+        text_bytes = text.encode("utf-8")
+        # character offset of a byte: the number of utf-8 lead bytes before it
+        is_continuation = (np.frombuffer(text_bytes, dtype=np.uint8) & 0xC0) == 0x80
+        lead_bytes = np.zeros(len(text_bytes) + 1, dtype=np.int64)
+        np.cumsum(~is_continuation, out=lead_bytes[1:])
+        byte_offsets = np.asarray(byte_offsets, dtype=np.int64)
+        in_char = np.append(is_continuation, False)[byte_offsets]
+        return (lead_bytes[byte_offsets] - in_char).tolist()
+
     def count_tokens(self, text: str) -> int:
         r"""Counts the number of tokens in the input text."""
         return len(self.encode(text))
@@ -54,3 +86,16 @@ class Tokenizer:
         r"""Returns the string tokens from the input text."""
         token_ids = self.encode(text)
         return [self.tokenizer.decode([token_id]) for token_id in token_ids]
+
+
+@lru_cache(None)
+def get_tokenizer(name: str = "cl100k_base") -> Tokenizer:
+    r"""Return the shared :class:`Tokenizer` of the encoding ``name``."""
+    return Tokenizer(name=name)
+
+
+@lru_cache(maxsize=16384)
+def count_tokens_cached(text: str, name: str = "cl100k_base") -> int:
+    r"""Count the tokens of ``text``, memoized in an LRU for the strings that are counted repeatedly,
+    such as the retrieved context items and the fixed parts of a prompt."""
+    return get_tokenizer(name).count_tokens(text)
@@ -177,14 +177,14 @@ class EmbedderOutput(DataClass):
     def is_normalized(self) -> bool:
         r"""Check if the embeddings are normalized to unit vectors.
 
+        Every embedding is checked, not only the first one.
+
         Returns:
             bool: True if the embeddings are normalized, False otherwise
         """
-        return (
-            is_normalized(self.data[0].embedding)
-            if self.data and self.data[0].embedding
-            else False
-        )
+        if not self.data or not self.data[0].embedding:
+            return False
+        return is_normalized([d.embedding for d in self.data])
 
 
 EmbedderInputType = Union[str, Sequence[str]]
@@ -1,7 +1,23 @@
+import asyncio
 import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
 import diskcache as dc
 from pathlib import Path
-from typing import Union
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 
 def hash_text(text: str):
@@ -16,24 +32,325 @@ def direct(text: str):
     return text
 
 
+# api_kwargs fields that do not change the response of the model
+NON_SEMANTIC_API_KWARGS: FrozenSet[str] = frozenset(
+    {"user", "timeout", "request_timeout", "extra_headers", "extra_query", "metadata"}
+)
+
+
+def canonical_cache_key(
+    api_kwargs: Dict[str, Any],
+    exclude: FrozenSet[str] = NON_SEMANTIC_API_KWARGS,
+) -> str:
+    r"""Hash the api_kwargs into a cache key that does not depend on the key order.
+
+    The fields in ``exclude`` are dropped before hashing, so requests that only differ in them
+    share the same cache entry.
+    """
+    content = json.dumps(
+        {k: v for k, v in api_kwargs.items() if k not in exclude},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hash_text(content)
+
+
+class MemoryLRUCache:
+    r"""A thread-safe in-process LRU cache with an optional per-entry time to live.
+
+    Args:
+        max_size (int): The maximum number of entries, the least recently used one is evicted first.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()  # key -> (expire_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        r"""Return the value of ``key``, or None when it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expire_at, value = entry
+            if expire_at is not None and expire_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        if self.max_size <= 0:
+            return
+        expire_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expire_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getstate__(self):
+        # the entries are process-local, only the configuration is pickled
+        return {"max_size": self.max_size}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+class _Flight:
+    r"""One in-flight sync call that the callers with the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _AsyncFlight:
+    r"""One in-flight async call and the number of callers awaiting it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    r"""Deduplicate concurrent identical calls: the callers with the same key share one call.
+
+    The first caller of a key runs the function, the callers that arrive while it is running
+    wait for and share its result or exception. Once it finishes the key is released, so later
+    callers run the function again. :meth:`do` works across threads and :meth:`ado` across the
+    coroutines of an event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._aflights: Dict[Tuple[int, str], _AsyncFlight] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        # tasks belong to one event loop
+        flight_key = (id(loop), key)
+        flight = self._aflights.get(flight_key)
+        if flight is None:
+            # the call runs as its own task, so cancelling the caller that started it
+            # does not cancel the call the other callers wait on
+            flight = self._aflights[flight_key] = _AsyncFlight(
+                asyncio.ensure_future(fn())
+            )
+            flight.task.add_done_callback(
+                partial(self._release_aflight, flight_key, flight)
+            )
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            # the call is only cancelled once no caller waits on it anymore
+            if not flight.task.done() and flight.waiters == 1:
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _release_aflight(
+        self, flight_key: Tuple[int, str], flight: "_AsyncFlight", task: asyncio.Task
+    ):
+        if self._aflights.get(flight_key) is flight:
+            del self._aflights[flight_key]
+        if not task.cancelled():
+            # mark the exception as retrieved when every caller was cancelled
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._flights) + len(self._aflights)
+
+    def __getstate__(self):
+        # the in-flight calls are process-local
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
+
+
 class CachedEngine:
-    def __init__(self, cache_path: Union[str, Path]):
+    r"""A two-tier response cache: a bounded in-memory LRU in front of a diskcache.
+
+    Args:
+        cache_path (Union[str, Path]): The directory of the diskcache.
+        cache_ttl (Optional[float]): Seconds after which an entry expires. Defaults to None, never.
+        memory_cache_size (int): The maximum number of entries kept in memory. Defaults to 1024.
+        disk_size_limit (Optional[int]): The size limit in bytes of the diskcache, the least recently
+            stored entries are evicted first. Defaults to None, the diskcache default of 1GB.
+
+    The hits, misses and lookup time are counted in :meth:`get_cache_stats`.
+    """
+
+    cache_ttl: Optional[float] = None
+    disk_size_limit: Optional[int] = None
+
+    def __init__(
+        self,
+        cache_path: Union[str, Path],
+        cache_ttl: Optional[float] = None,
+        memory_cache_size: int = 1024,
+        disk_size_limit: Optional[int] = None,
+    ):
         super().__init__()
         self.cache_path = Path(cache_path)
         self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_ttl = cache_ttl
+        self.disk_size_limit = disk_size_limit
+
+        self.cache = self._open_disk_cache()
+        self.memory_cache = MemoryLRUCache(memory_cache_size)
+        self.reset_cache_stats()
 
-        self.cache = dc.Cache(cache_path)
+    def _open_disk_cache(self) -> dc.Cache:
+        if self.disk_size_limit is None:
+            return dc.Cache(self.cache_path)
+        return dc.Cache(self.cache_path, size_limit=self.disk_size_limit)
 
     def _check_cache(self, prompt: str):
-        hash_key = hash_text(prompt)
-        if hash_key in self.cache:
-            return self.cache[hash_key]
-        else:
-            return None
+        return self._lookup_cache(hash_text(prompt))
 
     def _save_cache(self, prompt: str, response: str):
-        hash_key = hash_text(prompt)
-        self.cache[hash_key] = response
+        self._store_cache(hash_text(prompt), response)
+
+    def _lookup_cache(self, hash_key: str):
+        r"""Look up ``hash_key`` in memory first, then on disk with a single read."""
+        start = time.perf_counter()
+        response = self.memory_cache.get(hash_key)
+        if response is None:
+            # expired entries are dropped by diskcache itself
+            response = self._record_disk_lookup(
+                hash_key, self.cache.get(hash_key, default=None)
+            )
+        else:
+            self.cache_stats["memory_hits"] += 1
+        self.cache_stats["lookup_seconds"] += time.perf_counter() - start
+        return response
+
+    async def _alookup_cache(self, hash_key: str):
+        r"""Async :meth:`_lookup_cache`, the disk read runs in the default executor."""
+        start = time.perf_counter()
+        response = self.memory_cache.get(hash_key)
+        if response is None:
+            loop = asyncio.get_running_loop()
+            disk_response = await loop.run_in_executor(
+                None, partial(self.cache.get, hash_key, default=None)
+            )
+            response = self._record_disk_lookup(hash_key, disk_response)
+        else:
+            self.cache_stats["memory_hits"] += 1
+        self.cache_stats["lookup_seconds"] += time.perf_counter() - start
+        return response
+
+    def _lookup_cache_many(self, hash_keys: List[str]) -> List[Any]:
+        r"""Look up a batch of keys, the ones missing in memory are then read from disk in one pass."""
+        start = time.perf_counter()
+        responses = self._memory_lookup_many(hash_keys)
+        for i, response in enumerate(responses):
+            if response is None:
+                responses[i] = self._record_disk_lookup(
+                    hash_keys[i], self.cache.get(hash_keys[i], default=None)
+                )
+        self.cache_stats["lookup_seconds"] += time.perf_counter() - start
+        return responses
+
+    async def _alookup_cache_many(self, hash_keys: List[str]) -> List[Any]:
+        r"""Async :meth:`_lookup_cache_many`, all the disk reads run in one executor job."""
+        start = time.perf_counter()
+        responses = self._memory_lookup_many(hash_keys)
+        missing = [i for i, response in enumerate(responses) if response is None]
+        if missing:
+
+            def read_disk():
+                return [self.cache.get(hash_keys[i], default=None) for i in missing]
+
+            loop = asyncio.get_running_loop()
+            disk_responses = await loop.run_in_executor(None, read_disk)
+            for i, response in zip(missing, disk_responses):
+                responses[i] = self._record_disk_lookup(hash_keys[i], response)
+        self.cache_stats["lookup_seconds"] += time.perf_counter() - start
+        return responses
+
+    def _memory_lookup_many(self, hash_keys: List[str]) -> List[Any]:
+        responses = [self.memory_cache.get(hash_key) for hash_key in hash_keys]
+        self.cache_stats["memory_hits"] += sum(r is not None for r in responses)
+        return responses
+
+    def _record_disk_lookup(self, hash_key: str, response: Any):
+        if response is not None:
+            self.cache_stats["disk_hits"] += 1
+            self.memory_cache.set(hash_key, response, self.cache_ttl)
+        else:
+            self.cache_stats["misses"] += 1
+        return response
+
+    def _store_cache(self, hash_key: str, response: Any):
+        self.memory_cache.set(hash_key, response, self.cache_ttl)
+        self.cache.set(hash_key, response, expire=self.cache_ttl)
+
+    async def _astore_cache(self, hash_key: str, response: Any):
+        r"""Async :meth:`_store_cache`, the disk write runs in the default executor."""
+        self.memory_cache.set(hash_key, response, self.cache_ttl)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, partial(self.cache.set, hash_key, response, expire=self.cache_ttl)
+        )
+
+    def reset_cache_stats(self):
+        self.cache_stats: Dict[str, float] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "lookup_seconds": 0.0,
+        }
+
+    def get_cache_stats(self) -> Dict[str, float]:
+        r"""Return the hit/miss counters, the hit rate and the average lookup latency in ms."""
+        stats = dict(self.cache_stats)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (
+            (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        )
+        stats["avg_lookup_ms"] = (
+            stats["lookup_seconds"] * 1000 / lookups if lookups else 0.0
+        )
+        return stats
 
     def __getstate__(self):
         # Remove the cache from the state before pickling
@@ -44,4 +361,65 @@ class CachedEngine:
     def __setstate__(self, state):
         # Restore the cache after unpickling
         self.__dict__.update(state)
-        self.cache = dc.Cache(self.cache_path)
+        self.cache = self._open_disk_cache()
+        if "memory_cache" not in state:  # pickled before the memory tier existed
+            self.memory_cache = MemoryLRUCache()
+            self.reset_cache_stats()
+
+
+# Check that the sync and async paths of the Generator hit each other's cache entries, in both tiers:
+if __name__ == "__main__":
+    import tempfile
+
+    from adalflow.core.generator import Generator
+    from adalflow.core.model_client import ModelClient
+    from adalflow.core.types import GeneratorOutput, ModelType
+
+    class CountingClient(ModelClient):
+        def __init__(self):
+            super().__init__()
+            self.calls = 0
+
+        def convert_inputs_to_api_kwargs(
+            self, input=None, model_kwargs={}, model_type=ModelType.UNDEFINED
+        ):
+            return {"input": input, **model_kwargs}
+
+        def call(self, api_kwargs={}, model_type=ModelType.UNDEFINED):
+            self.calls += 1
+            return f"response to {api_kwargs['input']}"
+
+        async def acall(self, api_kwargs={}, model_type=ModelType.UNDEFINED):
+            return self.call(api_kwargs, model_type)
+
+        def parse_chat_completion(self, completion):
+            return GeneratorOutput(data=completion, raw_response=completion)
+
+    def run(generator: Generator, mode: str, prompt_kwargs: Dict) -> GeneratorOutput:
+        if mode == "sync":
+            return generator.call(prompt_kwargs=prompt_kwargs, use_cache=True)
+        return asyncio.run(generator.acall(prompt_kwargs=prompt_kwargs, use_cache=True))
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for first, second in [("sync", "async"), ("async", "sync")]:
+            for tier in ["memory", "disk"]:
+                client = CountingClient()
+                generator = Generator(
+                    model_client=client,
+                    model_kwargs={"model": "counting"},
+                    template="{{ input_str }}",
+                    cache_path=f"{cache_dir}/{first}_{tier}",
+                )
+                prompt_kwargs = {"input_str": f"{first} then {second}, {tier}"}
+                first_output = run(generator, first, prompt_kwargs)
+                if tier == "disk":
+                    generator.memory_cache.clear()
+                generator.reset_cache_stats()
+                second_output = run(generator, second, prompt_kwargs)
+                stats = generator.get_cache_stats()
+                assert (
+                    client.calls == 1
+                ), f"{first} then {second}: the model was called again"
+                assert second_output.data == first_output.data
+                assert stats[f"{tier}_hits"] == 1, stats
+                print(f"{first} then {second}: {tier} cache hit")
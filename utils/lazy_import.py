@@ -43,6 +43,7 @@ class OptionalPackages(Enum):
     GROQ = ("groq", "Please install groq with: pip install groq")
     OPENAI = ("openai", "Please install openai with: pip install openai")
     ANTHROPIC = ("anthropic", "Please install anthropic with: pip install anthropic")
+    HTTPX = ("httpx", "Please install httpx with: pip install httpx")
     GOOGLE_GENERATIVEAI = (
         "google.generativeai",
         "Please install google-generativeai with: pip install google-generativeai",
@@ -92,6 +93,10 @@ class OptionalPackages(Enum):
         "datasets",
         "Please install datasets with: pip install datasets",
     )
+    PYARROW = (
+        "pyarrow",
+        "Please install pyarrow with: pip install pyarrow",
+    )
     QDRANT = (
         "qdrant-client",
         "Please install qdrant-client with: pip install qdrant-client",